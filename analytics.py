@@ -0,0 +1,347 @@
+import numpy as np
+import pandas as pd
+
+def pct_to_float(x):
+    """Parse a column of '75.00%'-style strings (or numbers) into floats."""
+    return pd.to_numeric(x.astype(str).str.replace('%', '', regex=False), errors='coerce')
+
+
+def load_score(path="cleaned_score.csv"):
+    """cleaned_score.csv with Opponent as a categorical (older cleaners wrote it as a second 'Date' column)."""
+    score_df = pd.read_csv(path).rename(columns={'Date.1': 'Opponent'})
+    if 'Opponent' in score_df.columns:
+        score_df['Opponent'] = opponent_categories(score_df['Opponent'])
+    return score_df
+
+
+def score_dates(values):
+    """cleaned_score.csv dates as Timestamps: ISO from clean_scrim_form or day-first from older sheets (NaT if neither)."""
+    return pd.to_datetime(values, errors='coerce', dayfirst=True, format='mixed')
+
+
+def opponent_categories(values):
+    """
+    Opponent names as a categorical, with spacing / case variants ('QT DIG ' /
+    'Qt Dig') folded into the first spelling seen.
+    """
+    names = pd.Series(values, dtype=object)
+    names = names.where(names.notna()).astype(str).str.split().str.join(' ').where(names.notna())
+    key = names.str.lower()
+    first_spelling = dict(zip(key[::-1], names[::-1]))
+    canonical = key.map(first_spelling)
+    return pd.Categorical(canonical, categories=sorted(canonical.dropna().unique(), key=str.lower))
+
+
+def load_form_blocks(path="form.csv"):
+    """form.csv reduced to the Map / Agent / Result columns used for compositions."""
+    form_df = pd.read_csv(path)
+    return form_df[['Column 1', 'Agent', 'Result']].dropna().reset_index(drop=True)
+
+
+# 📊 OVERVIEW
+def map_overview(score_df, start_date, end_date):
+    """Games / wins / draws / losses and win rate per map for a date range."""
+    filtered_score = score_df[(score_df['Date'] >= start_date) & (score_df['Date'] <= end_date)]
+    if filtered_score.empty:
+        return pd.DataFrame()
+
+    summary = filtered_score.groupby('Map').agg(
+        Games=('Outcome', 'count'),
+        Wins=('Outcome', lambda x: (x.str.lower() == 'win').sum()),
+        Draws=('Outcome', lambda x: (x.str.lower() == 'draw').sum()),
+        Losses=('Outcome', lambda x: (x.str.lower() == 'loss').sum())
+    ).reset_index()
+    summary['Win Rate'] = summary['Wins'] / summary['Games']
+    return summary.sort_values(by='Map')
+
+
+# 🧩 MAP COMPOSITIONS
+# Prior strength (in games) used to shrink comp win rates towards the map average
+COMP_PRIOR_GAMES = 5
+# z-score for the 95% Wilson interval
+WILSON_Z = 1.96
+
+
+def team_games(form_df, score_df):
+    """
+    One row per game from the 5-player blocks of form.csv:
+    Map, Result, sorted Composition (tuple and 'A-B-C-D-E' string) and
+    whether the block is a usable game (same map/result for all 5 rows and
+    a matching map + outcome in cleaned_score.csv).
+    """
+    n_games = len(form_df) // 5
+    columns = ['Map', 'Result', 'Composition', 'Comp String', 'Valid']
+    if n_games == 0:
+        return pd.DataFrame(columns=columns)
+
+    rows = n_games * 5
+    maps = form_df['Column 1'].to_numpy()[:rows].reshape(n_games, 5)
+    results = form_df['Result'].to_numpy()[:rows].reshape(n_games, 5)
+    agents = np.sort(form_df['Agent'].to_numpy()[:rows].astype(str).reshape(n_games, 5), axis=1)
+
+    consistent = (maps == maps[:, :1]).all(axis=1) & (results == results[:, :1]).all(axis=1)
+
+    game_map = pd.Series(maps[:, 0])
+    game_result = pd.Series(results[:, 0]).astype(str)
+    score_pairs = pd.MultiIndex.from_arrays([score_df['Map'], score_df['Outcome'].astype(str).str.lower()])
+    in_score = pd.MultiIndex.from_arrays([game_map, game_result.str.lower()]).isin(score_pairs)
+
+    comp_string = pd.Series(agents[:, 0]).str.cat([pd.Series(agents[:, i]) for i in range(1, 5)], sep='-')
+    return pd.DataFrame({
+        'Map': game_map,
+        'Result': game_result,
+        'Composition': list(map(tuple, agents)),
+        'Comp String': comp_string,
+        'Consistent': consistent,
+        'Valid': consistent & in_score,
+    })
+
+
+def composition_maps(games):
+    """Maps that have at least one complete 5-player block in form.csv."""
+    return sorted(games.loc[games['Consistent'], 'Map'].unique())
+
+
+def composition_stats(games, prior_games=COMP_PRIOR_GAMES, z=WILSON_Z):
+    """
+    W/D/L, raw win rate, Wilson interval and win rate shrunk towards the
+    map average for every (map, composition) pair, in one pass.
+    """
+    games = games[games['Valid']]
+    result = games['Result'].str.lower()
+    counted = pd.DataFrame({
+        'Map': games['Map'],
+        'Comp String': games['Comp String'],
+        'Composition': games['Composition'],
+        'games': 1,
+        'wins': (result == 'win').astype(int),
+        'draws': (result == 'draw').astype(int),
+        'losses': (result == 'loss').astype(int),
+    })
+    stats = counted.groupby(['Map', 'Comp String'], sort=False).agg(
+        Composition=('Composition', 'first'),
+        games=('games', 'sum'),
+        wins=('wins', 'sum'),
+        draws=('draws', 'sum'),
+        losses=('losses', 'sum')
+    ).reset_index()
+
+    n = stats['games'].to_numpy(dtype=float)
+    w = stats['wins'].to_numpy(dtype=float)
+    p = w / n
+
+    # Wilson score interval
+    denom = 1 + z ** 2 / n
+    centre = (p + z ** 2 / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+
+    # Beta prior centred on the map's overall win rate
+    map_wins = stats.groupby('Map')['wins'].transform('sum').to_numpy(dtype=float)
+    map_games = stats.groupby('Map')['games'].transform('sum').to_numpy(dtype=float)
+    prior = map_wins / map_games
+
+    stats['Win Rate %'] = p * 100
+    stats['Wilson Low %'] = np.clip(centre - half, 0, 1) * 100
+    stats['Wilson High %'] = np.clip(centre + half, 0, 1) * 100
+    stats['Shrunk WR %'] = (w + prior_games * prior) / (n + prior_games) * 100
+    return stats
+
+
+def composition_table(stats, selected_map, top=15):
+    """Top compositions on a map, ranked by the lower Wilson bound so small samples don't float to the top."""
+    ranked = stats[stats['Map'] == selected_map].sort_values(
+        by=['Wilson Low %', 'Shrunk WR %', 'games', 'Comp String'],
+        ascending=[False, False, False, True]
+    )
+    return ranked.head(top).reset_index(drop=True)
+
+
+def score_between(score_df, start_date=None, end_date=None):
+    """Score rows whose date falls in [start_date, end_date]; either bound may be None."""
+    dates = score_dates(score_df['Date']).dt.date
+    keep = dates.notna()
+    if start_date is not None:
+        keep &= dates >= start_date
+    if end_date is not None:
+        keep &= dates <= end_date
+    return score_df[keep]
+
+
+# 📈 ROUND INSIGHTS
+def filter_rounds(score_df, selected_map, start_date, end_date):
+    """Score rows for a map ("All" for every map) and date range, with Atk/Def WR derived from the start side."""
+    filtered_df = score_df.copy()
+    if selected_map != "All":
+        filtered_df = filtered_df[filtered_df['Map'] == selected_map]
+
+    if start_date and end_date:
+        filtered_df = filtered_df[(filtered_df['Date'] >= start_date) & (filtered_df['Date'] <= end_date)]
+
+    # Derive Atk/Def WR based on Star Side
+    def extract_wr(row, side):
+        if pd.isna(row['Start']) or pd.isna(row['First Half WR']) or pd.isna(row['Second Half WR']):
+            return None
+        if side == 'Attack':
+            return row['First Half WR'] if row['Start'] == 'Attack' else row['Second Half WR']
+        elif side == 'Defence':
+            return row['First Half WR'] if row['Start'] == 'Defence' else row['Second Half WR']
+        return None
+
+    if filtered_df.empty:
+        filtered_df['Atk WR Derived'] = pd.Series(dtype=float)
+        filtered_df['Def WR Derived'] = pd.Series(dtype=float)
+        return filtered_df
+
+    filtered_df['Atk WR Derived'] = filtered_df.apply(lambda row: extract_wr(row, 'Attack'), axis=1)
+    filtered_df['Def WR Derived'] = filtered_df.apply(lambda row: extract_wr(row, 'Defence'), axis=1)
+    return filtered_df
+
+
+def round_summary(filtered_df):
+    """Per-map summary of outcomes and raw (unformatted) side win rates."""
+    agg_dict = {
+        'Games': ('Outcome', 'count'),
+        'Wins': ('Outcome', lambda x: (x.str.lower() == 'win').sum()),
+        'Draws': ('Outcome', lambda x: (x.str.lower() == 'draw').sum()),
+        'Losses': ('Outcome', lambda x: (x.str.lower() == 'loss').sum()),
+        'Avg_Atk_WR': ('Atk WR Derived', lambda x: pct_to_float(x).mean()),
+        'Avg_Def_WR': ('Def WR Derived', lambda x: pct_to_float(x).mean()),
+    }
+
+    if 'Atk PP %' in filtered_df.columns:
+        agg_dict['Atk_PP_Success'] = (
+            'Atk PP %',
+            lambda x: pd.to_numeric(x.fillna('0').str.replace('%', ''), errors='coerce').mean()
+        )
+
+    if 'Def PP %' in filtered_df.columns:
+        agg_dict['Def_PP_Success'] = (
+            'Def PP %',
+            lambda x: pd.to_numeric(x.fillna('0').str.replace('%', ''), errors='coerce').mean()
+        )
+
+    summary = filtered_df.groupby('Map').agg(**agg_dict).reset_index()
+    # Save raw numeric values for chart use (before formatting to %)
+    summary['Raw_Atk_WR'] = summary['Avg_Atk_WR']
+    summary['Raw_Def_WR'] = summary['Avg_Def_WR']
+    # Calculate Round Win Rate using (Atk + Def) / 2
+    summary['Raw_Round_WR'] = (summary['Raw_Atk_WR'] + summary['Raw_Def_WR']) / 2
+    return summary
+
+
+def post_plant_by_map(score_df):
+    """Mean post-plant (attack) and retake (defence) success per map, in 0–100."""
+    pp_df = score_df.groupby('Map').agg({
+        'Atk_PP_Success': lambda x: pct_to_float(x).mean(),
+        'Def_PP_Success': lambda x: pct_to_float(x).mean()
+    }).reset_index()
+
+    # Optional: convert to 0–100 range if needed
+    if pp_df['Atk_PP_Success'].max() <= 1.0:
+        pp_df['Atk_PP_Success'] *= 100
+        pp_df['Def_PP_Success'] *= 100
+    return pp_df
+
+
+# 🔢 PLAYER STATS
+def load_player_form(path="form.csv"):
+    """form.csv with parsed dates; rows without a valid date are dropped."""
+    player_df = pd.read_csv(path)
+    player_df['Date'] = pd.to_datetime(player_df['Date'], errors='coerce')
+    return player_df.dropna(subset=['Date'])
+
+
+def filter_player(player_df, selected_player, start_date, end_date, selected_map):
+    filtered = player_df[
+        (player_df['Player'] == selected_player) &
+        (player_df['Date'].dt.date >= start_date) &
+        (player_df['Date'].dt.date <= end_date)
+    ]
+
+    if selected_map != "All":
+        filtered = filtered[filtered['Column 1'] == selected_map]
+    return filtered
+
+
+def player_agent_stats(player_df, selected_player, start_date, end_date, selected_map):
+    """Per-agent totals and averages for one player in the Player Stats tab."""
+    filtered = filter_player(player_df, selected_player, start_date, end_date, selected_map)
+    if filtered.empty:
+        return pd.DataFrame()
+
+    agent_stats = filtered.groupby('Agent').agg(
+        Rounds=('Rounds', 'sum'),
+        Kills=('Kills', 'sum'),
+        Deaths=('Deaths', 'sum'),
+        Assists=('Assists', 'sum'),
+        ACS=('ACS', 'mean'),
+        FK=('FK', 'sum'),
+        Plants=('Plants', 'sum')
+    ).reset_index()
+
+    agent_stats['K/D Ratio'] = agent_stats['Kills'] / agent_stats['Deaths'].replace(0, float('nan'))
+    agent_stats['K+A per Round'] = (agent_stats['Kills'] + agent_stats['Assists']) / agent_stats['Rounds'].replace(0, float('nan'))
+
+    return agent_stats.round(2)[['Agent', 'Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'Plants', 'K/D Ratio', 'K+A per Round']]
+
+
+# 🆚 PLAYER COMPARISON
+# Stats that are ratios of totals (numerator columns, denominator columns), so they're sum/sum over games
+ROSTER_RATIO_STATS = {
+    'ACS': (['Combat_Score'], ['Rounds']),
+    'KPR': (['Kills'], ['Rounds']),
+    'FKPR': (['FK'], ['Rounds']),
+    'FK': (['FK'], ['Rounds']),
+    'FBSR': (['FK'], ['FK', 'FD']),
+    'K/D Ratio': (['Kills'], ['Deaths']),
+    'K+A per Round': (['Kills', 'Assists'], ['Rounds']),
+}
+# Stats that are already per game, averaged over games
+ROSTER_MEAN_STATS = ['FD', 'Assists', 'Multi_Kills', 'Anchor_Time', 'Atk_Entry']
+
+
+def pct_to_fraction(x):
+    """Like pct_to_float, but '55%' becomes 0.55 so mixed '55%' / 0.55 columns agree."""
+    text = x.astype(str)
+    values = pd.to_numeric(text.str.replace('%', '', regex=False), errors='coerce')
+    return values.where(~text.str.endswith('%'), values / 100)
+
+
+def roster_role_stats(player_df, start_date, end_date, selected_map, registry):
+    """
+    Role-level stats for every (Player, Role) pair in one grouped pass.
+
+    Ratio stats (ACS, KPR, FKPR, FBSR, K/D, K+A per round) are totals over
+    totals across every game on the role's agents; per-game stats (FD,
+    Assists, Multi_Kills, Anchor_Time, Atk_Entry) are means over games.
+    Returns a frame indexed by (Player, Role) with Games, Rounds and one
+    column per stat; missing stats are 0.
+    """
+    dates = player_df['Date'].dt.date
+    mask = (dates >= start_date) & (dates <= end_date)
+    if selected_map != "All":
+        mask &= player_df['Column 1'] == selected_map
+    games = player_df[mask]
+    stat_columns = list(ROSTER_RATIO_STATS) + ROSTER_MEAN_STATS
+    if games.empty:
+        return pd.DataFrame(columns=['Games', 'Rounds'] + stat_columns,
+                            index=pd.MultiIndex.from_arrays([[], []], names=['Player', 'Role']))
+
+    typed = pd.DataFrame({
+        'Player': games['Player'],
+        'Role': registry.roles_for(games['Agent']),
+    })
+    for col in ['Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'FD', 'Multi_Kills', 'Anchor_Time']:
+        typed[col] = pd.to_numeric(games[col], errors='coerce')
+    typed['Atk_Entry'] = pct_to_fraction(games['Atk_Entry']).fillna(0)
+    typed['Combat_Score'] = typed['ACS'] * typed['Rounds']
+    typed = typed.dropna(subset=['Player', 'Role'])
+
+    grouped = typed.groupby(['Player', 'Role'], sort=True)
+    totals = grouped[['Rounds', 'Kills', 'Deaths', 'Assists', 'FK', 'FD', 'Combat_Score']].sum()
+    roster = grouped[ROSTER_MEAN_STATS].mean()
+    roster.insert(0, 'Games', grouped.size())
+    roster.insert(1, 'Rounds', totals['Rounds'])
+    for stat, (numerator, denominator) in ROSTER_RATIO_STATS.items():
+        roster[stat] = totals[numerator].sum(axis=1) / totals[denominator].sum(axis=1).replace(0, np.nan)
+    return roster[['Games', 'Rounds'] + stat_columns].fillna(0)
@@ -0,0 +1,405 @@
+import datetime
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import analytics
+import artifacts
+import paging
+import pistol_tensor
+from deltas import load_day_aggregates, map_deltas, player_deltas, comp_deltas
+from lineup import PerformanceMatrix, best_lineups, comp_win_rates, LINEUP_SIZE, DEFAULT_TOP_K
+from opponents import OpponentIndex
+from pistol_tensor import load_pistol_tensor
+from registry import load_registry
+from round_store import load_round_store
+from result_cache import ResultCache, dataset_version, cache_dir_from_env, cache_size_from_env
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_cache = ResultCache(max_entries=cache_size_from_env(), disk_dir=cache_dir_from_env() or None)
+_data = {}
+_data_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+# 📥 Data, reloaded whenever the dataset version changes
+def _dataset():
+    # Handlers run in Starlette's threadpool: one thread reloads, and the new tables replace the old ones in one update
+    version = dataset_version()
+    if _data.get('version') != version:
+        with _data_lock:
+            if _data.get('version') != version:
+                score_df = analytics.load_score("cleaned_score.csv")
+                rounds = artifacts.fresh_or("round_store", lambda: load_round_store(score_df))
+                _data.update(
+                    version=version,
+                    score=score_df,
+                    form=analytics.load_form_blocks("form.csv"),
+                    players=analytics.load_player_form("form.csv"),
+                    rounds=rounds,
+                    pistols=artifacts.fresh_or("pistol_tensor", lambda: load_pistol_tensor(rounds)),
+                    registry=load_registry(),
+                    day_aggregates=None,
+                )
+    return _data
+
+
+def _day_aggregates():
+    """Per-day sums written by the ingest step, read once per dataset version (never written from here)."""
+    if _data.get('day_aggregates') is None:
+        _data['day_aggregates'] = load_day_aggregates(pd.read_csv("cleaned_score.csv"), pd.read_csv("form.csv"))
+    return _data['day_aggregates']
+
+
+def _cached(view, filters, compute):
+    return _cache.get_or_compute(_data['version'], view, filters, compute)
+
+
+# 🔎 Query parameters
+def _date_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be a YYYY-MM-DD date, got '{value}'")
+
+
+def _int_param(request, name, default):
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer, got '{value}'")
+
+
+def _map_param(request, maps):
+    selected_map = request.query_params.get("map", "All")
+    if selected_map != "All" and selected_map not in set(maps):
+        raise ApiError(404, f"Unknown map '{selected_map}'")
+    return selected_map
+
+
+def _player_param(request, player_df):
+    player = request.path_params["player"]
+    if player not in set(player_df['Player'].dropna()):
+        raise ApiError(404, f"Unknown player '{player}'")
+    return player
+
+
+def _player_dates(request, player_df):
+    """Player views default to the player's full date range, like the dashboard."""
+    start = _date_param(request, "start") or player_df['Date'].min().date()
+    end = _date_param(request, "end") or player_df['Date'].max().date()
+    return start, end
+
+
+# 📤 Responses
+def _etag(request, version):
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}|{_wants_arrow(request)}".encode()).hexdigest()[:16]
+    # Weak, since GZipMiddleware may re-encode the body
+    return f'W/"{version}-{digest}"'
+
+
+def _not_modified(request, etag):
+    sent = request.headers.get("if-none-match", "")
+    return any(tag.strip() in (etag, etag[2:], "*") for tag in sent.split(","))
+
+
+def _wants_arrow(request):
+    return request.query_params.get("format") == "arrow" or ARROW_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _page_params(request, df):
+    """
+    Optional paging: page, page_size, sort (a column, '-column' for descending)
+    and columns (comma separated). Returns the page and its paging metadata,
+    or the whole frame and None when page_size isn't given.
+    """
+    columns = request.query_params.get("columns")
+    if columns:
+        columns = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [c for c in columns if c not in df.columns]
+        if unknown:
+            raise ApiError(400, f"Unknown columns: {', '.join(unknown)}")
+        df = df[columns]
+
+    sort = request.query_params.get("sort")
+    if sort and sort.lstrip("-") not in df.columns:
+        raise ApiError(400, f"Unknown sort column '{sort.lstrip('-')}'")
+    page_size = _int_param(request, "page_size", None)
+    if page_size is None:
+        return (df.iloc[paging.sort_order(df, sort.lstrip("-"), not sort.startswith("-"))] if sort else df), None
+    if not 1 <= page_size <= max(paging.PAGE_SIZES):
+        raise ApiError(400, f"'page_size' must be between 1 and {max(paging.PAGE_SIZES)}")
+
+    order = paging.sort_order(df, sort.lstrip("-"), not sort.startswith("-")) if sort else None
+    page = _int_param(request, "page", 1)
+    rows, total, pages = paging.page_slice(df, page, page_size, order)
+    return rows, {"page": min(max(page, 1), pages), "pages": pages, "page_size": page_size, "total_rows": total}
+
+
+def _frame_response(request, df, etag):
+    df = df.drop(columns=['Composition'], errors='ignore').reset_index(drop=True)
+    df, page = _page_params(request, df)
+    df = df.reset_index(drop=True)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if page:
+        headers.update({f"X-{k.title().replace('_', '-')}": str(v) for k, v in page.items()})
+    if _wants_arrow(request):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue(), media_type=ARROW_MEDIA_TYPE, headers=headers)
+
+    body = {"version": _data['version'], **(page or {}), "rows": json.loads(df.to_json(orient="records", date_format="iso"))}
+    return JSONResponse(body, headers=headers)
+
+
+def endpoint(compute):
+    """
+    Wrap a view function (request -> DataFrame) with dataset loading,
+    ETag / If-None-Match handling and JSON or Arrow encoding. The handler is
+    synchronous, so Starlette runs it in its threadpool and a slow pandas
+    query doesn't block the event loop for other clients.
+    """
+    def handler(request):
+        version = _dataset()['version']
+        etag = _etag(request, version)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        try:
+            return _frame_response(request, compute(request), etag)
+        except ApiError as e:
+            return JSONResponse({"error": e.message}, status_code=e.status_code)
+
+    handler.__name__ = compute.__name__
+    handler.__doc__ = compute.__doc__
+    return handler
+
+
+# 📊 Views
+def map_summary(request):
+    """Games / W / D / L and win rate per map. Filters: start, end."""
+    start, end = _date_param(request, "start"), _date_param(request, "end")
+
+    def compute():
+        rows = analytics.score_between(_data['score'], start, end)
+        if rows.empty:
+            return pd.DataFrame(columns=['Map', 'Games', 'Wins', 'Draws', 'Losses', 'Win Rate'])
+        return analytics.map_overview(rows, rows['Date'].min(), rows['Date'].max())
+
+    return _cached("api_overview", {"start": start, "end": end}, compute)
+
+
+def compositions(request):
+    """Ranked compositions with W/D/L and Wilson interval. Filters: map, top."""
+    score_df, form_df = _data['score'], _data['form']
+    games_df = _cached("team_games", {}, lambda: artifacts.fresh_or("team_games", lambda: analytics.team_games(form_df, score_df)))
+    comp_stats = _cached("composition_stats", {}, lambda: artifacts.fresh_or("composition_stats", lambda: analytics.composition_stats(games_df)))
+    selected_map = _map_param(request, comp_stats['Map'])
+    top = _int_param(request, "top", 15)
+    if selected_map == "All":
+        return comp_stats.sort_values(by=['Wilson Low %', 'Shrunk WR %', 'games'], ascending=False).head(top)
+    return _cached("compositions", {"map": selected_map, "top": top},
+                   lambda: analytics.composition_table(comp_stats, selected_map, top))
+
+
+def side_win_rates(request):
+    """Attack / defence round win rates per map. Filters: map, start, end."""
+    score_df = _data['score']
+    selected_map = _map_param(request, score_df['Map'].dropna())
+    start, end = _date_param(request, "start"), _date_param(request, "end")
+    filters = {"map": selected_map, "start": start, "end": end}
+
+    def compute():
+        rows = analytics.filter_rounds(analytics.score_between(score_df, start, end), selected_map, None, None)
+        return analytics.round_summary(rows)
+
+    return _cached("api_round_summary", filters, compute)
+
+
+def pistol_conversion(request):
+    """Pistol win rate and WW / WL / LW / LL 2nd-round counts per map and side. Filters: map, start, end."""
+    pistols = _data['pistols']
+    selected_map = _map_param(request, pistols.map_names)
+    start, end = _date_param(request, "start"), _date_param(request, "end")
+
+    by_side = pistol_tensor.pistol_by_side(pistols, start, end)
+    counts = pistol_tensor.conversion_counts(pistols, start, end)
+    table = by_side.merge(counts, on=['Map', 'Side'], how='left').fillna({code: 0 for code in pistol_tensor.CONVERSION_CODES})
+    return table if selected_map == "All" else table[table['Map'] == selected_map]
+
+
+def player_agents(request):
+    """Per-agent totals and averages for one player. Filters: map, start, end."""
+    player_df = _data['players']
+    player = _player_param(request, player_df)
+    selected_map = _map_param(request, player_df['Column 1'].dropna())
+    start, end = _player_dates(request, player_df)
+    return _cached("player_agent_stats", {"player": player, "start": start, "end": end, "map": selected_map},
+                   lambda: analytics.player_agent_stats(player_df, player, start, end, selected_map))
+
+
+def role_comparison(request):
+    """Player vs benchmark value for every stat of every role played. Filters: map, start, end, region, season."""
+    player_df, registry = _data['players'], _data['registry']
+    player = _player_param(request, player_df)
+    selected_map = _map_param(request, player_df['Column 1'].dropna())
+    start, end = _player_dates(request, player_df)
+    region = request.query_params.get("region", registry.default_region)
+    season = request.query_params.get("season", registry.default_season)
+    if season not in registry.seasons(region):
+        raise ApiError(404, f"No benchmarks for {region} {season}")
+
+    roster = _cached("roster_role_stats", {"start": start, "end": end, "map": selected_map},
+                     lambda: analytics.roster_role_stats(player_df, start, end, selected_map, registry))
+    if player not in roster.index.get_level_values('Player'):
+        return pd.DataFrame(columns=['Role', 'Stat', 'Player', 'Benchmark'])
+    player_roles = roster.loc[player]
+    rows = [{'Role': role, 'Stat': stat, 'Player': player_roles.loc[role, stat], 'Benchmark': value}
+            for role, benchmark in registry.role_benchmarks(region, season).items() if role in player_roles.index
+            for stat, value in benchmark.items()]
+    return pd.DataFrame(rows, columns=['Role', 'Stat', 'Player', 'Benchmark'])
+
+
+def _opponent_param(request):
+    index = _cached("opponent_index", {}, lambda: OpponentIndex(_data['score']))
+    opponent = request.path_params["opponent"]
+    if opponent not in set(index.names):
+        raise ApiError(404, f"Unknown opponent '{opponent}'")
+    return index, opponent
+
+
+def opponent_list(request):
+    """Games / W / D / L, win rate and last game date per opponent, most played first."""
+    index = _cached("opponent_index", {}, lambda: OpponentIndex(_data['score']))
+    return _cached("opponent_table", {}, index.opponent_table)
+
+
+def opponent_maps(request):
+    """Head-to-head record per map against one opponent. Filters: start, end."""
+    index, opponent = _opponent_param(request)
+    start, end = _date_param(request, "start"), _date_param(request, "end")
+    return _cached("opponent_maps", {"opponent": opponent, "start": start, "end": end},
+                   lambda: index.map_records(opponent, start, end))
+
+
+def opponent_sides(request):
+    """Attack / defence round and pistol win rates per map against one opponent. Filters: start, end."""
+    index, opponent = _opponent_param(request)
+    start, end = _date_param(request, "start"), _date_param(request, "end")
+    return _cached("opponent_sides", {"opponent": opponent, "start": start, "end": end},
+                   lambda: index.side_rates(opponent, start, end))
+
+
+def _role_limits_param(request, roles):
+    """'roles=1-2,1-2,1-2,1-2': min-max per role, in registry role order (default 1-2 each)."""
+    value = request.query_params.get("roles")
+    if not value:
+        return {role: (1, 2) for role in roles}
+    try:
+        limits = [tuple(int(x) for x in part.split("-")) for part in value.split(",")]
+    except ValueError:
+        limits = []
+    if len(limits) != len(roles) or any(len(lim) != 2 or not 0 <= lim[0] <= lim[1] <= LINEUP_SIZE for lim in limits):
+        raise ApiError(400, f"'roles' must be {len(roles)} comma-separated min-max pairs ({', '.join(roles)})")
+    return dict(zip(roles, limits))
+
+
+def lineups(request):
+    """Top-k agent assignments by expected ACS for five players. Filters: players (comma-separated), map, roles, top, new."""
+    player_df, registry = _data['players'], _data['registry']
+    perf = _cached("performance_matrix", {}, lambda: PerformanceMatrix(player_df, registry))
+    players = [p for p in request.query_params.get("players", "").split(",") if p]
+    if len(set(players)) != LINEUP_SIZE:
+        raise ApiError(400, f"'players' must name {LINEUP_SIZE} different players")
+    unknown = [p for p in players if p not in perf.players]
+    if unknown:
+        raise ApiError(404, f"Unknown player '{unknown[0]}'")
+    selected_map = _map_param(request, perf.maps)
+    role_limits = _role_limits_param(request, registry.roles)
+    top = min(max(_int_param(request, "top", DEFAULT_TOP_K), 1), 50)
+    allow_new = request.query_params.get("new", "false").lower() in ("1", "true", "yes")
+
+    def compute():
+        score_df, form_df = _data['score'], _data['form']
+        games_df = _cached("team_games", {}, lambda: analytics.team_games(form_df, score_df))
+        comp_stats = _cached("composition_stats", {}, lambda: analytics.composition_stats(games_df))
+        return best_lineups(perf, players, selected_map, role_limits, top, allow_new,
+                            comp_win_rates(comp_stats, selected_map, registry))
+
+    # Same entry as the dashboard's lineup expander, so the cached frame keeps Agents; it's dropped from the response only
+    table = _cached("lineups", {"players": players, "map": selected_map, "roles": role_limits, "top": top, "new": allow_new}, compute)
+    return table.drop(columns='Agents')
+
+
+DELTA_VIEWS = {"maps": map_deltas, "players": player_deltas, "comps": comp_deltas}
+
+
+def day_deltas(request):
+    """Map / player / comp changes on one scrim day against everything before it. Filters: day (default: latest day with score rows)."""
+    kind = request.path_params["kind"]
+    if kind not in DELTA_VIEWS:
+        raise ApiError(404, f"Unknown delta view '{kind}' (use {', '.join(DELTA_VIEWS)})")
+    aggregates = _day_aggregates()
+    days = aggregates.days()
+    day = _date_param(request, "day") or aggregates.latest_score_day()
+    if day not in set(days):
+        raise ApiError(404, f"No scrim on {day}")
+    return _cached(f"{kind[:-1]}_deltas", {"day": day}, lambda: DELTA_VIEWS[kind](aggregates, day))
+
+
+def version(request):
+    """Current dataset version and result cache stats."""
+    return JSONResponse({"version": _dataset()['version'], "cache": _cache.stats()})
+
+
+routes = [
+    Route("/version", version),
+    Route("/maps/summary", endpoint(map_summary)),
+    Route("/compositions", endpoint(compositions)),
+    Route("/sides", endpoint(side_win_rates)),
+    Route("/pistol/conversion", endpoint(pistol_conversion)),
+    Route("/players/{player}/agents", endpoint(player_agents)),
+    Route("/players/{player}/roles", endpoint(role_comparison)),
+    Route("/opponents", endpoint(opponent_list)),
+    Route("/opponents/{opponent}/maps", endpoint(opponent_maps)),
+    Route("/opponents/{opponent}/sides", endpoint(opponent_sides)),
+    Route("/lineups", endpoint(lineups)),
+    Route("/deltas/{kind}", endpoint(day_deltas)),
+]
+
+app = Starlette(routes=routes, middleware=[Middleware(GZipMiddleware, minimum_size=1024)])
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.environ.get("DASHBOARD_API_PORT", 8502))
+    uvicorn.run(app, host="127.0.0.1", port=port)
@@ -0,0 +1,352 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+import analytics
+import figures
+import pistol_tensor
+from data_cleaner import clean_scrim_form, clean_round_log
+from pistol_tensor import PistolTensor, PISTOL_TENSOR_PATH
+from registry import load_registry
+from round_store import RoundStore
+
+ARTIFACT_DIR = ".artifacts"
+MANIFEST_FILE = "manifest.json"
+
+
+class Node:
+    """
+    One derived artifact: `build` gets the values of `inputs` (other nodes) and
+    may read `files` (source files) or write `outputs` (files other tools read).
+    """
+
+    def __init__(self, name, build, inputs=(), files=(), outputs=()):
+        self.name = name
+        self.build = build
+        self.inputs = tuple(inputs)
+        self.files = tuple(files)
+        self.outputs = tuple(outputs)
+
+
+# 🧱 Builders
+def _cleaned_score():
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = clean_scrim_form("score.csv")
+    df.to_csv("cleaned_score.csv", index=False)
+    return df
+
+
+def _round_store(score_df):
+    # Full round log if we have one, otherwise the rounds the summary pins down
+    if os.path.exists("rounds.csv"):
+        rounds = RoundStore.from_round_log(clean_round_log("rounds.csv"))
+    else:
+        rounds = RoundStore.from_score_summary(score_df)
+    rounds.save("rounds.npz")
+    return rounds
+
+
+def _pistol_tensor(rounds):
+    tensor = PistolTensor.from_round_store(rounds)
+    tensor.save(PISTOL_TENSOR_PATH)
+    return tensor
+
+
+def _map_overview(score_df):
+    dates = sorted(score_df['Date'].dropna().unique())
+    return analytics.map_overview(score_df, dates[0], dates[-1]) if dates else pd.DataFrame()
+
+
+def _player_range(player_df):
+    return player_df['Date'].min().date(), player_df['Date'].max().date()
+
+
+def _roster_roles(player_df):
+    start, end = _player_range(player_df)
+    return analytics.roster_role_stats(player_df, start, end, "All", load_registry())
+
+
+def _agent_stats(player_df):
+    """Every player's agent table over the full date range, {player: frame}."""
+    start, end = _player_range(player_df)
+    return {player: analytics.player_agent_stats(player_df, player, start, end, "All")
+            for player in sorted(player_df['Player'].dropna().unique())}
+
+
+def _figure_json(fig):
+    return json.loads(fig.to_json())
+
+
+def _figure_specs(overview, tensor):
+    """Plotly JSON of the default Overview and Pistol Insights charts, plus both 2nd-round pies per map."""
+    specs = {'conversions': {}}
+    if not overview.empty:
+        specs['map_winrate'] = _figure_json(figures.map_winrate_bar(overview))
+    pistol_maps = pistol_tensor.pistol_by_map(tensor)
+    if not pistol_maps.empty:
+        specs['pistol'] = _figure_json(figures.pistol_bar(pistol_maps))
+    by_side = pistol_tensor.pistol_by_side(tensor)
+    if not by_side.empty:
+        specs['pistol_side'] = _figure_json(figures.pistol_side_bar(by_side))
+    for selected_map in tensor.map_names:
+        pies = {}
+        win = pistol_tensor.conversion_shares(tensor, selected_map, ['WW', 'WL'])
+        if not win.empty:
+            pies['win'] = _figure_json(figures.conversion_pie(
+                win, f"Pistol Conversion - {selected_map}", {'WW': '#FDB913', 'WL': '#666666'}))
+        loss = pistol_tensor.conversion_shares(tensor, selected_map, ['LL', 'LW'])
+        if not loss.empty:
+            pies['loss'] = _figure_json(figures.conversion_pie(
+                loss, f"Eco Round Outcomes - {selected_map}", {'LL': '#444444', 'LW': '#3b82f6'}))
+        specs['conversions'][str(selected_map)] = pies
+    return specs
+
+
+# In dependency order: every node comes after its inputs
+NODES = {node.name: node for node in [
+    Node("cleaned_score", _cleaned_score, files=["score.csv"], outputs=["cleaned_score.csv"]),
+    Node("score", lambda _: analytics.load_score("cleaned_score.csv"), inputs=["cleaned_score"], files=["cleaned_score.csv"]),
+    Node("form_blocks", lambda: analytics.load_form_blocks("form.csv"), files=["form.csv"]),
+    Node("players", lambda: analytics.load_player_form("form.csv"), files=["form.csv"]),
+    Node("team_games", lambda score_df, form_df: analytics.team_games(form_df, score_df), inputs=["score", "form_blocks"]),
+    Node("composition_stats", analytics.composition_stats, inputs=["team_games"]),
+    Node("round_store", _round_store, inputs=["score"], files=["rounds.csv"], outputs=["rounds.npz"]),
+    Node("pistol_tensor", _pistol_tensor, inputs=["round_store"], outputs=[PISTOL_TENSOR_PATH]),
+    Node("map_overview", _map_overview, inputs=["score"]),
+    Node("roster_roles", _roster_roles, inputs=["players"], files=["registry.json"]),
+    Node("agent_stats", _agent_stats, inputs=["players"]),
+    Node("figure_specs", _figure_specs, inputs=["map_overview", "pistol_tensor"]),
+]}
+
+
+# 🔑 Hashing
+_hash_memo = {}
+
+
+def file_hash(path):
+    """
+    Content hash of a source file (None when it doesn't exist, so creating it
+    makes dependents stale). Only recomputed when the file's size or mtime changes.
+    """
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    stamp = (path, st_.st_size, st_.st_mtime_ns)
+    if stamp not in _hash_memo:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _hash_memo[stamp] = digest.hexdigest()
+    return _hash_memo[stamp]
+
+
+def node_key(node, input_hashes, file_hashes):
+    """
+    Hash of everything a node is built from: its source files' contents and its
+    inputs' output hashes. `file_hashes` memoizes file_hash per path.
+    """
+    for path in node.files:
+        if path not in file_hashes:
+            file_hashes[path] = file_hash(path)
+    parts = {
+        'node': node.name,
+        'files': {path: file_hashes[path] for path in node.files},
+        'inputs': {name: input_hashes[name] for name in node.inputs},
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# 💾 Storage
+def _artifact_path(name, base_dir):
+    return os.path.join(base_dir, f"{name}.pkl")
+
+
+def load(name, base_dir=ARTIFACT_DIR):
+    """The last built value of one node."""
+    with open(_artifact_path(name, base_dir), "rb") as f:
+        return pickle.load(f)
+
+
+def load_manifest(base_dir=ARTIFACT_DIR):
+    try:
+        with open(os.path.join(base_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest, base_dir):
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _is_fresh(node, key, entry, base_dir):
+    return (
+        entry is not None and entry.get('key') == key and
+        os.path.exists(_artifact_path(node.name, base_dir)) and
+        all(os.path.exists(path) for path in node.outputs)
+    )
+
+
+def build_node(name, base_dir=ARTIFACT_DIR):
+    """Build one node from its stored inputs and store the result. Returns (output hash, seconds); runs in a worker process."""
+    node = NODES[name]
+    t0 = time.perf_counter()
+    value = node.build(*[load(i, base_dir) for i in node.inputs])
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    path = _artifact_path(name, base_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return hashlib.sha1(data).hexdigest()[:16], time.perf_counter() - t0
+
+
+# 🏗️ Building
+def with_inputs(targets):
+    """`targets` plus every node they depend on, in dependency order."""
+    unknown = [t for t in targets if t not in NODES]
+    if unknown:
+        raise ValueError(f"❌ Unknown artifacts: {', '.join(unknown)} (known: {', '.join(NODES)})")
+    needed = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(NODES[name].inputs)
+    return [name for name in NODES if name in needed]
+
+
+def build(targets=None, workers=None, force=False, base_dir=ARTIFACT_DIR):
+    """
+    Bring `targets` (default: every node) up to date, rebuilding only nodes
+    whose key changed. A node is scheduled as soon as its inputs are done, so
+    independent nodes build in parallel on `workers` processes (0 or 1 builds
+    in this process). When a rebuilt node's output hash is unchanged, nodes
+    downstream of it stay fresh.
+    Returns [(node, status, seconds)] in completion order; status is
+    'fresh', 'built' or 'unchanged' (rebuilt, same output).
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    workers = os.cpu_count() if workers is None else workers
+    waiting = with_inputs(targets or list(NODES))
+    manifest = load_manifest(base_dir)
+    # Hashed when a node is scheduled, so files written by its inputs (cleaned_score.csv) are final
+    file_hashes = {}
+    hashes = {}
+    results = []
+
+    def finish(name, key, output, seconds):
+        previous = manifest.get(name, {}).get('output')
+        hashes[name] = output
+        for path in NODES[name].outputs:
+            file_hashes.pop(path, None)
+        manifest[name] = {'key': key, 'output': output, 'seconds': round(seconds, 4),
+                          'built': time.strftime('%Y-%m-%d %H:%M:%S')}
+        _save_manifest(manifest, base_dir)
+        results.append((name, 'unchanged' if output == previous else 'built', seconds))
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    running = {}
+    try:
+        while waiting or running:
+            for name in list(waiting):
+                node = NODES[name]
+                if any(i not in hashes for i in node.inputs):
+                    continue
+                waiting.remove(name)
+                key = node_key(node, hashes, file_hashes)
+                entry = manifest.get(name)
+                if not force and _is_fresh(node, key, entry, base_dir):
+                    hashes[name] = entry['output']
+                    results.append((name, 'fresh', 0.0))
+                elif executor:
+                    running[executor.submit(build_node, name, base_dir)] = (name, key)
+                else:
+                    finish(name, key, *build_node(name, base_dir))
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    finish(name, key, *future.result())
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    return results
+
+
+def status(base_dir=ARTIFACT_DIR):
+    """
+    [(node, state)] without building: 'fresh', 'stale' (own files or missing
+    artifact) or 'stale input' (an input will be rebuilt, so it may change).
+    """
+    manifest = load_manifest(base_dir)
+    file_hashes = {}
+    hashes = {name: entry.get('output') for name, entry in manifest.items()}
+    states = {}
+    for name, node in NODES.items():
+        key = node_key(node, {i: hashes.get(i) for i in node.inputs}, file_hashes)
+        if not _is_fresh(node, key, manifest.get(name), base_dir):
+            states[name] = 'stale'
+        elif any(states[i] != 'fresh' for i in node.inputs):
+            states[name] = 'stale input'
+        else:
+            states[name] = 'fresh'
+    return list(states.items())
+
+
+# 📥 Reading built values
+def fresh(name, base_dir=ARTIFACT_DIR):
+    """
+    The stored value of `name` when it and every input are up to date with the
+    source files, else None. Nothing is built; run `python artifacts.py` for that.
+    """
+    if dict(status(base_dir)).get(name) != 'fresh':
+        return None
+    try:
+        return load(name, base_dir)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def fresh_or(name, compute, base_dir=ARTIFACT_DIR):
+    """fresh(name), or compute() when the artifact is missing or stale."""
+    value = fresh(name, base_dir)
+    return compute() if value is None else value
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the derived data artifacts whose inputs changed.")
+    parser.add_argument("command", choices=["build", "status"], nargs="?", default="build")
+    parser.add_argument("targets", nargs="*", help=f"nodes to bring up to date (default: all of {', '.join(NODES)})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 0 builds in-process)")
+    parser.add_argument("--force", action="store_true", help="rebuild even fresh nodes")
+    parser.add_argument("--dir", default=ARTIFACT_DIR, help=f"artifact folder (default: {ARTIFACT_DIR})")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for name, state in status(args.dir):
+            print(f"{'✅' if state == 'fresh' else '🔄'} {name:<18} {state}")
+    else:
+        t0 = time.perf_counter()
+        results = build(args.targets, args.workers, args.force, args.dir)
+        icons = {'fresh': '✅', 'built': '🔨', 'unchanged': '♻️'}
+        for name, state, seconds in results:
+            print(f"{icons[state]} {name:<18} {state:<10} {seconds * 1000:8.1f} ms")
+        rebuilt = sum(state != 'fresh' for _, state, _ in results)
+        print(f"🏗️ Rebuilt {rebuilt} of {len(results)} artifacts in {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+import analytics
+from registry import load_registry
+
+# popcount for every byte value, used when np.bitwise_count isn't available
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(masks):
+    """Number of set bits in each uint64 mask."""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.int64)
+    return _BYTE_POPCOUNT[masks.view(np.uint8)].reshape(len(masks), 8).sum(axis=1).astype(np.int64)
+
+
+class CompIndex:
+    """
+    Bitset index over every game's 5-agent composition.
+
+    Each agent is one bit of a uint64 mask, so "contains Omen + Sova",
+    "within one swap of X" and role-shape grouping are a handful of
+    vectorized AND / popcount operations over all games at once.
+    """
+
+    def __init__(self, games, registry=None):
+        registry = registry or load_registry()
+        agent_roles = registry.agent_roles
+        games = games[games['Valid']].reset_index(drop=True)
+
+        # Canonical agent names (case-insensitive, so 'Kay/o' == 'KAY/O')
+        self._canonical = {a.lower(): a for a in agent_roles}
+        played = sorted({a for comp in games['Composition'] for a in comp})
+        for agent in played:
+            self._canonical.setdefault(agent.lower(), agent)
+        self.agents = sorted(set(self._canonical.values()))
+        if len(self.agents) > 64:
+            raise ValueError(f"❌ {len(self.agents)} agents don't fit in a 64-bit mask")
+        self.bit = {agent: np.uint64(1) << np.uint64(i) for i, agent in enumerate(self.agents)}
+
+        self.roles = {agent: agent_roles.get(agent, 'Unknown') for agent in self.agents}
+        self.role_masks = {
+            role: self._mask_of([a for a in self.agents if self.roles[a] == role])
+            for role in registry.roles
+        }
+
+        self.games = games
+        self.maps = games['Map'].to_numpy()
+        self.masks = np.array([self._mask_of(comp) for comp in games['Composition']], dtype=np.uint64)
+        result = games['Result'].str.lower()
+        self.wins = (result == 'win').to_numpy()
+        self.draws = (result == 'draw').to_numpy()
+        self.losses = (result == 'loss').to_numpy()
+
+        role_counts = np.stack([popcount(self.masks & m) for m in self.role_masks.values()], axis=1) \
+            if len(self.masks) else np.zeros((0, len(registry.roles)), dtype=np.int64)
+        self.role_counts = role_counts
+        self.shapes = np.array(['-'.join(map(str, row)) for row in role_counts], dtype=object)
+
+    def canonical(self, agent):
+        return self._canonical.get(agent.lower(), agent)
+
+    def _mask_of(self, agents):
+        mask = np.uint64(0)
+        for agent in agents:
+            mask |= self.bit[self.canonical(agent)]
+        return mask
+
+    def _map_filter(self, selected_map):
+        if selected_map in (None, "All"):
+            return np.ones(len(self.masks), dtype=bool)
+        return self.maps == selected_map
+
+    def containing(self, agents, selected_map=None):
+        """Boolean mask of games whose comp includes every agent in `agents`."""
+        query = self._mask_of(agents)
+        return ((self.masks & query) == query) & self._map_filter(selected_map)
+
+    def within_swaps(self, composition, swaps=1, selected_map=None):
+        """Boolean mask of games whose comp differs from `composition` by at most `swaps` agents."""
+        query = self._mask_of(composition)
+        shared = popcount(self.masks & query)
+        return (shared >= len(composition) - swaps) & self._map_filter(selected_map)
+
+    def with_shape(self, shape, selected_map=None):
+        """Boolean mask of games with a role shape like '2-1-1-1' (Duelist-Initiator-Controller-Sentinel)."""
+        return (self.shapes == shape) & self._map_filter(selected_map)
+
+    def summarize(self, selected):
+        """Per-composition W/D/L and win rate for the selected games."""
+        return analytics.composition_stats(self.games[selected]).sort_values(
+            by=['Wilson Low %', 'games'], ascending=False
+        ).reset_index(drop=True)
+
+    def shape_table(self, selected_map=None):
+        """Games, W/D/L and win rate per role shape."""
+        keep = self._map_filter(selected_map)
+        if not keep.any():
+            return pd.DataFrame(columns=['Shape', 'games', 'wins', 'draws', 'losses', 'Win Rate %'])
+
+        shape_codes, shape_idx = np.unique(self.shapes[keep].astype(str), return_inverse=True)
+        games = np.bincount(shape_idx)
+        wins = np.bincount(shape_idx, weights=self.wins[keep]).astype(int)
+        draws = np.bincount(shape_idx, weights=self.draws[keep]).astype(int)
+        losses = np.bincount(shape_idx, weights=self.losses[keep]).astype(int)
+        table = pd.DataFrame({
+            'Shape': shape_codes,
+            'games': games,
+            'wins': wins,
+            'draws': draws,
+            'losses': losses,
+            'Win Rate %': wins / games * 100,
+        })
+        return table.sort_values(by=['games', 'Win Rate %'], ascending=False).reset_index(drop=True)
@@ -0,0 +1,582 @@
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import pistol_tensor
+from comp_index import CompIndex
+from data_cleaner import clean_scrim_form
+from deltas import DayAggregates
+from opponents import OpponentIndex
+from pistol_tensor import PistolTensor
+from registry import load_registry
+from round_store import RoundStore
+
+MAPS = ['Ascent', 'Bind', 'Haven', 'Icebox', 'Lotus', 'Split', 'Sunset']
+OPPONENTS = ['Team Secret', 'RRQ Academy', 'Boom Esports', 'Bleed', 'Talon', 'Global Esports']
+PLAYERS = ['Spring', 'Lysoar', 'Juicy', 'SiuFatBB', 'Yuicaw', 'Kaze']
+OUTCOMES = ['Win', 'Loss', 'Draw']
+SCORE_COLUMNS = ['Date', 'Map', 'Start', 'First Pistol', 'First Rounds', 'First Half WR', 'Second Pistol',
+                 'Second Rounds', 'Second Half WR', 'Atk_PP_Success', 'Def_PP_Success', 'Atk 2nd', 'Def 2nd', 'Outcome']
+FLOAT_RTOL = 1e-9
+# Share of games whose Atk 2nd / Def 2nd code doesn't start with that half's pistol result
+DISAGREE_RATE = 0.1
+
+
+# 🎲 Random scrim datasets
+def random_dataset(seed, max_games=120):
+    """
+    A random raw score sheet (date separator rows + match rows, as the sheet
+    is exported) and a matching form.csv with one 5-player block per game.
+    Some blocks are corrupted (mixed maps / results) or have no score row,
+    so the "valid game" logic is exercised too, and some 2nd-round codes
+    disagree with the pistol columns, like hand-typed sheets do.
+    """
+    rng = np.random.default_rng(seed)
+    registry = load_registry()
+    agents = np.array(registry.agent_names)
+    n_days = int(rng.integers(1, 9))
+    start = datetime.date(2025, 1, 1) + datetime.timedelta(days=int(rng.integers(0, 300)))
+    days = sorted({start + datetime.timedelta(days=int(d)) for d in rng.integers(0, 120, n_days)})
+    maps = list(rng.choice(MAPS, size=int(rng.integers(1, len(MAPS) + 1)), replace=False))
+
+    ordinal = bool(rng.random() < 0.5)
+
+    raw_rows, form_rows = [], []
+    for day in days:
+        # Separators as the sheet writes them ("1st April 2025") or plain ("01 April 2025")
+        label = f"{day.day}{_ordinal_suffix(day.day)} {day.strftime('%B %Y')}" if ordinal else day.strftime('%d %B %Y')
+        raw_rows.append([label] + [np.nan] * (len(SCORE_COLUMNS) - 1))
+        for _ in range(int(rng.integers(1, max(2, max_games // len(days)) + 1))):
+            game_map = str(rng.choice(maps))
+            starts_attack = bool(rng.random() < 0.5)
+            first_pistol, second_pistol = (int(x) for x in rng.integers(0, 2, 2))
+            first_r2, second_r2 = (int(x) for x in rng.integers(0, 2, 2))
+            first_rounds = int(rng.integers(first_pistol + first_r2, 13))
+            second_rounds = int(rng.integers(second_pistol + second_r2, 13))
+            outcome = str(rng.choice(OUTCOMES, p=[0.45, 0.45, 0.1]))
+            first_code = 'LW'[first_pistol] + 'LW'[first_r2]
+            second_code = 'LW'[second_pistol] + 'LW'[second_r2]
+            if rng.random() < DISAGREE_RATE:
+                first_code = 'LW'[1 - first_pistol] + first_code[1]
+            if rng.random() < DISAGREE_RATE:
+                second_code = 'LW'[1 - second_pistol] + second_code[1]
+            raw_rows.append([
+                str(rng.choice(OPPONENTS)), game_map, 'Attack' if starts_attack else 'Defence',
+                first_pistol, first_rounds, round(first_rounds / 12, 2), second_pistol, second_rounds, round(second_rounds / 12, 2),
+                f"{rng.random() * 100:.2f}%", f"{rng.random() * 100:.2f}%",
+                first_code if starts_attack else second_code, second_code if starts_attack else first_code, outcome,
+            ])
+
+            # 5-player block; occasionally corrupted or not matching any score row
+            roster = rng.choice(PLAYERS, size=5, replace=False)
+            comp = rng.choice(agents[:12] if rng.random() < 0.7 else agents, size=5, replace=False)
+            block_map = [game_map] * 5
+            block_result = [outcome] * 5
+            if rng.random() < 0.05:
+                block_map[int(rng.integers(0, 5))] = str(rng.choice(MAPS))
+            if rng.random() < 0.05:
+                block_result = ['Loss' if outcome == 'Win' else 'Win'] * 5
+            rounds = first_rounds + second_rounds + int(rng.integers(1, 12))
+            for player, agent, row_map, row_result in zip(roster, comp, block_map, block_result):
+                kills, deaths, assists = (int(x) for x in rng.integers(0, 30, 3))
+                fk, fd = (int(x) for x in rng.integers(0, 7, 2))
+                form_rows.append({
+                    'Column 1': row_map, 'Player': player, 'Rounds': rounds, 'Kills': kills, 'Deaths': deaths,
+                    'Assists': assists, 'ACS': int(rng.integers(60, 400)), 'Agent': agent, 'FK': fk,
+                    'Plants': int(rng.integers(0, 5)), 'Defuses': int(rng.integers(0, 3)), 'FD': fd, 'FK+FD': fk + fd,
+                    'FBSR': round(fk / (fk + fd), 3) if fk + fd else 0, 'FKPR': round(fk / rounds, 2),
+                    'KPR': round(kills / rounds, 2), 'Date': f"{day.month}/{day.day}/{day.year}",
+                    'K+A PR': round((kills + assists) / rounds, 2), 'Atk_Entry': round(rng.random(), 2),
+                    'Multi_Kills': round(rng.random() * 0.4, 2),
+                    'Anchor_Time': round(rng.random() * 80, 1) if rng.random() < 0.8 else np.nan,
+                    'Result': row_result, 'KAST': 0,
+                })
+
+    raw = pd.DataFrame(raw_rows, columns=SCORE_COLUMNS)
+    return raw, pd.DataFrame(form_rows)
+
+
+def _ordinal_suffix(day):
+    if 11 <= day <= 13:
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+
+
+def legacy_dates(score_df):
+    """
+    The cleaned table as older cleaners saved it (and as cleaned_score.csv
+    ships): dd/mm/yyyy dates, with rows whose day is 12 or less first, so a
+    parser that guesses the format from the first row reads them month-first.
+    """
+    dates = pd.to_datetime(score_df['Date'])
+    legacy = score_df.assign(Date=dates.dt.strftime('%d/%m/%Y'))
+    return legacy.iloc[np.argsort(dates.dt.day.to_numpy() > 12, kind='stable')].reset_index(drop=True)
+
+
+def pistol_aligned(score_df):
+    """
+    Atk 2nd / Def 2nd with the first letter replaced by that half's pistol
+    result. RoundStore (and the pistol tensor) read the pistol from First /
+    Second Pistol and only the round-2 letter from the code, so where a sheet's
+    code disagrees with its pistol column this is what the fast path counts.
+    """
+    attack_first = score_df['Start'] == 'Attack'
+    atk_pistol = score_df['First Pistol'].where(attack_first, score_df['Second Pistol'])
+    def_pistol = score_df['Second Pistol'].where(attack_first, score_df['First Pistol'])
+    return score_df.assign(**{
+        'Atk 2nd': atk_pistol.map({0: 'L', 1: 'W'}) + score_df['Atk 2nd'].astype(str).str[1:2],
+        'Def 2nd': def_pistol.map({0: 'L', 1: 'W'}) + score_df['Def 2nd'].astype(str).str[1:2],
+    })
+
+
+def disagreeing_codes(score_df):
+    """Number of Atk 2nd / Def 2nd codes whose first letter isn't that half's pistol result."""
+    aligned = pistol_aligned(score_df)
+    return int((aligned['Atk 2nd'] != score_df['Atk 2nd']).sum() + (aligned['Def 2nd'] != score_df['Def 2nd']).sum())
+
+
+def prepare(raw, form, legacy=False):
+    """
+    Run the raw sheet through clean_scrim_form (via a CSV, like data_cleaner.py)
+    and load both tables the usual way. With `legacy`, the cleaned table is
+    saved with dd/mm dates first (see legacy_dates); 'score_iso' always holds
+    the same rows with ISO dates, for references that filter on real dates.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path, score_path, form_path = (os.path.join(tmp, name) for name in ("score.csv", "cleaned_score.csv", "form.csv"))
+        raw.to_csv(raw_path, index=False)
+        form.to_csv(form_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cleaned = clean_scrim_form(raw_path)
+        if legacy:
+            cleaned = legacy_dates(cleaned)
+        cleaned.to_csv(score_path, index=False)
+        score = analytics.load_score(score_path)
+        return {
+            'score': score,
+            'score_iso': score.assign(Date=pd.to_datetime(cleaned['Date'], format='%d/%m/%Y' if legacy else '%Y-%m-%d').dt.strftime('%Y-%m-%d')),
+            'form_blocks': analytics.load_form_blocks(form_path),
+            'players': analytics.load_player_form(form_path),
+            'raw_games': int(raw['Map'].notna().sum()),
+        }
+
+
+# 📚 Reference implementations (the original pandas logic from the dashboard tabs)
+def ref_map_overview(score_df, start_date, end_date):
+    filtered_score = score_df[(score_df['Date'] >= start_date) & (score_df['Date'] <= end_date)]
+    summary = filtered_score.groupby('Map').agg(
+        Games=('Outcome', 'count'),
+        Wins=('Outcome', lambda x: (x.str.lower() == 'win').sum()),
+        Draws=('Outcome', lambda x: (x.str.lower() == 'draw').sum()),
+        Losses=('Outcome', lambda x: (x.str.lower() == 'loss').sum())
+    ).reset_index()
+    summary['Win Rate'] = summary['Wins'] / summary['Games']
+    return summary.sort_values(by='Map')
+
+
+def ref_comp_table(form_df, score_df, selected_map):
+    teams = []
+    filtered_dates = set(score_df['Date'])
+    for i in range(0, len(form_df) - 4, 5):
+        block = form_df.iloc[i:i+5]
+        map_match = block['Column 1'].iloc[0]
+        result_match = block['Result'].iloc[0]
+
+        if (
+            len(block) == 5 and
+            block['Column 1'].nunique() == 1 and
+            block['Result'].nunique() == 1 and
+            block['Column 1'].iloc[0] == selected_map
+        ):
+            match_filter = (
+                (score_df['Map'] == map_match) &
+                (score_df['Outcome'].str.lower() == result_match.lower()) &
+                (score_df['Date'].isin(filtered_dates))
+            )
+            if not score_df[match_filter].empty:
+                agents = tuple(sorted(block['Agent'].tolist()))
+                teams.append({
+                    'Composition': agents,
+                    'Result': result_match
+                })
+
+    df = pd.DataFrame(teams)
+    if df.empty:
+        return pd.DataFrame(columns=['Comp String', 'games', 'wins', 'draws', 'losses', 'Win Rate %'])
+    df['Win'] = df['Result'].apply(lambda x: 1 if x.lower() == 'win' else 0)
+    df['Draw'] = df['Result'].apply(lambda x: 1 if x.lower() == 'draw' else 0)
+    df['Loss'] = df['Result'].apply(lambda x: 1 if x.lower() == 'loss' else 0)
+    df['Game'] = 1
+
+    grouped = df.groupby('Composition').agg(
+        games=('Game', 'sum'),
+        wins=('Win', 'sum'),
+        draws=('Draw', 'sum'),
+        losses=('Loss', 'sum')
+    ).reset_index()
+
+    grouped['Win Rate %'] = grouped['wins'] / grouped['games'] * 100
+    grouped['Comp String'] = grouped['Composition'].apply(lambda x: '-'.join(x))
+    return grouped[['Comp String', 'games', 'wins', 'draws', 'losses', 'Win Rate %']]
+
+
+def in_window(score_df, start_date, end_date):
+    """Score rows dated within [start_date, end_date] (ISO strings, as in 'score_iso')."""
+    return score_df[(score_df['Date'] >= start_date) & (score_df['Date'] <= end_date)]
+
+
+def ref_pistol_by_map(score_df, start_date, end_date):
+    filtered_df = in_window(score_df, start_date, end_date).copy()
+    filtered_df['Total Pistols Won'] = filtered_df['First Pistol'] + filtered_df['Second Pistol']
+    grouped = filtered_df.groupby('Map').agg(
+        Total_Pistols_Won=('Total Pistols Won', 'sum'),
+        Total_Pistols_Played=('Map', 'count')
+    ).reset_index()
+
+    grouped['Total_Pistols_Played'] *= 2  # 2 pistol rounds per map
+    grouped['Pistol Win Rate (%)'] = (grouped['Total_Pistols_Won'] / grouped['Total_Pistols_Played']) * 100
+    return grouped.sort_values(by='Pistol Win Rate (%)', ascending=False)
+
+
+def ref_conversion_shares(score_df, selected_map, codes, start_date, end_date):
+    filtered_df = in_window(score_df, start_date, end_date)
+    conversion_data = pd.concat([
+        filtered_df[['Map', 'Atk 2nd']].rename(columns={'Atk 2nd': 'Conversion'}),
+        filtered_df[['Map', 'Def 2nd']].rename(columns={'Def 2nd': 'Conversion'})
+    ])
+    map_conversions = conversion_data[conversion_data['Map'] == selected_map]
+    filtered = map_conversions[map_conversions['Conversion'].isin(codes)]
+    if filtered.empty:
+        return pd.DataFrame(columns=['Conversion', 'Percentage'])
+    pie_data = filtered['Conversion'].value_counts(normalize=True).reset_index()
+    pie_data.columns = ['Conversion', 'Percentage']
+    pie_data['Percentage'] *= 100
+    return pie_data
+
+
+def ref_player_agent_stats(player_df, selected_player, start_date, end_date, selected_map):
+    filtered = player_df[
+        (player_df['Player'] == selected_player) &
+        (player_df['Date'].dt.date >= start_date) &
+        (player_df['Date'].dt.date <= end_date)
+    ]
+    if selected_map != "All":
+        filtered = filtered[filtered['Column 1'] == selected_map]
+    if filtered.empty:
+        return pd.DataFrame()
+
+    agent_stats = filtered.groupby('Agent').agg(
+        Rounds=('Rounds', 'sum'),
+        Kills=('Kills', 'sum'),
+        Deaths=('Deaths', 'sum'),
+        Assists=('Assists', 'sum'),
+        ACS=('ACS', 'mean'),
+        FK=('FK', 'sum'),
+        Plants=('Plants', 'sum')
+    ).reset_index()
+
+    agent_stats['K/D Ratio'] = agent_stats['Kills'] / agent_stats['Deaths'].replace(0, float('nan'))
+    agent_stats['K+A per Round'] = (agent_stats['Kills'] + agent_stats['Assists']) / agent_stats['Rounds'].replace(0, float('nan'))
+    return agent_stats.round(2)[['Agent', 'Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'Plants', 'K/D Ratio', 'K+A per Round']]
+
+
+def ref_comparison_agent_stats(player_df, selected_player, start_date, end_date, selected_map, registry):
+    filtered = player_df[
+        (player_df['Player'] == selected_player) &
+        (player_df['Date'].dt.date >= start_date) &
+        (player_df['Date'].dt.date <= end_date)
+    ]
+    if selected_map != "All":
+        filtered = filtered[filtered['Column 1'] == selected_map]
+    if filtered.empty:
+        return pd.DataFrame()
+    filtered = filtered.copy()
+
+    # Fill missing 'Atk Entry' with 0 to ensure smooth calculations
+    if 'Atk_Entry' in filtered.columns:
+        filtered['Atk_Entry'] = filtered['Atk_Entry'].fillna(0)
+
+    # Clean and convert percentage columns
+    for col in ['Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'FBSR', 'FKPR', 'KPR', 'Atk_Entry', 'FD', 'Multi-Kills']:
+        if col in filtered.columns:
+            filtered[col] = filtered[col].astype(str).str.replace('%', '', regex=False)
+            filtered[col] = pd.to_numeric(filtered[col], errors='coerce')
+
+    # Compute player stats per agent
+    agent_stats = filtered.groupby('Agent').agg(
+        Rounds=('Rounds', 'sum'),
+        Kills=('Kills', 'sum'),
+        Deaths=('Deaths', 'sum'),
+        Multi_Kills=('Multi_Kills', 'mean'),
+        Assists=('Assists', 'mean'),
+        ACS=('ACS', 'mean'),
+        FK=('FK', 'sum'),
+        FBSR=('FBSR', 'mean'),
+        FKPR=('FKPR', 'mean'),
+        KPR=('KPR', 'mean'),
+        Atk_Entry=('Atk_Entry', 'mean'),
+        FD=('FD', 'mean'),
+        Anchor_Time=('Anchor_Time', 'mean')
+    ).reset_index()
+
+    agent_stats['K/D Ratio'] = agent_stats['Kills'] / agent_stats['Deaths'].replace(0, float('nan'))
+    agent_stats['K+A per Round'] = (agent_stats['Kills'] + agent_stats['Assists']) / agent_stats['Rounds'].replace(0, float('nan'))
+    agent_stats['Role'] = registry.roles_for(agent_stats['Agent'])
+    return agent_stats
+
+
+def ref_role_averages(role_agents, benchmark):
+    player_avg = {}
+    for stat in benchmark:
+        if stat == 'FK':
+            player_avg[stat] = (role_agents['FK'].sum() / role_agents['Rounds'].sum()) if role_agents['Rounds'].sum() > 0 else 0
+        elif stat == 'K+A per Round':
+            player_avg[stat] = (role_agents['Kills'].sum() + role_agents['Assists'].sum()) / role_agents['Rounds'].sum()
+        elif stat == 'K/D Ratio':
+            player_avg[stat] = role_agents['Kills'].sum() / role_agents['Deaths'].replace(0, float('nan')).sum()
+        else:
+            if stat in role_agents.columns:
+                val = role_agents[stat].mean()
+                player_avg[stat] = val if pd.notna(val) else 0
+            else:
+                player_avg[stat] = 0
+    return player_avg
+
+
+def ref_role_ratio_stats(player_df, selected_player, start_date, end_date, selected_map, registry):
+    """FK and K/D per role through the per-agent table + role averages loop (the stats both paths define as sum / sum)."""
+    agent_stats = ref_comparison_agent_stats(player_df, selected_player, start_date, end_date, selected_map, registry)
+    rows = []
+    if agent_stats.empty:
+        return pd.DataFrame(columns=['Role', 'FK', 'K/D Ratio'])
+    for role in sorted(agent_stats['Role'].dropna().unique()):
+        values = ref_role_averages(agent_stats[agent_stats['Role'] == role], ['FK', 'K/D Ratio'])
+        rows.append({'Role': role, **values})
+    return pd.DataFrame(rows, columns=['Role', 'FK', 'K/D Ratio'])
+
+
+# ⚡ Fast paths, reshaped to the reference frames
+def build_indexes(data, registry):
+    """The prebuilt structures the fast paths query, each with its build time in seconds (built once per dataset)."""
+    def aggregates():
+        day_aggregates = DayAggregates()
+        day_aggregates.ingest(data['score'], data['players'])
+        return day_aggregates
+
+    def round_data():
+        store = RoundStore.from_score_summary(data['score'])
+        return store, PistolTensor.from_round_store(store)
+
+    builders = {
+        'team_games': lambda: analytics.team_games(data['form_blocks'], data['score']),
+        'day_aggregates': aggregates,
+        'opponents': lambda: OpponentIndex(data['score']),
+        'rounds': round_data,
+    }
+    built, seconds = {}, {}
+    for name, builder in builders.items():
+        built[name], seconds[name] = _timed(builder)
+    built['comps'], seconds['comps'] = _timed(CompIndex, built['team_games'], registry)
+    return built, seconds
+
+
+def fast_day_aggregates(built, end_date):
+    day_aggregates = built['day_aggregates']
+    _, _, through = day_aggregates.split(day_aggregates.maps, pd.to_datetime(end_date).date())
+    table = through.reset_index()[['Map', 'Games', 'Wins', 'Draws', 'Losses']]
+    table['Win Rate'] = table['Wins'] / table['Games']
+    return table
+
+
+def fast_opponent_index(built, start_date, end_date):
+    index = built['opponents']
+    records = pd.concat([index.map_records(name, start_date, end_date) for name in index.names])
+    table = records.groupby('Map')[['Games', 'Wins', 'Draws', 'Losses']].sum().reset_index()
+    table['Win Rate'] = table['Wins'] / table['Games']
+    return table
+
+
+def fast_composition_stats(built, selected_map):
+    stats = analytics.composition_stats(built['team_games'])
+    return stats[stats['Map'] == selected_map]
+
+
+def fast_comp_index(built, selected_map):
+    index = built['comps']
+    return index.summarize(index.containing([], selected_map))
+
+
+def fast_tensor_pistols(built, start_date, end_date):
+    return pistol_tensor.pistol_by_map(built['rounds'][1], start_date, end_date)
+
+
+def fast_tensor_conversions(built, selected_map, codes, start_date, end_date):
+    return pistol_tensor.conversion_shares(built['rounds'][1], selected_map, codes, start_date, end_date)
+
+
+def fast_roster_ratio_stats(player_df, selected_player, start_date, end_date, selected_map, registry):
+    roster = analytics.roster_role_stats(player_df, start_date, end_date, selected_map, registry)
+    if selected_player not in roster.index.get_level_values('Player'):
+        return pd.DataFrame(columns=['Role', 'FK', 'K/D Ratio'])
+    return roster.loc[selected_player][['FK', 'K/D Ratio']].reset_index()
+
+
+# 🔍 Comparing
+def compare(reference, fast, keys, columns):
+    """None when the frames hold the same rows (matched on `keys`), else a short description of the first difference."""
+    reference = reference.reset_index(drop=True)
+    fast = fast.reset_index(drop=True)
+    if reference.empty and fast.empty:
+        return None
+    if len(reference) != len(fast):
+        return f"{len(reference)} reference rows vs {len(fast)} fast rows"
+    reference = reference.sort_values(by=keys).reset_index(drop=True)
+    fast = fast.sort_values(by=keys).reset_index(drop=True)
+    for col in keys + columns:
+        ref_values, fast_values = reference[col], fast[col]
+        if col in keys or not pd.api.types.is_numeric_dtype(ref_values):
+            same = ref_values.astype(str).to_numpy() == fast_values.astype(str).to_numpy()
+        else:
+            same = np.isclose(ref_values.to_numpy(dtype=float), fast_values.to_numpy(dtype=float),
+                              rtol=FLOAT_RTOL, atol=1e-12, equal_nan=True)
+        if not same.all():
+            row = int(np.flatnonzero(~same)[0])
+            return f"{col} differs at {dict(reference.loc[row, keys])}: {ref_values.iloc[row]!r} vs {fast_values.iloc[row]!r}"
+    return None
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def checks(data, built, rng, registry):
+    """
+    (check, fast path, reference fn + args, fast fn + args, keys, columns) for one dataset.
+    Date ranges, maps and players are drawn at random from what the dataset holds.
+
+    map_overview filters on the Date strings exactly as the original tab did,
+    so it's checked on the table as loaded; every path that parses dates is
+    checked against references on the ISO copy, over real date ranges.
+    2nd-round shares are checked against the pistol-aligned codes, for both
+    the won-pistol (WW/WL) and lost-pistol (LL/LW) pies.
+    """
+    score, score_iso, players = data['score'], data['score_iso'], data['players']
+    dates = sorted(score['Date'].dropna().unique())
+    start, end = sorted(rng.choice(dates, 2))
+    iso_dates = sorted(score_iso['Date'].dropna().unique())
+    iso_start, iso_end = sorted(rng.choice(iso_dates, 2))
+    maps = sorted(score['Map'].dropna().unique())
+    selected_map = str(rng.choice(maps))
+    player_dates = sorted(players['Date'].dt.date.unique())
+    p_start, p_end = sorted(rng.choice(player_dates, 2))
+    player = str(rng.choice(sorted(players['Player'].unique())))
+    player_map = str(rng.choice(["All"] + maps))
+    aligned = pistol_aligned(score_iso)
+
+    map_cols = ['Games', 'Wins', 'Draws', 'Losses', 'Win Rate']
+    comp_cols = ['games', 'wins', 'draws', 'losses', 'Win Rate %']
+    pistol_cols = ['Total_Pistols_Won', 'Total_Pistols_Played', 'Pistol Win Rate (%)']
+    agent_cols = ['Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'Plants', 'K/D Ratio', 'K+A per Round']
+    win_codes, loss_codes = ['WW', 'WL'], ['LL', 'LW']
+    return [
+        ("map win rates", "analytics.map_overview", (ref_map_overview, score, start, end),
+         (analytics.map_overview, score, start, end), ['Map'], map_cols),
+        ("map win rates", "deltas.DayAggregates", (ref_map_overview, score_iso, iso_dates[0], iso_end),
+         (fast_day_aggregates, built, iso_end), ['Map'], map_cols),
+        ("map win rates", "opponents.OpponentIndex", (ref_map_overview, score_iso, iso_start, iso_end),
+         (fast_opponent_index, built, iso_start, iso_end), ['Map'], map_cols),
+        ("comp tables", "analytics.composition_stats", (ref_comp_table, data['form_blocks'], score, selected_map),
+         (fast_composition_stats, built, selected_map), ['Comp String'], comp_cols),
+        ("comp tables", "comp_index.CompIndex", (ref_comp_table, data['form_blocks'], score, selected_map),
+         (fast_comp_index, built, selected_map), ['Comp String'], comp_cols),
+        ("pistol win rates", "pistol_tensor.pistol_by_map", (ref_pistol_by_map, score_iso, iso_start, iso_end),
+         (fast_tensor_pistols, built, iso_start, iso_end), ['Map'], pistol_cols),
+        ("2nd round (won pistol)", "pistol_tensor.conversion_shares",
+         (ref_conversion_shares, aligned, selected_map, win_codes, iso_start, iso_end),
+         (fast_tensor_conversions, built, selected_map, win_codes, iso_start, iso_end), ['Conversion'], ['Percentage']),
+        ("2nd round (lost pistol)", "pistol_tensor.conversion_shares",
+         (ref_conversion_shares, aligned, selected_map, loss_codes, iso_start, iso_end),
+         (fast_tensor_conversions, built, selected_map, loss_codes, iso_start, iso_end), ['Conversion'], ['Percentage']),
+        ("agent stats", "analytics.player_agent_stats", (ref_player_agent_stats, players, player, p_start, p_end, player_map),
+         (analytics.player_agent_stats, players, player, p_start, p_end, player_map), ['Agent'], agent_cols),
+        ("role FK / K/D", "analytics.roster_role_stats", (ref_role_ratio_stats, players, player, p_start, p_end, player_map, registry),
+         (fast_roster_ratio_stats, players, player, p_start, p_end, player_map, registry), ['Role'], ['FK', 'K/D Ratio']),
+    ]
+
+
+def run(runs=20, seed=0, max_games=120):
+    """
+    Check every fast path against its reference on `runs` random datasets.
+    Odd seeds save the cleaned table with legacy dd/mm dates. Fast timings are
+    per query on prebuilt structures; build times are reported as their own
+    rows. Returns (timing table, builds table, failures, disagreeing codes).
+    """
+    registry = load_registry()
+    totals = {}
+    builds = {}
+    failures = []
+    disagreeing = 0
+    for run_no in range(runs):
+        dataset_seed = seed + run_no
+        raw, form = random_dataset(dataset_seed, max_games)
+        data = prepare(raw, form, legacy=bool(dataset_seed % 2))
+        disagreeing += disagreeing_codes(data['score'])
+        if len(data['score']) != data['raw_games']:
+            failures.append((dataset_seed, "clean_scrim_form", "sheet", f"kept {len(data['score'])} of {data['raw_games']} match rows"))
+        built, seconds = build_indexes(data, registry)
+        for name, build_s in seconds.items():
+            builds[name] = builds.get(name, 0.0) + build_s
+        rng = np.random.default_rng(dataset_seed)
+        for check, path, (ref_fn, *ref_args), (fast_fn, *fast_args), keys, columns in checks(data, built, rng, registry):
+            reference, ref_s = _timed(ref_fn, *ref_args)
+            fast, fast_s = _timed(fast_fn, *fast_args)
+            problem = compare(reference, fast, keys, columns)
+            entry = totals.setdefault((check, path), {'passed': 0, 'runs': 0, 'ref_s': 0.0, 'fast_s': 0.0})
+            entry['runs'] += 1
+            entry['passed'] += problem is None
+            entry['ref_s'] += ref_s
+            entry['fast_s'] += fast_s
+            if problem:
+                failures.append((dataset_seed, check, path, problem))
+
+    rows = [{'Check': check, 'Fast path': path, 'Passed': f"{e['passed']}/{e['runs']}",
+             'Reference ms': e['ref_s'] / e['runs'] * 1000, 'Fast ms': e['fast_s'] / e['runs'] * 1000,
+             'Speedup': e['ref_s'] / e['fast_s'] if e['fast_s'] else np.nan}
+            for (check, path), e in totals.items()]
+    build_rows = [{'Structure': name, 'Build ms': build_s / runs * 1000} for name, build_s in builds.items()]
+    return pd.DataFrame(rows), pd.DataFrame(build_rows), failures, disagreeing
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the optimized analytics paths against the original pandas logic on random scrim datasets.")
+    parser.add_argument("--runs", type=int, default=20, help="random datasets to check (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first dataset; run i uses seed + i (default: 0)")
+    parser.add_argument("--games", type=int, default=120, help="rough number of games per dataset (default: 120)")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    table, builds, failures, disagreeing = run(args.runs, args.seed, args.games)
+    print(f"🧪 {args.runs} random datasets (seeds {args.seed}–{args.seed + args.runs - 1}, ~{args.games} games each)")
+    print(table.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\nℹ️ {disagreeing} Atk/Def 2nd codes disagreed with their pistol column; the fast paths count "
+          "the pistol column's result, so the 2nd-round references use pistol-aligned codes")
+    print("\n🏗️ One-off builds per dataset")
+    print(builds.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    for dataset_seed, check, path, problem in failures[:20]:
+        print(f"❌ seed {dataset_seed} · {check} · {path}: {problem}")
+    if failures:
+        print(f"❌ {len(failures)} mismatches (re-run one with --seed <seed> --runs 1)")
+        raise SystemExit(1)
+    print("✅ Every fast path matches its reference")
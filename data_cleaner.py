@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 from dateutil import parser
 
@@ -40,9 +41,31 @@ def clean_scrim_form(path):
     if not cleaned_rows:
         raise ValueError("❌ No valid matches found in file")
 
-    columns = ['Date'] + raw_df.columns.tolist()
+    # The sheet's first column holds the opponent team under a 'Date' header
+    columns = ['Date', 'Opponent'] + raw_df.columns.tolist()[1:]
     return pd.DataFrame(cleaned_rows, columns=columns)
 
+def clean_round_log(path):
+    """
+    Loads a round-by-round log (one row per round: Date, Opponent, Map,
+    Round, Side, Won, Planted, Eco) and drops rows without the core values.
+    """
+    if path.endswith('.xlsx'):
+        raw_df = pd.read_excel(path)
+    else:
+        raw_df = pd.read_csv(path)
+
+    required = ['Date', 'Opponent', 'Map', 'Round', 'Side', 'Won']
+    missing = [col for col in required if col not in raw_df.columns]
+    if missing:
+        raise ValueError(f"❌ Round log is missing columns: {missing}")
+
+    round_df = raw_df.dropna(subset=required).reset_index(drop=True)
+    skipped = len(raw_df) - len(round_df)
+    if skipped:
+        print(f"⚠️ Skipping {skipped} round rows with missing core values")
+    return round_df
+
 # Run this when executed directly
 if __name__ == "__main__":
     df = clean_scrim_form("score.csv")
@@ -51,3 +74,42 @@ if __name__ == "__main__":
     print(f"📊 Total matches (based on outcomes): {df['Outcome'].notna().sum()}")
     df.to_csv("cleaned_score.csv", index=False)
     print("📁 Saved to cleaned_score.csv")
+
+    # Round-level store: full round log if we have one, otherwise the rounds the summary pins down
+    from round_store import RoundStore
+    if os.path.exists("rounds.csv"):
+        rounds = RoundStore.from_round_log(clean_round_log("rounds.csv"))
+    else:
+        rounds = RoundStore.from_score_summary(df)
+    rounds.save("rounds.npz")
+    print(f"🧱 Saved {len(rounds.round_no)} rounds from {rounds.n_games} games to rounds.npz")
+
+    # Pistol / 2nd-round count tensors used by the Pistol Insights tab
+    from pistol_tensor import PistolTensor, PISTOL_TENSOR_PATH
+    tensor = PistolTensor.from_round_store(rounds)
+    tensor.save(PISTOL_TENSOR_PATH)
+    print(f"🔫 Saved pistol tensors for {len(tensor.map_names)} maps over {len(tensor.days)} days to {PISTOL_TENSOR_PATH}")
+
+    # Roll new form.csv games into the per-player form trends
+    from trends import update_trends, TRENDS_PATH
+    trend_engine, added = update_trends("form.csv")
+    print(f"📈 Added {added} form rows to {len(trend_engine.series)} trend series in {TRENDS_PATH}")
+
+    # Add the new scrim days to the per-day sums behind the "since last scrim day" view
+    from deltas import update_day_aggregates, DELTAS_PATH
+    day_aggregates, days = update_day_aggregates("cleaned_score.csv", "form.csv")
+    print(f"🆕 Added {len(days)} scrim days to {DELTAS_PATH}")
+
+    # Warm the dashboard cache for the new dataset version
+    from precompute import warm_cache
+    warm_cache()
+
+    # Publish the dataset for multi-process workers attached to DASHBOARD_SHARED_DIR
+    from shared_data import publish, shared_dir_from_env
+    if shared_dir_from_env():
+        version, seconds = publish(shared_dir_from_env())
+        print(f"📦 Published {version} to {shared_dir_from_env()} in {seconds:.1f}s")
+
+    # Static read-only snapshot for viewers who don't need the live dashboard
+    from snapshot import export_snapshot
+    export_snapshot()
@@ -0,0 +1,318 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import analytics
+
+DELTAS_PATH = "day_aggregates.pkl"
+# |z| at or above this marks a significant mover (~95%, two-sided)
+SIGNIFICANT_Z = 1.96
+
+MAP_SUMS = ['Games', 'Wins', 'Draws', 'Losses']
+PLAYER_SUMS = ['Games', 'ACS', 'ACS_sq', 'KPR', 'KPR_sq']
+COMP_SUMS = ['Games', 'Wins']
+PLAYER_STATS = ('ACS', 'KPR')
+PENDING_COLUMNS = ['Map', 'Result', 'Composition', 'Comp String', 'Consistent', 'Valid', 'Day']
+
+
+def _empty_sums(keys, columns):
+    return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_tuples([], names=keys), dtype=float)
+
+
+def _map_sums(score_rows):
+    outcome = score_rows['Outcome'].astype(str).str.strip().str.lower()
+    sums = pd.DataFrame({
+        'Day': analytics.score_dates(score_rows['Date']).dt.date,
+        'Map': score_rows['Map'],
+        'Games': 1,
+        'Wins': (outcome == 'win').astype(int),
+        'Draws': (outcome == 'draw').astype(int),
+        'Losses': (outcome == 'loss').astype(int),
+    }).dropna(subset=['Day', 'Map'])
+    return sums.groupby(['Day', 'Map']).sum()
+
+
+def _player_sums(form_rows):
+    acs = pd.to_numeric(form_rows['ACS'], errors='coerce')
+    rounds = pd.to_numeric(form_rows['Rounds'], errors='coerce')
+    kpr = pd.to_numeric(form_rows['Kills'], errors='coerce') / rounds.where(rounds > 0)
+    sums = pd.DataFrame({
+        'Day': pd.to_datetime(form_rows['Date'], errors='coerce').dt.date,
+        'Player': form_rows['Player'],
+        'Games': 1,
+        'ACS': acs,
+        'ACS_sq': acs ** 2,
+        'KPR': kpr,
+        'KPR_sq': kpr ** 2,
+    }).dropna()
+    return sums.groupby(['Day', 'Player']).sum()
+
+
+def _block_games(block_rows, score_df):
+    """team_games of the whole 5-player blocks in `block_rows`, with each block's Day (rows past the last full block are ignored)."""
+    games = analytics.team_games(block_rows[['Column 1', 'Agent', 'Result']], score_df)
+    if games.empty:
+        return pd.DataFrame(columns=PENDING_COLUMNS)
+    days = pd.to_datetime(block_rows['Date'].to_numpy()[:len(games) * 5:5], errors='coerce')
+    return games.assign(Day=days.date)[days.notna()].reset_index(drop=True)[PENDING_COLUMNS]
+
+
+def _in_score(games, score_df):
+    """Whether each game's map + result has a row in cleaned_score.csv (the join team_games does)."""
+    score_pairs = pd.MultiIndex.from_arrays([score_df['Map'], score_df['Outcome'].astype(str).str.lower()])
+    return pd.MultiIndex.from_arrays([games['Map'], games['Result'].astype(str).str.lower()]).isin(score_pairs)
+
+
+def _comp_sums(games):
+    """Games / wins per (day, map, comp) of games that joined to the score sheet."""
+    if games.empty:
+        return _empty_sums(['Day', 'Map', 'Comp String'], COMP_SUMS)
+    sums = pd.DataFrame({
+        'Day': games['Day'],
+        'Map': games['Map'],
+        'Comp String': games['Comp String'],
+        'Games': 1,
+        'Wins': (games['Result'].str.lower() == 'win').astype(int),
+    })
+    return sums.groupby(['Day', 'Map', 'Comp String']).sum()
+
+
+class DayAggregates:
+    """
+    Additive per-scrim-day sums for map records, player ACS / KPR (with sums of
+    squares) and comp records. Each ingest only aggregates rows appended since
+    the last one and adds them to their day; if earlier rows changed, the sums
+    are rebuilt. Before / after / day numbers for any day are then subtractions
+    of these stored sums, without going back to the raw rows.
+
+    A complete block whose map + result has no score row yet is kept in
+    `pending` and checked again on every ingest, so a game entered in form.csv
+    before cleaned_score.csv is counted once its score row arrives.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.maps = _empty_sums(['Day', 'Map'], MAP_SUMS)
+        self.players = _empty_sums(['Day', 'Player'], PLAYER_SUMS)
+        self.comps = _empty_sums(['Day', 'Map', 'Comp String'], COMP_SUMS)
+        self.rows_seen = {'score': 0, 'form': 0, 'blocks': 0}
+        self.fingerprints = {}
+        self.batches = []
+        self.pending = pd.DataFrame(columns=PENDING_COLUMNS)
+
+    @staticmethod
+    def _fingerprint(df, n_rows):
+        return hashlib.sha1(pd.util.hash_pandas_object(df.iloc[:n_rows], index=False).to_numpy().tobytes()).hexdigest()
+
+    @staticmethod
+    def _add(stored, new):
+        if stored.empty:
+            return new.sort_index()
+        return stored.add(new, fill_value=0).sort_index()
+
+    def ingest(self, score_df, form_df):
+        """
+        Add rows of cleaned_score.csv / form.csv that haven't been seen yet.
+        Returns the days touched by this batch.
+        """
+        blocks = form_df.dropna(subset=['Column 1', 'Agent', 'Result']).reset_index(drop=True)
+        sources = {'score': score_df.reset_index(drop=True), 'form': form_df.reset_index(drop=True), 'blocks': blocks}
+        for name, df in sources.items():
+            seen = self.rows_seen[name]
+            if seen and (len(df) < seen or self._fingerprint(df, seen) != self.fingerprints.get(name)):
+                self.reset()
+                break
+
+        maps = _map_sums(sources['score'].iloc[self.rows_seen['score']:])
+        players = _player_sums(sources['form'].iloc[self.rows_seen['form']:])
+        # Blocks waiting for a score row, plus the new blocks; inconsistent blocks never count
+        games = pd.concat([self.pending, _block_games(blocks.iloc[self.rows_seen['blocks']:], score_df)], ignore_index=True)
+        games = games[games['Consistent'].astype(bool)]
+        joined = _in_score(games, score_df)
+        self.pending = games[~joined].reset_index(drop=True)
+        comps = _comp_sums(games[joined])
+        self.maps = self._add(self.maps, maps)
+        self.players = self._add(self.players, players)
+        self.comps = self._add(self.comps, comps)
+
+        # Only whole 5-player blocks count as seen, so a half-entered game is picked up next time
+        n_blocks = (len(blocks) - self.rows_seen['blocks']) // 5 * 5
+        self.rows_seen = {'score': len(sources['score']), 'form': len(sources['form']),
+                          'blocks': self.rows_seen['blocks'] + n_blocks}
+        self.fingerprints = {name: self._fingerprint(sources[name], n) for name, n in self.rows_seen.items()}
+
+        days = sorted(set(maps.index.get_level_values('Day')) | set(players.index.get_level_values('Day'))
+                      | set(comps.index.get_level_values('Day')))
+        if days:
+            self.batches.append(days)
+        return days
+
+    def days(self):
+        """Every scrim day with data, oldest first."""
+        return sorted(set(self.maps.index.get_level_values('Day')) | set(self.players.index.get_level_values('Day')))
+
+    def latest_score_day(self):
+        """The last day with score rows (the default day: form.csv often runs ahead of the score sheet)."""
+        days = self.maps.index.get_level_values('Day')
+        return max(days) if len(days) else (self.days() or [None])[-1]
+
+    def split(self, table, day):
+        """(sums before `day`, sums on `day`, sums through `day`), each grouped without the Day level."""
+        keys = [n for n in table.index.names if n != 'Day']
+        table_days = table.index.get_level_values('Day')
+        through = table[table_days <= day].groupby(level=keys).sum()
+        on_day = table[table_days == day].groupby(level=keys).sum().reindex(through.index, fill_value=0)
+        return through - on_day, on_day, through
+
+    # 💾 Storage
+    def save(self, path=DELTAS_PATH):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DELTAS_PATH):
+        with open(path, "rb") as f:
+            aggregates = pickle.load(f)
+        if not hasattr(aggregates, 'pending'):
+            # Saved before unmatched blocks were kept: rebuilt on the next ingest
+            aggregates.reset()
+        return aggregates
+
+
+def load_day_aggregates(score_df=None, form_df=None, path=DELTAS_PATH):
+    """
+    Read-only: the sums saved by the last ingest, brought up to date in memory
+    with any rows of the two tables they haven't seen yet. Nothing is written back.
+    """
+    try:
+        aggregates = DayAggregates.load(path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        aggregates = DayAggregates()
+    if score_df is not None and form_df is not None:
+        aggregates.ingest(score_df, form_df)
+    return aggregates
+
+
+def update_day_aggregates(score_path="cleaned_score.csv", form_path="form.csv", path=DELTAS_PATH):
+    """Load the saved sums (or start fresh), add the new rows of both files and save."""
+    try:
+        aggregates = DayAggregates.load(path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        aggregates = DayAggregates()
+    days = aggregates.ingest(pd.read_csv(score_path), pd.read_csv(form_path))
+    if days:
+        aggregates.save(path)
+    return aggregates, days
+
+
+# 📐 Differences
+def _rate(won, games):
+    return np.divide(won, games, out=np.full(len(games), np.nan), where=games > 0)
+
+
+def _proportion_z(won_a, n_a, won_b, n_b):
+    """Two-proportion z-score of b against a (NaN without games on both sides)."""
+    pooled = _rate(won_a + won_b, n_a + n_b)
+    se = np.sqrt(pooled * (1 - pooled) * (1 / np.where(n_a > 0, n_a, np.nan) + 1 / np.where(n_b > 0, n_b, np.nan)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(se > 0, (_rate(won_b, n_b) - _rate(won_a, n_a)) / se, np.nan)
+
+
+def _mean_var(total, squares, n):
+    mean = _rate(total, n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = np.where(n > 1, (squares - n * mean ** 2) / (n - 1), np.nan)
+    return mean, np.clip(var, 0, None)
+
+
+def _welch_z(sums_a, sq_a, n_a, sums_b, sq_b, n_b):
+    mean_a, var_a = _mean_var(sums_a, sq_a, n_a)
+    mean_b, var_b = _mean_var(sums_b, sq_b, n_b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se = np.sqrt(var_a / n_a + var_b / n_b)
+        return np.where(se > 0, (mean_b - mean_a) / se, np.nan)
+
+
+def _by_movement(table):
+    order = table['z'].abs().fillna(-1).sort_values(ascending=False, kind='stable').index
+    return table.loc[order].reset_index(drop=True)
+
+
+def map_deltas(aggregates, day):
+    """Per map: win rate before `day`, on `day` and through `day`, the change and its z-score."""
+    before, on_day, after = aggregates.split(aggregates.maps, day)
+    if on_day.empty:
+        return pd.DataFrame(columns=['Map', 'Games Before', 'WR Before', 'Games On Day', 'WR On Day', 'WR After', 'Δ WR', 'z', 'Significant'])
+    n_b, w_b = before['Games'].to_numpy(float), before['Wins'].to_numpy(float)
+    n_d, w_d = on_day['Games'].to_numpy(float), on_day['Wins'].to_numpy(float)
+    table = pd.DataFrame({
+        'Map': after.index,
+        'Games Before': n_b.astype(int),
+        'WR Before': _rate(w_b, n_b) * 100,
+        'Games On Day': n_d.astype(int),
+        'WR On Day': _rate(w_d, n_d) * 100,
+        'WR After': _rate(after['Wins'].to_numpy(float), after['Games'].to_numpy(float)) * 100,
+    })
+    table['Δ WR'] = table['WR After'] - table['WR Before']
+    table['z'] = _proportion_z(w_b, n_b, w_d, n_d)
+    table['Significant'] = table['z'].abs() >= SIGNIFICANT_Z
+    return _by_movement(table[table['Games On Day'] > 0])
+
+
+def player_deltas(aggregates, day):
+    """Per player and stat (ACS, KPR): per-game average before / on / through `day`, the change and a Welch z-score."""
+    before, on_day, after = aggregates.split(aggregates.players, day)
+    columns = ['Player', 'Stat', 'Games Before', 'Before', 'Games On Day', 'On Day', 'After', 'Δ', 'z', 'Significant']
+    if on_day.empty:
+        return pd.DataFrame(columns=columns)
+    n_b, n_d, n_a = (t['Games'].to_numpy(float) for t in (before, on_day, after))
+    frames = []
+    for stat in PLAYER_STATS:
+        frames.append(pd.DataFrame({
+            'Player': after.index,
+            'Stat': stat,
+            'Games Before': n_b.astype(int),
+            'Before': _rate(before[stat].to_numpy(float), n_b),
+            'Games On Day': n_d.astype(int),
+            'On Day': _rate(on_day[stat].to_numpy(float), n_d),
+            'After': _rate(after[stat].to_numpy(float), n_a),
+            'z': _welch_z(before[stat].to_numpy(float), before[f'{stat}_sq'].to_numpy(float), n_b,
+                          on_day[stat].to_numpy(float), on_day[f'{stat}_sq'].to_numpy(float), n_d),
+        }))
+    table = pd.concat(frames, ignore_index=True)
+    table['Δ'] = table['After'] - table['Before']
+    table['Significant'] = table['z'].abs() >= SIGNIFICANT_Z
+    return _by_movement(table[table['Games On Day'] > 0][columns])
+
+
+def comp_deltas(aggregates, day):
+    """Per (map, comp) played on `day`: record before and on the day, win rate change and z-score."""
+    before, on_day, after = aggregates.split(aggregates.comps, day)
+    columns = ['Map', 'Comp String', 'Games Before', 'WR Before', 'Games On Day', 'WR On Day', 'WR After', 'Δ WR', 'z', 'Significant']
+    if on_day.empty:
+        return pd.DataFrame(columns=columns)
+    n_b, w_b = before['Games'].to_numpy(float), before['Wins'].to_numpy(float)
+    n_d, w_d = on_day['Games'].to_numpy(float), on_day['Wins'].to_numpy(float)
+    table = after.index.to_frame(index=False)
+    table['Games Before'] = n_b.astype(int)
+    table['WR Before'] = _rate(w_b, n_b) * 100
+    table['Games On Day'] = n_d.astype(int)
+    table['WR On Day'] = _rate(w_d, n_d) * 100
+    table['WR After'] = _rate(after['Wins'].to_numpy(float), after['Games'].to_numpy(float)) * 100
+    table['Δ WR'] = table['WR After'] - table['WR Before']
+    table['z'] = _proportion_z(w_b, n_b, w_d, n_d)
+    table['Significant'] = table['z'].abs() >= SIGNIFICANT_Z
+    return _by_movement(table[table['Games On Day'] > 0][columns])
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    aggregates, days = update_day_aggregates()
+    print(f"🆕 Added {len(days)} scrim days to {DELTAS_PATH} ({len(aggregates.days())} days total)")
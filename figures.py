@@ -0,0 +1,469 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def map_winrate_bar(summary):
+    """Horizontal bar of win rate per map (Overview tab)."""
+    winrate_df = summary[['Map', 'Win Rate']].dropna().copy()
+    winrate_df['Win Rate %'] = winrate_df['Win Rate'] * 100
+    winrate_df = winrate_df.sort_values(by='Win Rate %', ascending=False)
+
+    fig_map_wr = px.bar(
+        winrate_df,
+        x='Win Rate %',
+        y='Map',
+        orientation='h',
+        text=winrate_df['Win Rate %'].apply(lambda x: f"{x:.1f}%"),
+        title="Map Win Rates",
+        labels={'Win Rate %': 'Win Rate (%)', 'Map': 'Map'},
+        color='Win Rate %',
+        color_continuous_scale=['#ff0000', '#FDB913']
+    )
+
+    fig_map_wr.update_traces(
+        textposition='outside',
+        marker_line_color='#000000',
+        marker_line_width=1.2
+    )
+
+    fig_map_wr.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', size=14, color='#FDB913'),
+        title_font=dict(size=20, color='#FDB913'),
+        yaxis=dict(
+            tickfont=dict(color='#ffffff'),
+            categoryorder='total ascending',
+            gridcolor='#333333'
+        ),
+        xaxis=dict(
+            title='Win Rate (%)',
+            title_font=dict(color='#FDB913'),
+            tickfont=dict(color='#ffffff'),
+            gridcolor='#333333',
+            range=[0, 100]
+        )
+    )
+    return fig_map_wr
+
+
+def side_winrate_bar(summary):
+    """Grouped Attack vs Defense win rate bars from a round summary."""
+    plot_df = summary[['Map', 'Raw_Atk_WR', 'Raw_Def_WR']].copy()
+    plot_df.rename(columns={'Raw_Atk_WR': 'Attack', 'Raw_Def_WR': 'Defense'}, inplace=True)
+    plot_df['Attack'] *= 100
+    plot_df['Defense'] *= 100
+
+    # Melt for plotting
+    plot_df = plot_df.melt(id_vars='Map', var_name='Side', value_name='Win Rate (%)')
+    plot_df['Map'] = pd.Categorical(plot_df['Map'], categories=plot_df.groupby('Map')['Win Rate (%)'].mean().sort_values(ascending=False).index, ordered=True)
+
+    # Wolves color map
+    color_map = {
+        'Attack': '#FDB913',   # Gold
+        'Defense': '#ffffff'   # White
+    }
+
+    fig = px.bar(
+        plot_df,
+        x='Map',
+        y='Win Rate (%)',
+        color='Side',
+        color_discrete_map=color_map,
+        barmode='group',
+        text=plot_df['Win Rate (%)'].apply(lambda x: f"{x:.1f}%"),
+        title="Attack vs Defense Win Rates by Map"
+    )
+
+    fig.update_traces(
+        textposition='outside',
+        marker_line_color='#333333',
+        marker_line_width=1.2,
+        width=0.4
+    )
+
+    fig.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(color='#FDB913', family='Inter'),
+        title_font=dict(color='#FDB913', size=20),
+        legend_title_text='Side',
+        xaxis=dict(tickangle=-25, gridcolor='#333333'),
+        yaxis=dict(range=[0, 100], gridcolor='#333333')
+    )
+    return fig
+
+
+def post_plant_bar(pp_df_long):
+    """Stacked post-plant / retake success bars."""
+    fig_pp = px.bar(
+        pp_df_long,
+        x='Map',
+        y='Post-Plant Success (%)',
+        color='Side',
+        barmode='stack',
+        text=pp_df_long['Post-Plant Success (%)'].apply(lambda x: f"{x:.1f}%"),
+        title="Post-Plant Success Rate (Stacked Atk + Def)",
+        color_discrete_map={
+            'Post Plant': '#FDB913',
+            'Retakes': '#ffffff'
+        }
+    )
+
+    fig_pp.update_traces(
+        textposition='inside',
+        marker_line_color='#333333',
+        marker_line_width=1.2
+    )
+
+    fig_pp.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter, sans-serif', size=14, color='#FDB913'),
+        title_font=dict(size=20, color='#FDB913'),
+        xaxis=dict(
+            title='Map',
+            title_font=dict(size=16, color='#FDB913'),
+            tickfont=dict(size=14, color='#ffffff'),
+            tickangle=-25,
+            gridcolor='#333333'
+        ),
+        yaxis=dict(
+            title='Post-Plant Success (%)',
+            title_font=dict(size=16, color='#FDB913'),
+            tickfont=dict(size=14, color='#ffffff'),
+            gridcolor='#333333',
+            range=[0, 100]
+        ),
+        legend=dict(
+            font=dict(size=13, color='#ffffff')
+        )
+    )
+    return fig_pp
+
+
+def pistol_bar(grouped):
+    """Pistol round win rate per map."""
+    fig_pistol = px.bar(
+        grouped,
+        x='Map',
+        y='Pistol Win Rate (%)',
+        text=grouped['Pistol Win Rate (%)'].apply(lambda x: f"{x:.1f}%"),
+        color='Pistol Win Rate (%)',
+        color_continuous_scale=['#ff0000', '#FDB913'],
+        title="Pistol Win Rates by Map"
+    )
+
+    fig_pistol.update_traces(
+        textposition='outside',
+        marker_line_color='#000000',
+        marker_line_width=1.2
+    )
+
+    fig_pistol.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', size=14, color='#FDB913'),
+        title_font=dict(size=20, color='#FDB913'),
+        xaxis=dict(tickfont=dict(color='#ffffff'), gridcolor='#333333'),
+        yaxis=dict(range=[0, 100], title='Win Rate (%)', title_font=dict(color='#FDB913'), tickfont=dict(color='#ffffff'), gridcolor='#333333')
+    )
+    return fig_pistol
+
+
+def pistol_side_bar(by_side):
+    """Attack vs Defence pistol win rate per map."""
+    fig = px.bar(
+        by_side,
+        x='Map',
+        y='Pistol Win Rate (%)',
+        color='Side',
+        color_discrete_map={'Attack': '#FDB913', 'Defence': '#ffffff'},
+        barmode='group',
+        text=by_side['Pistol Win Rate (%)'].apply(lambda x: f"{x:.1f}%"),
+        hover_data={'Pistols Won': True, 'Pistols Played': True},
+        title="Pistol Win Rates by Side"
+    )
+
+    fig.update_traces(
+        textposition='outside',
+        marker_line_color='#333333',
+        marker_line_width=1.2
+    )
+
+    fig.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', color='#FDB913'),
+        title_font=dict(size=20, color='#FDB913'),
+        legend_title_text='Side',
+        xaxis=dict(tickfont=dict(color='#ffffff'), gridcolor='#333333'),
+        yaxis=dict(range=[0, 100], title='Win Rate (%)', tickfont=dict(color='#ffffff'), gridcolor='#333333')
+    )
+    return fig
+
+
+def conversion_pie(pie_data, title, color_map):
+    """Donut of 2nd-round outcomes (WW/WL or LL/LW)."""
+    fig_pie = px.pie(
+        pie_data,
+        names='Conversion',
+        values='Percentage',
+        title=title,
+        color='Conversion',
+        color_discrete_map=color_map,
+        hole=0.4
+    )
+
+    fig_pie.update_traces(
+        textinfo='label+percent',
+        marker_line_color='#000000',
+        marker_line_width=1.5
+    )
+
+    fig_pie.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', size=14, color='#FDB913'),
+        title_font=dict(size=18, color='#FDB913'),
+        legend=dict(font=dict(color='#ffffff'))
+    )
+    return fig_pie
+
+
+OVERLAY_COLORS = ["#38bdf8", "#f472b6", "#4ade80", "#a78bfa", "#fb923c", "#f87171", "#facc15", "#2dd4bf"]
+
+
+def _overlay_players(fig, values_by_player, categories):
+    """Unfilled radar outline per extra player, so several teammates stay readable on one chart."""
+    for i, (name, values) in enumerate(values_by_player.items()):
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=categories,
+            name=name,
+            line=dict(color=OVERLAY_COLORS[i % len(OVERLAY_COLORS)], width=2)
+        ))
+
+
+def role_radar(player_avg, benchmark, norm_base, player_name, role, benchmark_label, others=None):
+    """
+    Radar of a player's role stats vs the role benchmark, with +/- deltas annotated.
+    `others` ({player: stats}) are overlaid as outlines for comparison.
+    """
+    categories = list(benchmark.keys())
+    player_values = [player_avg.get(stat, 0) / norm_base[stat] for stat in categories]
+    benchmark_values = [benchmark.get(stat, 0) / norm_base[stat] for stat in categories]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=player_values,
+        theta=categories,
+        fill='toself',
+        name=f"{player_name}",
+        line=dict(color="#FDB913")
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=benchmark_values,
+        theta=categories,
+        fill='toself',
+        name=f"{benchmark_label} {role} Avg",
+        line=dict(color="#444444")
+    ))
+    _overlay_players(fig, {
+        name: [stats.get(stat, 0) / norm_base[stat] for stat in categories] for name, stats in (others or {}).items()
+    }, categories)
+
+    raw_values = []
+    for stat in categories:
+        val = player_avg[stat]
+        bmark = benchmark[stat]
+        diff = val - bmark
+        sign = '+' if diff >= 0 else ''
+        color = "#14532d" if diff >= 0 else "#7f1d1d"
+
+        # Use % format for relevant stats
+        if stat in ['FBSR', 'FKPR', 'Atk Entry']:
+            raw_values.append(f"<span style='color:{color}'><b>{stat}</b>: {sign}{diff * 100:.1f}%</span>")
+        else:
+            raw_values.append(f"<span style='color:{color}'><b>{stat}</b>: {sign}{diff:.2f}</span>")
+
+    fig.add_annotation(
+        text="<br>".join(raw_values),
+        showarrow=False,
+        align="left",
+        x=0.95,
+        y=0.95,
+        xref="paper",
+        yref="paper",
+        bordercolor="#666",
+        borderwidth=1,
+        bgcolor="rgba(0,0,0,0.85)",
+        font=dict(color="white", size=12)
+    )
+
+    fig.update_layout(
+        polar=dict(
+            bgcolor="#000000",
+            radialaxis=dict(
+                visible=False,
+                showticklabels=False,
+                ticks='',
+                showline=False,
+                gridcolor="#333333"
+            ),
+            angularaxis=dict(tickfont=dict(color="#FDB913"))
+        ),
+        showlegend=True,
+        legend=dict(font=dict(color="#ffffff")),
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', color='#FDB913'),
+        title=dict(text=f"{role} Stats vs {benchmark_label} Benchmark", font=dict(size=16, color='#FDB913')),
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    return fig
+
+
+def percentile_radar(percentiles, player_name, role, benchmark_label, pros, others=None):
+    """
+    Radar of a player's percentile (0–100) among benchmark pros for each role stat, with the median ring.
+    `others` ({player: percentiles}) are overlaid as outlines for comparison.
+    """
+    categories = list(percentiles.keys())
+    player_values = [percentiles[stat] if pd.notna(percentiles[stat]) else 0 for stat in categories]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=player_values,
+        theta=categories,
+        fill='toself',
+        name=f"{player_name}",
+        line=dict(color="#FDB913")
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=[50] * len(categories),
+        theta=categories,
+        fill='toself',
+        name=f"{benchmark_label} {role} Median",
+        line=dict(color="#444444")
+    ))
+    _overlay_players(fig, {
+        name: [pct.get(stat) if pd.notna(pct.get(stat)) else 0 for stat in categories] for name, pct in (others or {}).items()
+    }, categories)
+
+    labels = []
+    for stat in categories:
+        pct = percentiles[stat]
+        if pd.isna(pct):
+            labels.append(f"<span style='color:#999999'><b>{stat}</b>: no pro data</span>")
+            continue
+        color = "#14532d" if pct >= 50 else "#7f1d1d"
+        labels.append(f"<span style='color:{color}'><b>{stat}</b>: {pct:.0f}th pct ({pros.get(stat, 0)} pros)</span>")
+
+    fig.add_annotation(
+        text="<br>".join(labels),
+        showarrow=False,
+        align="left",
+        x=0.95,
+        y=0.95,
+        xref="paper",
+        yref="paper",
+        bordercolor="#666",
+        borderwidth=1,
+        bgcolor="rgba(0,0,0,0.85)",
+        font=dict(color="white", size=12)
+    )
+
+    fig.update_layout(
+        polar=dict(
+            bgcolor="#000000",
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                showticklabels=False,
+                ticks='',
+                showline=False,
+                gridcolor="#333333"
+            ),
+            angularaxis=dict(tickfont=dict(color="#FDB913"))
+        ),
+        showlegend=True,
+        legend=dict(font=dict(color="#ffffff")),
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', color='#FDB913'),
+        title=dict(text=f"{role} Percentiles vs {benchmark_label} Pros", font=dict(size=16, color='#FDB913')),
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    return fig
+
+
+def form_trend_line(history, stat, group_col, smoothing='EWMA'):
+    """Smoothed form (EWMA or rolling mean) per agent / map over time, with each game as a faint marker."""
+    plot_df = history[(history['Stat'] == stat)].dropna(subset=['Value'])
+
+    fig = px.line(
+        plot_df,
+        x='Date',
+        y=smoothing,
+        color=group_col,
+        markers=False,
+        title=f"{stat} Form Over Time ({smoothing})",
+        labels={smoothing: stat, 'Date': 'Date'},
+        hover_data={'Game': True, 'Value': ':.2f', smoothing: ':.2f'}
+    )
+    for trace in fig.data:
+        games = plot_df[plot_df[group_col] == trace.name]
+        fig.add_trace(go.Scatter(
+            x=games['Date'],
+            y=games['Value'],
+            mode='markers',
+            marker=dict(color=trace.line.color, size=6, opacity=0.35),
+            name=f"{trace.name} (game)",
+            legendgroup=trace.name,
+            showlegend=False
+        ))
+
+    fig.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', size=14, color='#FDB913'),
+        title_font=dict(size=20, color='#FDB913'),
+        legend=dict(font=dict(color='#ffffff')),
+        xaxis=dict(tickfont=dict(color='#ffffff'), gridcolor='#333333'),
+        yaxis=dict(title=stat, tickfont=dict(color='#ffffff'), gridcolor='#333333')
+    )
+    return fig
+
+
+def sensitivity_bar(sensitivity):
+    """Change in simulated map win % for a +5pp change in each round-rate input, by side."""
+    fig = px.bar(
+        sensitivity,
+        x='Δ Win % per +5pp',
+        y='Input',
+        color='Side',
+        color_discrete_map={'Attack': '#FDB913', 'Defence': '#ffffff'},
+        barmode='group',
+        orientation='h',
+        text=sensitivity['Δ Win % per +5pp'].apply(lambda x: f"{x:+.1f}"),
+        title="Map Win % Gained per +5pp"
+    )
+
+    fig.update_traces(
+        textposition='outside',
+        marker_line_color='#333333',
+        marker_line_width=1.2
+    )
+
+    fig.update_layout(
+        plot_bgcolor='#000000',
+        paper_bgcolor='#000000',
+        font=dict(family='Inter', color='#FDB913'),
+        title_font=dict(size=20, color='#FDB913'),
+        legend_title_text='Side',
+        xaxis=dict(title='Δ Map Win % (pp)', tickfont=dict(color='#ffffff'), gridcolor='#333333'),
+        yaxis=dict(title='', tickfont=dict(color='#ffffff'), gridcolor='#333333')
+    )
+    return fig
@@ -0,0 +1,207 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from registry import load_registry, UNKNOWN_ROLE
+
+LINEUP_SIZE = 5
+PRIOR_ROUNDS = 48          # ~2 games: how far a thin sample is pulled towards the broader average
+NEW_AGENT_PENALTY = 20     # ACS knocked off a player's average on an agent they've never played
+DEFAULT_TOP_K = 5
+
+
+class PerformanceMatrix:
+    """
+    Dense player x agent x map performance matrix from form.csv.
+
+    acs_rounds[p, a, m] is ACS x rounds and rounds[p, a, m] rounds played, so
+    any slice is a round-weighted ACS. Built once; each lineup query only reads
+    a (5, agents) slice of it.
+    """
+
+    def __init__(self, player_df, registry=None):
+        self.registry = registry or load_registry()
+        df = player_df.dropna(subset=['Player', 'Column 1'])
+        agent_codes = self.registry.codes_for(df['Agent'])
+        df = df[agent_codes >= 0]
+        agent_codes = agent_codes[agent_codes >= 0]
+
+        player_codes, players = pd.factorize(df['Player'], sort=True)
+        map_codes, maps = pd.factorize(df['Column 1'], sort=True)
+        self.players = list(players)
+        self.maps = list(maps)
+        self.agents = list(self.registry.agent_names)
+        self._player_codes = {p: i for i, p in enumerate(self.players)}
+        self._map_codes = {m: i for i, m in enumerate(self.maps)}
+
+        rounds = pd.to_numeric(df['Rounds'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        acs = pd.to_numeric(df['ACS'], errors='coerce').to_numpy(dtype=float)
+        rounds = np.where(np.isnan(acs), 0, rounds)
+
+        shape = (len(self.players), len(self.agents), len(self.maps))
+        self.rounds = np.zeros(shape)
+        self.acs_rounds = np.zeros(shape)
+        self.games = np.zeros(shape, dtype=np.int32)
+        cells = (player_codes, agent_codes, map_codes)
+        np.add.at(self.rounds, cells, rounds)
+        np.add.at(self.acs_rounds, cells, np.nan_to_num(acs) * rounds)
+        np.add.at(self.games, cells, 1)
+
+        # Role code of every agent (UNKNOWN_ROLE gets the last code)
+        self.agent_roles = self.registry.agent_role_codes.astype(np.int64)
+        self.role_names = self.registry.roles + [UNKNOWN_ROLE]
+
+    def regulars(self, n=LINEUP_SIZE):
+        """The `n` players with the most rounds, most first."""
+        rounds = self.rounds.sum(axis=(1, 2))
+        return [self.players[i] for i in np.argsort(-rounds, kind='stable')[:n]]
+
+    def expected_acs(self, players, selected_map="All", allow_new=False):
+        """
+        (players, agents) expected ACS. The map-specific ACS is shrunk towards the
+        player's ACS on that agent across all maps, which is in turn shrunk towards
+        the player's overall ACS. Agents a player has never played are -inf, or
+        their overall ACS minus NEW_AGENT_PENALTY when allow_new is set.
+        """
+        idx = [self._player_codes[p] for p in players]
+        rounds, acs_rounds = self.rounds[idx], self.acs_rounds[idx]
+
+        player_rounds = rounds.sum(axis=(1, 2))
+        player_acs = np.divide(acs_rounds.sum(axis=(1, 2)), player_rounds,
+                               out=np.zeros(len(idx)), where=player_rounds > 0)[:, None]
+        agent_rounds, agent_acs_rounds = rounds.sum(axis=2), acs_rounds.sum(axis=2)
+        agent_acs = (agent_acs_rounds + PRIOR_ROUNDS * player_acs) / (agent_rounds + PRIOR_ROUNDS)
+
+        if selected_map == "All" or selected_map not in self._map_codes:
+            values = agent_acs
+        else:
+            m = self._map_codes[selected_map]
+            values = (acs_rounds[:, :, m] + PRIOR_ROUNDS * agent_acs) / (rounds[:, :, m] + PRIOR_ROUNDS)
+
+        played = agent_rounds > 0
+        fallback = player_acs - NEW_AGENT_PENALTY if allow_new else -np.inf
+        return np.where(played, values, fallback)
+
+
+def role_limits_array(role_names, role_limits=None):
+    """(min, max) count per role code; roles left out of `role_limits` are unconstrained."""
+    role_limits = role_limits or {}
+    mins = np.zeros(len(role_names), dtype=np.int64)
+    maxs = np.full(len(role_names), LINEUP_SIZE, dtype=np.int64)
+    for r, role in enumerate(role_names):
+        if role in role_limits:
+            mins[r], maxs[r] = role_limits[role]
+    return mins, maxs
+
+
+def search_lineups(values, agent_roles, mins, maxs, top_k=DEFAULT_TOP_K):
+    """
+    Top-k assignments of distinct agents to players maximising total value,
+    subject to per-role min / max counts.
+
+    Depth-first branch-and-bound: players with the fewest options go first,
+    each player's agents are tried best first, and a branch stops as soon as
+    its total plus every remaining player's best value can't beat the k-th
+    best lineup found so far. Returns [(total, agent codes per player)], best first.
+    """
+    n = len(values)
+    options = [np.flatnonzero(np.isfinite(row)) for row in values]
+    order = sorted(range(n), key=lambda i: len(options[i]))
+    candidates = [[(float(values[i, a]), int(a), int(agent_roles[a]))
+                   for a in options[i][np.argsort(-values[i, options[i]], kind='stable')]] for i in order]
+    best = [c[0][0] if c else -np.inf for c in candidates]
+    # Optimistic total still to come from players depth..n-1
+    remaining = np.concatenate([np.cumsum(best[::-1])[::-1], [0.0]]).tolist()
+
+    heap = []
+    counter = 0
+    counts = [0] * len(mins)
+    chosen = [0] * n
+    mins, maxs = mins.tolist(), maxs.tolist()
+
+    def visit(depth, total, used):
+        nonlocal counter
+        # Roles still short of their minimum must fit in the players left
+        if sum(max(0, lo - c) for lo, c in zip(mins, counts)) > n - depth:
+            return
+        if depth == n:
+            counter += 1
+            item = (total, -counter, tuple(chosen))
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
+            return
+        for value, agent, role in candidates[depth]:
+            if len(heap) == top_k and total + value + remaining[depth + 1] <= heap[0][0]:
+                break
+            if used >> agent & 1 or counts[role] >= maxs[role]:
+                continue
+            counts[role] += 1
+            chosen[depth] = agent
+            visit(depth + 1, total + value, used | (1 << agent))
+            counts[role] -= 1
+
+    if all(candidates):
+        visit(0, 0.0, 0)
+
+    results = []
+    for total, _, agents in sorted(heap, reverse=True):
+        by_player = [0] * n
+        for depth, i in enumerate(order):
+            by_player[i] = agents[depth]
+        results.append((total, by_player))
+    return results
+
+
+def comp_win_rates(comp_stats, selected_map, registry=None):
+    """{frozenset of agent names: composition_stats row} for one map ('All' pools every map)."""
+    registry = registry or load_registry()
+    stats = comp_stats if selected_map == "All" else comp_stats[comp_stats['Map'] == selected_map]
+    if stats.empty:
+        return {}
+    if selected_map == "All":
+        stats = stats.groupby('Comp String', sort=False).agg(
+            Composition=('Composition', 'first'), games=('games', 'sum'), wins=('wins', 'sum')
+        ).reset_index()
+        stats['Win Rate %'] = stats['wins'] / stats['games'] * 100
+    return {
+        frozenset(registry.canonical(a) for a in comp): row
+        for comp, row in zip(stats['Composition'], stats.to_dict('records'))
+    }
+
+
+def best_lineups(matrix, players, selected_map="All", role_limits=None, top_k=DEFAULT_TOP_K,
+                 allow_new=False, comp_rates=None):
+    """
+    Top-k agent assignments for five players on one map, ranked by expected
+    team ACS, with each comp's role shape and historic win rate (when played).
+    """
+    players = list(dict.fromkeys(players))
+    if len(players) != LINEUP_SIZE:
+        raise ValueError(f"❌ Pick exactly {LINEUP_SIZE} players, got {len(players)}")
+    unknown = [p for p in players if p not in matrix.players]
+    if unknown:
+        raise ValueError(f"❌ No form.csv rows for {', '.join(unknown)}")
+
+    values = matrix.expected_acs(players, selected_map, allow_new)
+    mins, maxs = role_limits_array(matrix.role_names, role_limits)
+    comp_rates = comp_rates or {}
+
+    rows = []
+    for rank, (total, agents) in enumerate(search_lineups(values, matrix.agent_roles, mins, maxs, top_k), start=1):
+        names = [matrix.agents[a] for a in agents]
+        shape = np.bincount(matrix.agent_roles[agents], minlength=len(matrix.role_names))[:len(matrix.role_names) - 1]
+        history = comp_rates.get(frozenset(names), {})
+        row = {'Rank': rank}
+        row.update({player: f"{name} ({values[i, a]:.0f})" for i, (player, name, a) in enumerate(zip(players, names, agents))})
+        row.update({
+            'Expected ACS': total / LINEUP_SIZE,
+            'Shape': '-'.join(map(str, shape)),
+            'Comp Games': int(history.get('games', 0)),
+            'Comp Win Rate %': history.get('Win Rate %', np.nan),
+            'Agents': names,
+        })
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['Rank'] + players + ['Expected ACS', 'Shape', 'Comp Games', 'Comp Win Rate %', 'Agents'])
@@ -0,0 +1,239 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from result_cache import dataset_version
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_dashboard.py")
+RESULTS_PATH = "loadtest_results.json"
+PERCENTILES = (50, 95, 99)
+
+
+def _rss_mb():
+    """Current resident set size of this process in MB (peak RSS if /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _widget(at, kind, label=None, key=None):
+    widgets = getattr(at, kind)
+    if key is not None:
+        return widgets(key=key)
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No {kind} labelled '{label}'")
+
+
+def _pick(rng, widget, exclude_current=True):
+    options = [o for o in widget.options if not (exclude_current and o == str(widget.value))]
+    return rng.choice(options or widget.options)
+
+
+# 🎬 Session steps: each changes one thing and triggers one rerun
+def login(at, rng):
+    at.run()
+    at.text_input[0].input("admin")
+    at.text_input[1].input("wolves123")
+    at.button[0].click()
+
+
+def overview_dates(at, rng):
+    start = _widget(at, "selectbox", key="overview_start")
+    start.select(rng.choice(start.options[:len(start.options) // 2]))
+
+
+def comp_map(at, rng):
+    widget = _widget(at, "selectbox", label="Select a map:")
+    widget.select(_pick(rng, widget))
+
+
+def round_insights_map(at, rng):
+    widget = _widget(at, "selectbox", label="Filter by Map")
+    widget.select(_pick(rng, widget))
+
+
+def pistol_dates(at, rng):
+    widget = _widget(at, "date_input", label="Select Date Range")
+    start, end = widget.value
+    days = (end - start).days
+    widget.set_value((start + datetime.timedelta(days=rng.randint(0, days // 2)), end))
+
+
+def second_round_map(at, rng):
+    widget = _widget(at, "selectbox", label="Select a map to view 2nd round breakdown:")
+    widget.select(_pick(rng, widget))
+
+
+def player_stats_player(at, rng):
+    widget = _widget(at, "selectbox", label="Select a player:")
+    widget.select(_pick(rng, widget))
+
+
+def compare_player(at, rng):
+    widget = _widget(at, "selectbox", key="compare_player")
+    widget.select(_pick(rng, widget))
+
+
+def compare_role(at, rng):
+    widget = _widget(at, "selectbox", key="compare_role")
+    widget.select(_pick(rng, widget))
+
+
+SESSION_STEPS = [
+    login, overview_dates, comp_map, round_insights_map, pistol_dates,
+    second_round_map, player_stats_player, compare_player, compare_role,
+]
+
+
+def _cpu_s():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_session(user, iterations, seed, timeout):
+    """One virtual user: log in, then walk the tabs `iterations` times. Returns per-step timings."""
+    warnings.filterwarnings("ignore")
+    rng = random.Random(seed * 1000 + user)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timings = []
+    errors = []
+    cpu_start = _cpu_s()
+    wall_start = time.perf_counter()
+
+    steps = SESSION_STEPS[:1] + SESSION_STEPS[1:] * iterations
+    for step in steps:
+        try:
+            step(at, rng)
+            started = time.perf_counter()
+            at.run()
+            timings.append((step.__name__, time.perf_counter() - started))
+            if at.exception:
+                errors.append(f"{step.__name__}: {at.exception[0].message}")
+        except Exception as e:
+            errors.append(f"{step.__name__}: {e}")
+
+    return {
+        "user": user,
+        "timings": timings,
+        "errors": errors,
+        "cpu_s": _cpu_s() - cpu_start,
+        "wall_s": time.perf_counter() - wall_start,
+        "rss_mb": _rss_mb(),
+    }
+
+
+def _latency_summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    summary = {"count": int(len(ms)), "mean_ms": round(float(ms.mean()), 1)}
+    summary.update({f"p{p}_ms": round(float(np.percentile(ms, p)), 1) for p in PERCENTILES})
+    return summary
+
+
+def _session_args(users, iterations, seed, timeout):
+    return range(users), [iterations] * users, [seed] * users, [timeout] * users
+
+
+def run_load_test(users=4, iterations=2, seed=0, timeout=120, mode="processes"):
+    """
+    Run `users` concurrent virtual users and summarize rerun latency per step.
+
+    mode="processes" gives each user its own process, so CPU and RSS are exact
+    per session (users share the disk result cache, like a multi-worker
+    deployment). mode="threads" runs every user in this process, sharing the
+    in-memory caches like sessions on one Streamlit server; CPU and RSS are
+    then only known for the whole process.
+    """
+    rss_before = _rss_mb()
+    cpu_before = _cpu_s()
+    started = time.perf_counter()
+    if mode == "threads":
+        pool = ThreadPoolExecutor(max_workers=users, thread_name_prefix="vuser")
+    else:
+        pool = ProcessPoolExecutor(max_workers=users)
+    with pool:
+        sessions = list(pool.map(run_session, *_session_args(users, iterations, seed, timeout)))
+    elapsed = time.perf_counter() - started
+    if mode == "threads":
+        for s in sessions:
+            s["cpu_s"] = s["rss_mb"] = None
+
+    all_timings = [t for s in sessions for t in s["timings"]]
+    steps = {}
+    for name in [step.__name__ for step in SESSION_STEPS]:
+        step_times = [seconds for step, seconds in all_timings if step == name]
+        if step_times:
+            steps[name] = _latency_summary(step_times)
+
+    return {
+        "config": {"users": users, "iterations": iterations, "seed": seed, "mode": mode,
+                   "dataset_version": dataset_version()},
+        "overall": {
+            **_latency_summary([seconds for _, seconds in all_timings]),
+            "reruns_per_s": round(len(all_timings) / elapsed, 2),
+            "wall_s": round(elapsed, 2),
+            "runner_cpu_s": round(_cpu_s() - cpu_before, 2),
+            "runner_rss_start_mb": round(rss_before, 1),
+            "runner_rss_end_mb": round(_rss_mb(), 1),
+        },
+        "steps": steps,
+        "sessions": [
+            {
+                "user": s["user"],
+                "reruns": len(s["timings"]),
+                "cpu_s": s["cpu_s"] and round(s["cpu_s"], 2),
+                "wall_s": round(s["wall_s"], 2),
+                "rss_mb": s["rss_mb"] and round(s["rss_mb"], 1),
+                "errors": s["errors"],
+            }
+            for s in sorted(sessions, key=lambda s: s["user"])
+        ],
+    }
+
+
+def print_report(results):
+    overall = results["overall"]
+    print(f"👥 {results['config']['users']} users · {overall['count']} reruns in {overall['wall_s']}s "
+          f"({overall['reruns_per_s']}/s) · {results['config']['mode']}")
+    print(f"{'step':<22}{'n':>5}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, s in list(results["steps"].items()) + [("overall", overall)]:
+        print(f"{name:<22}{s['count']:>5}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}")
+    for s in results["sessions"]:
+        status = "✅" if not s["errors"] else f"❌ {len(s['errors'])} errors: {s['errors'][0]}"
+        usage = f"CPU {s['cpu_s']}s, RSS {s['rss_mb']} MB, " if s['cpu_s'] is not None else ""
+        print(f"  user {s['user']}: {s['reruns']} reruns, {usage}wall {s['wall_s']}s {status}")
+    if results['config']['mode'] == "threads":
+        print(f"  process: CPU {overall['runner_cpu_s']}s, RSS {overall['runner_rss_start_mb']} → {overall['runner_rss_end_mb']} MB")
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard users and report rerun latency.")
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users (default: 4)")
+    parser.add_argument("--iterations", type=int, default=2, help="passes over the session script per user (default: 2)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the users' selections (default: 0)")
+    parser.add_argument("--mode", choices=["processes", "threads"], default="processes",
+                        help="one process per user (exact CPU/RSS) or all users in one process (shared caches)")
+    parser.add_argument("--out", default=RESULTS_PATH, help=f"results file (default: {RESULTS_PATH})")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    results = run_load_test(args.users, args.iterations, args.seed, mode=args.mode)
+    print_report(results)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"📁 Saved results to {args.out}")
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+import analytics
+
+HALF_ROUNDS = 12
+
+
+class OpponentIndex:
+    """
+    Score rows indexed by opponent for head-to-head views.
+
+    Rows are sorted by opponent code once, so each opponent's games are the
+    contiguous slice order[offsets[c]:offsets[c + 1]] and every per-opponent
+    query only touches that opponent's rows. Per-game numbers (result, rounds
+    won / played per side, pistols per side) are precomputed as flat arrays.
+    """
+
+    def __init__(self, score_df):
+        opponents = score_df['Opponent'] if 'Opponent' in score_df.columns else pd.Series(np.nan, index=score_df.index)
+        cat = analytics.opponent_categories(opponents)
+        self.names = list(cat.categories)
+        self._codes_by_name = {name: i for i, name in enumerate(self.names)}
+        codes = np.asarray(cat.codes, dtype=np.int32)
+
+        # Row index: rows of opponent c are order[offsets[c]:offsets[c + 1]] (unknown opponents are left out)
+        known = np.flatnonzero(codes >= 0)
+        self.order = known[np.argsort(codes[known], kind='stable')]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[known], minlength=len(self.names)))])
+
+        self.map_codes, self.map_names = pd.factorize(score_df['Map'])
+        self.dates = analytics.score_dates(score_df['Date']).to_numpy().astype('datetime64[D]')
+        outcome = score_df['Outcome'].astype(str).str.strip().str.lower()
+        self.wins = (outcome == 'win').to_numpy()
+        self.draws = (outcome == 'draw').to_numpy()
+        self.losses = (outcome == 'loss').to_numpy()
+
+        # Rounds won / played and pistols won / played per side; played = won / WR (12 when the WR is 0 or missing)
+        starts_attack = (score_df['Start'] == 'Attack').to_numpy()
+        n = len(score_df)
+        self.rounds_won = np.zeros((n, 2))
+        self.rounds_played = np.zeros((n, 2))
+        self.pistols_won = np.zeros((n, 2))
+        self.pistols_played = np.zeros((n, 2))
+        for half, pistol in (('First', 'First Pistol'), ('Second', 'Second Pistol')):
+            won = pd.to_numeric(score_df[f'{half} Rounds'], errors='coerce')
+            wr = analytics.pct_to_float(score_df[f'{half} Half WR'])
+            played = (won / wr).where(wr > 0, HALF_ROUNDS).round().clip(upper=HALF_ROUNDS)
+            pistol_won = pd.to_numeric(score_df[pistol], errors='coerce')
+            side = np.where(starts_attack == (half == 'First'), 0, 1)
+            rows = np.arange(n)
+            self.rounds_won[rows, side] = won.fillna(0).to_numpy()
+            self.rounds_played[rows, side] = played.where(won.notna(), 0).to_numpy()
+            self.pistols_won[rows, side] = pistol_won.fillna(0).to_numpy()
+            self.pistols_played[rows, side] = pistol_won.notna().to_numpy()
+
+    def rows(self, opponent, start_date=None, end_date=None):
+        """Score row positions for one opponent (optionally within a date range)."""
+        code = self._codes_by_name.get(opponent)
+        if code is None:
+            return np.array([], dtype=np.int64)
+        rows = self.order[self.offsets[code]:self.offsets[code + 1]]
+        if start_date is not None:
+            rows = rows[self.dates[rows] >= np.datetime64(pd.to_datetime(start_date).date(), 'D')]
+        if end_date is not None:
+            rows = rows[self.dates[rows] <= np.datetime64(pd.to_datetime(end_date).date(), 'D')]
+        return rows
+
+    def games(self):
+        """Games played against each opponent, in name order."""
+        return np.diff(self.offsets)
+
+    def opponent_table(self):
+        """Games / W / D / L, win rate and last game date for every opponent, most played first."""
+        codes = np.repeat(np.arange(len(self.names)), self.games())
+        rows = self.order
+        n = len(self.names)
+        last = pd.Series(self.dates[rows]).groupby(codes).max().reindex(range(n))
+        table = pd.DataFrame({
+            'Opponent': self.names,
+            'Games': self.games(),
+            'Wins': np.bincount(codes, weights=self.wins[rows], minlength=n).astype(int),
+            'Draws': np.bincount(codes, weights=self.draws[rows], minlength=n).astype(int),
+            'Losses': np.bincount(codes, weights=self.losses[rows], minlength=n).astype(int),
+            'Last Played': last.dt.date.to_numpy(),
+        })
+        table.insert(5, 'Win Rate', table['Wins'] / table['Games'].replace(0, np.nan))
+        return table.sort_values(by=['Games', 'Opponent'], ascending=[False, True]).reset_index(drop=True)
+
+    def map_records(self, opponent, start_date=None, end_date=None):
+        """Head-to-head W / D / L and win rate per map."""
+        rows = self.rows(opponent, start_date, end_date)
+        rows = rows[self.map_codes[rows] >= 0]
+        maps = self.map_codes[rows]
+        n = len(self.map_names)
+        games = np.bincount(maps, minlength=n)
+        present = games > 0
+        table = pd.DataFrame({
+            'Map': np.asarray(self.map_names)[present],
+            'Games': games[present],
+            'Wins': np.bincount(maps, weights=self.wins[rows], minlength=n)[present].astype(int),
+            'Draws': np.bincount(maps, weights=self.draws[rows], minlength=n)[present].astype(int),
+            'Losses': np.bincount(maps, weights=self.losses[rows], minlength=n)[present].astype(int),
+        })
+        table['Win Rate'] = table['Wins'] / table['Games']
+        return table.sort_values(by=['Games', 'Map'], ascending=[False, True]).reset_index(drop=True)
+
+    def side_rates(self, opponent, start_date=None, end_date=None):
+        """Round and pistol win rates on attack and defence per map (and 'All'), head to head."""
+        rows = self.rows(opponent, start_date, end_date)
+        rows = rows[self.map_codes[rows] >= 0]
+        maps = self.map_codes[rows]
+        n = len(self.map_names)
+        present = np.bincount(maps, minlength=n) > 0
+
+        def per_map(values):
+            sums = np.stack([np.bincount(maps, weights=values[rows, s], minlength=n) for s in range(2)], axis=1)[present]
+            return np.vstack([sums, values[rows].sum(axis=0)])
+
+        def rate(won, played):
+            return np.divide(won, played, out=np.full(won.shape, np.nan), where=played > 0)
+
+        rounds_won, rounds_played = per_map(self.rounds_won), per_map(self.rounds_played)
+        pistols_won, pistols_played = per_map(self.pistols_won), per_map(self.pistols_played)
+        round_wr, pistol_wr = rate(rounds_won, rounds_played), rate(pistols_won, pistols_played)
+        return pd.DataFrame({
+            'Map': list(np.asarray(self.map_names)[present]) + ['All'],
+            'Atk WR': round_wr[:, 0],
+            'Def WR': round_wr[:, 1],
+            'Atk Pistol WR': pistol_wr[:, 0],
+            'Def Pistol WR': pistol_wr[:, 1],
+            'Pistols Played': pistols_played.sum(axis=1).astype(int),
+        })
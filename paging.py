@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import analytics
+
+PAGE_SIZES = (25, 50, 100, 250)
+DEFAULT_PAGE_SIZE = 50
+
+
+def _sort_key(series):
+    """
+    Values to sort a column by: numbers (including '75%' strings) numerically,
+    day-first date strings chronologically, anything else case-insensitively.
+    """
+    if series.dtype != object:
+        return series
+    present = series.notna().sum()
+    numeric = analytics.pct_to_float(series)
+    if numeric.notna().sum() == present:
+        return numeric
+    dates = pd.to_datetime(series, errors='coerce', dayfirst=True, format='mixed')
+    if dates.notna().sum() == present:
+        return dates
+    return series.astype(str).str.lower().where(series.notna())
+
+
+def sort_order(df, sort_by, ascending=True):
+    """Row positions of `df` sorted by one column (stable, missing values last)."""
+    if sort_by is None or sort_by not in df.columns:
+        return np.arange(len(df))
+    key = _sort_key(df[sort_by]).reset_index(drop=True)
+    return key.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+def page_count(total_rows, page_size):
+    return max(1, math.ceil(total_rows / page_size))
+
+
+def page_slice(df, page=1, page_size=DEFAULT_PAGE_SIZE, order=None, columns=None):
+    """
+    One page of `df`: rows (page - 1) * page_size ... in `order` (row positions,
+    from sort_order), projected to `columns`. Only this slice is copied, so the
+    cost follows the page size rather than the frame size.
+    Returns (page_df, total_rows, pages).
+    """
+    total = len(df)
+    pages = page_count(total, page_size)
+    page = min(max(int(page), 1), pages)
+    positions = np.arange(total) if order is None else order
+    rows = positions[(page - 1) * page_size:page * page_size]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df.iloc[rows], total, pages
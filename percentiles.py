@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import analytics
+
+BENCHMARK_PLAYERS_PATH = "benchmark_players.csv"
+KEY_COLUMNS = ('Player', 'Region', 'Season', 'Role')
+# Stats where a smaller number is the better result
+LOWER_IS_BETTER = ('FD',)
+
+
+class PercentileEngine:
+    """
+    Sorted per-(region, season, role, stat) arrays built once from a table of
+    pro player rows, so "percentile of x for stat S in role R" is a
+    searchsorted over the reference values — for any number of x at once.
+    """
+
+    def __init__(self, bench_df):
+        bench_df = bench_df.copy()
+        bench_df['Season'] = bench_df['Season'].astype(str)
+        self.stats = [c for c in bench_df.columns if c not in KEY_COLUMNS]
+        for stat in self.stats:
+            bench_df[stat] = analytics.pct_to_float(bench_df[stat])
+
+        self.sorted = {}
+        for (region, season, role), rows in bench_df.groupby(['Region', 'Season', 'Role']):
+            for stat in self.stats:
+                values = rows[stat].to_numpy(dtype=float)
+                values = np.sort(values[~np.isnan(values)])
+                if len(values):
+                    self.sorted[(region, season, role, stat)] = values
+
+    def has(self, role, region, season):
+        return any(key[:3] == (region, str(season), role) for key in self.sorted)
+
+    def sample_size(self, role, stat, region, season):
+        return len(self.sorted.get((region, str(season), role, stat), ()))
+
+    def percentile(self, role, stat, values, region, season):
+        """
+        Mid-rank percentile (0–100) of each value among the pros' values for
+        (role, stat); NaN when there is no reference data.
+        """
+        values = np.asarray(values, dtype=float)
+        reference = self.sorted.get((region, str(season), role, stat))
+        if reference is None:
+            return np.full(values.shape, np.nan)
+        below = np.searchsorted(reference, values, side='left')
+        at_or_below = np.searchsorted(reference, values, side='right')
+        pct = (below + at_or_below) / 2 / len(reference) * 100
+        if stat in LOWER_IS_BETTER:
+            pct = 100 - pct
+        return np.where(np.isnan(values), np.nan, pct)
+
+    def rank(self, role_values, region, season):
+        """
+        Percentiles for a long frame of Player / Role / Stat / Value rows
+        (every roster player at once). Adds 'Percentile' and 'Pros' columns.
+        """
+        ranked = role_values.copy()
+        ranked['Percentile'] = np.nan
+        ranked['Pros'] = 0
+        for (role, stat), rows in ranked.groupby(['Role', 'Stat']):
+            ranked.loc[rows.index, 'Percentile'] = self.percentile(role, stat, rows['Value'], region, season)
+            ranked.loc[rows.index, 'Pros'] = self.sample_size(role, stat, region, season)
+        return ranked
+
+
+def load_percentile_engine(path=BENCHMARK_PLAYERS_PATH):
+    """Engine for the benchmark player CSV, or None when the file isn't there."""
+    if not os.path.exists(path):
+        return None
+    bench_df = pd.read_csv(path)
+    missing = [c for c in KEY_COLUMNS if c not in bench_df.columns]
+    if missing:
+        raise ValueError(f"❌ {path} is missing columns: {', '.join(missing)}")
+    return PercentileEngine(bench_df)
+
+
+def roster_role_values(roster, benchmarks):
+    """
+    Long Player / Role / Stat / Value frame of each role's benchmark stats,
+    taken from analytics.roster_role_stats.
+    """
+    frames = []
+    for role, benchmark in benchmarks.items():
+        role_rows = roster[roster.index.get_level_values('Role') == role]
+        if role_rows.empty:
+            continue
+        long = role_rows[list(benchmark)].stack().rename('Value').reset_index()
+        frames.append(long.rename(columns={long.columns[2]: 'Stat'}))
+    if not frames:
+        return pd.DataFrame(columns=['Player', 'Role', 'Stat', 'Value'])
+    return pd.concat(frames, ignore_index=True)[['Player', 'Role', 'Stat', 'Value']]
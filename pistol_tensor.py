@@ -0,0 +1,163 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from round_store import SIDE_NAMES, UNKNOWN
+
+PISTOL_TENSOR_PATH = "pistol_tensor.npz"
+
+# Axis codes for the result dimensions: loss, win, not recorded
+LOSS, WIN, MISSING = 0, 1, 2
+SIDES = ('Attack', 'Defence', 'Unknown')
+CONVERSION_CODES = {'WW': (WIN, WIN), 'WL': (WIN, LOSS), 'LW': (LOSS, WIN), 'LL': (LOSS, LOSS)}
+
+
+def store_digest(store):
+    """Fingerprint of the round store a tensor was built from."""
+    digest = hashlib.sha1()
+    for arr in (store.offsets, store.maps, store.dates.astype(np.int64), store.side, store.won, store.pistol, store.round_no):
+        digest.update(np.ascontiguousarray(arr).tobytes())
+    digest.update("|".join(map(str, store.map_names)).encode())
+    return digest.hexdigest()[:12]
+
+
+class PistolTensor:
+    """
+    Pistol and 2nd-round outcomes as count tensors indexed
+    [day, map, side, pistol result, round-2 result], cumulative over days.
+
+    Any date range is one subtraction (cum[end] - cum[start - 1]); every
+    pistol / conversion chart is then a sum over some axes of that slice.
+    Result axes are LOSS / WIN / MISSING, side axis is Attack / Defence / Unknown.
+    """
+
+    def __init__(self, days, map_names, cumulative, digest=None):
+        self.days = np.asarray(days, dtype='datetime64[D]')
+        self.map_names = np.asarray(map_names, dtype=object)
+        self.cumulative = np.asarray(cumulative, dtype=np.int32)
+        self.digest = digest
+
+    @classmethod
+    def from_round_store(cls, store):
+        keep = store.pistol & store.round_mask()
+        pistols = np.flatnonzero(keep)
+        game = store.game_of_round
+
+        # Round-2 result: the next round of the same game, numbered one higher
+        nxt = np.minimum(pistols + 1, len(store.round_no) - 1)
+        follows = (nxt != pistols) & (game[nxt] == game[pistols]) & (store.round_no[nxt] == store.round_no[pistols] + 1)
+        second = np.where(follows, store.won[nxt], UNKNOWN)
+
+        def result_axis(won):
+            return np.where(won == UNKNOWN, MISSING, won).astype(np.intp)
+
+        side = np.where(store.side[pistols] == UNKNOWN, 2, store.side[pistols]).astype(np.intp)
+        days, day_idx = np.unique(store.dates[game[pistols]], return_inverse=True)
+        counts = np.zeros((len(days), len(store.map_names), 3, 3, 3), dtype=np.int32)
+        np.add.at(counts, (day_idx, store.maps[game[pistols]], side, result_axis(store.won[pistols]), result_axis(second)), 1)
+        return cls(days, store.map_names, np.cumsum(counts, axis=0), store_digest(store))
+
+    # 💾 Storage
+    def save(self, path=PISTOL_TENSOR_PATH):
+        np.savez_compressed(path, days=self.days, map_names=self.map_names.astype(str),
+                            cumulative=self.cumulative, digest=np.array(self.digest or ""))
+
+    @classmethod
+    def load(cls, path=PISTOL_TENSOR_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['days'], data['map_names'], data['cumulative'], str(data['digest']))
+
+    # ✂️ Slices
+    def window(self, start_date=None, end_date=None):
+        """Counts [map, side, pistol, round 2] for games in [start_date, end_date]."""
+        lo, hi = 0, len(self.days)
+        if start_date is not None:
+            lo = np.searchsorted(self.days, np.datetime64(pd.to_datetime(start_date).date(), 'D'), side='left')
+        if end_date is not None:
+            hi = np.searchsorted(self.days, np.datetime64(pd.to_datetime(end_date).date(), 'D'), side='right')
+        if hi <= lo:
+            return np.zeros(self.cumulative.shape[1:], dtype=np.int32)
+        counts = self.cumulative[hi - 1].copy()
+        if lo > 0:
+            counts -= self.cumulative[lo - 1]
+        return counts
+
+    def map_code(self, map_name):
+        codes = np.flatnonzero(self.map_names == map_name)
+        return codes[0] if len(codes) else None
+
+
+def load_pistol_tensor(store, path=PISTOL_TENSOR_PATH):
+    """pistol_tensor.npz if it was built from this round store, otherwise built on the spot."""
+    digest = store_digest(store)
+    if os.path.exists(path):
+        tensor = PistolTensor.load(path)
+        if tensor.digest == digest:
+            return tensor
+    return PistolTensor.from_round_store(store)
+
+
+# 🔫 Views
+def pistol_by_map(tensor, start_date=None, end_date=None):
+    """Pistol rounds won / played and win rate per map."""
+    counts = tensor.window(start_date, end_date)
+    played = counts.sum(axis=(1, 2, 3))
+    won = counts[:, :, WIN, :].sum(axis=(1, 2))
+
+    present = played > 0
+    grouped = pd.DataFrame({
+        'Map': tensor.map_names[present],
+        'Total_Pistols_Won': won[present].astype(int),
+        'Total_Pistols_Played': played[present].astype(np.int64),
+    }).sort_values(by='Map').reset_index(drop=True)
+    grouped['Pistol Win Rate (%)'] = (grouped['Total_Pistols_Won'] / grouped['Total_Pistols_Played']) * 100
+    return grouped.sort_values(by='Pistol Win Rate (%)', ascending=False)
+
+
+def pistol_by_side(tensor, start_date=None, end_date=None):
+    """Pistol win rate per map and side (Attack / Defence)."""
+    counts = tensor.window(start_date, end_date)[:, :2]
+    played = counts.sum(axis=(2, 3))
+    won = counts[:, :, WIN, :].sum(axis=2)
+    maps, sides = np.nonzero(played)
+    return pd.DataFrame({
+        'Map': tensor.map_names[maps],
+        'Side': np.array(SIDES)[sides],
+        'Pistols Won': won[maps, sides],
+        'Pistols Played': played[maps, sides],
+        'Pistol Win Rate (%)': won[maps, sides] / played[maps, sides] * 100,
+    }).sort_values(by=['Map', 'Side']).reset_index(drop=True)
+
+
+def conversion_counts(tensor, start_date=None, end_date=None):
+    """WW / WL / LW / LL counts per map and side, one row per (map, side) with any known conversion."""
+    counts = tensor.window(start_date, end_date)[:, :2]
+    table = pd.DataFrame({
+        code: counts[:, :, p, r].ravel() for code, (p, r) in CONVERSION_CODES.items()
+    })
+    table.insert(0, 'Side', np.tile(SIDE_NAMES, len(tensor.map_names)))
+    table.insert(0, 'Map', np.repeat(tensor.map_names, 2))
+    table = table[table[list(CONVERSION_CODES)].sum(axis=1) > 0]
+    return table.sort_values(by=['Map', 'Side']).reset_index(drop=True)
+
+
+def conversion_shares(tensor, selected_map, codes, start_date=None, end_date=None, side=None):
+    """
+    Percentage share of each code in `codes` (e.g. WW/WL) for one map,
+    optionally one side, as a Conversion / Percentage frame.
+    """
+    code = tensor.map_code(selected_map)
+    if code is None:
+        return pd.DataFrame(columns=['Conversion', 'Percentage'])
+    counts = tensor.window(start_date, end_date)[code, :2]
+    if side is not None:
+        counts = counts[list(SIDES).index(side)][None]
+    totals = pd.Series({c: counts[:, p, r].sum() for c, (p, r) in CONVERSION_CODES.items() if c in codes})
+    totals = totals[totals > 0]
+    if totals.empty:
+        return pd.DataFrame(columns=['Conversion', 'Percentage'])
+    pie_data = (totals / totals.sum() * 100).sort_values(ascending=False, kind='stable').reset_index()
+    pie_data.columns = ['Conversion', 'Percentage']
+    return pie_data
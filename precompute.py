@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import analytics
+import artifacts
+from comp_index import CompIndex
+from registry import load_registry
+import round_store
+from round_store import load_round_store
+from pistol_tensor import load_pistol_tensor
+from result_cache import ResultCache, dataset_version, cache_dir_from_env
+
+# Per-worker state, loaded once by _init_worker
+_data = {}
+
+
+def _init_worker(version, cache_dir):
+    _data['version'] = version
+    _data['cache'] = ResultCache(max_entries=64, disk_dir=cache_dir)
+    _data['score'] = analytics.load_score("cleaned_score.csv")
+    _data['form'] = analytics.load_form_blocks("form.csv")
+    _data['players'] = analytics.load_player_form("form.csv")
+    _data['registry'] = load_registry()
+
+
+def _cached(view, filters, compute):
+    """get_or_compute on the worker's cache, noting the key when this call computed and wrote the entry."""
+    key = ResultCache.make_key(_data['version'], view, filters)
+
+    def compute_and_note():
+        value = compute()
+        _data['written'].add(key)
+        return value
+
+    return _data['cache'].get_or_compute(_data['version'], view, filters, compute_and_note)
+
+
+def _score_dates(score_df):
+    """Default date selections, matching what each tab preselects."""
+    dates = sorted(score_df['Date'].dropna().unique())
+    parsed = analytics.score_dates(score_df['Date'])
+    return dates[0], dates[-1], parsed.min().date(), parsed.max().date()
+
+
+def warm_overview():
+    score_df = _data['score']
+    start, end, _, _ = _score_dates(score_df)
+    _cached("overview", {"start": start, "end": end},
+            lambda: artifacts.fresh_or("map_overview", lambda: analytics.map_overview(score_df, start, end)))
+
+
+def _composition_stats():
+    score_df, form_df = _data['score'], _data['form']
+    games_df = _cached("team_games", {}, lambda: artifacts.fresh_or("team_games", lambda: analytics.team_games(form_df, score_df)))
+    comp_stats = _cached("composition_stats", {}, lambda: artifacts.fresh_or("composition_stats", lambda: analytics.composition_stats(games_df)))
+    _cached("comp_maps", {}, lambda: analytics.composition_maps(games_df))
+    _cached("comp_index", {}, lambda: CompIndex(games_df))
+    return comp_stats
+
+
+def warm_compositions(selected_map):
+    comp_stats = _composition_stats()
+    _cached("compositions", {"map": selected_map},
+            lambda: analytics.composition_table(comp_stats, selected_map))
+
+
+def warm_round_insights():
+    score_df = _data['score']
+    start, end, _, _ = _score_dates(score_df)
+    round_filters = {"map": "All", "start": start, "end": end}
+    filtered_df = _cached("round_rows", round_filters,
+                          lambda: analytics.filter_rounds(score_df, "All", start, end))
+    _cached("round_summary", round_filters, lambda: analytics.round_summary(filtered_df))
+    rounds = _cached("round_store", {}, lambda: artifacts.fresh_or("round_store", lambda: load_round_store(score_df)))
+    if rounds.has_plants:
+        _cached("post_plant_rounds", {}, lambda: round_store.post_plant_by_map(rounds))
+    elif 'Atk_PP_Success' in score_df.columns and 'Def_PP_Success' in score_df.columns:
+        _cached("post_plant", {}, lambda: analytics.post_plant_by_map(score_df))
+
+
+def warm_pistol():
+    score_df = _data['score']
+    rounds = _cached("round_store", {}, lambda: artifacts.fresh_or("round_store", lambda: load_round_store(score_df)))
+    _cached("pistol_tensor", {}, lambda: artifacts.fresh_or("pistol_tensor", lambda: load_pistol_tensor(rounds)))
+
+
+def warm_player(player):
+    player_df = _data['players']
+    start, end = player_df['Date'].min().date(), player_df['Date'].max().date()
+    filters = {"player": player, "start": start, "end": end, "map": "All"}
+
+    def compute():
+        stored = artifacts.fresh("agent_stats")
+        if stored is not None and player in stored:
+            return stored[player]
+        return analytics.player_agent_stats(player_df, player, start, end, "All")
+
+    _cached("player_agent_stats", filters, compute)
+
+
+def warm_roster():
+    """Role stats for every player over the full range, as the Player Comparison tab opens."""
+    player_df = _data['players']
+    start, end = player_df['Date'].min().date(), player_df['Date'].max().date()
+    _cached("roster_role_stats", {"start": start, "end": end, "map": "All"},
+            lambda: artifacts.fresh_or("roster_roles", lambda: analytics.roster_role_stats(player_df, start, end, "All", _data['registry'])))
+
+
+def _run(task):
+    name, args = task
+    started = time.perf_counter()
+    _data['written'] = set()
+    globals()[name](*args)
+    return name, args, _data['written'], time.perf_counter() - started
+
+
+def build_tasks():
+    score_df = analytics.load_score("cleaned_score.csv")
+    form_df = analytics.load_form_blocks("form.csv")
+    player_df = analytics.load_player_form("form.csv")
+
+    tasks = [("warm_overview", ()), ("warm_round_insights", ())]
+    games_df = analytics.team_games(form_df, score_df)
+    tasks += [("warm_compositions", (m,)) for m in analytics.composition_maps(games_df)]
+    tasks.append(("warm_pistol", ()))
+    tasks.append(("warm_roster", ()))
+    tasks += [("warm_player", (p,)) for p in sorted(player_df['Player'].dropna().unique())]
+    return tasks
+
+
+def warm_cache(workers=None, cache_dir=None):
+    """
+    Fill the shared result cache with the default view of every tab
+    for the current dataset version. Returns the number of entries written
+    (views already on disk, or written by another task, aren't counted again).
+    """
+    cache_dir = cache_dir if cache_dir is not None else cache_dir_from_env()
+    if not cache_dir:
+        print("⚠️ DASHBOARD_CACHE_DIR is disabled, nothing to precompute")
+        return 0
+
+    version = dataset_version()
+    removed = ResultCache(disk_dir=cache_dir).purge_disk(version)
+    if removed:
+        print(f"🧹 Removed {removed} cache entries from older dataset versions")
+
+    tasks = build_tasks()
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    print(f"🔥 Precomputing {len(tasks)} views for dataset {version} with {workers} workers")
+
+    started = time.perf_counter()
+    written = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version, cache_dir)) as pool:
+        futures = [pool.submit(_run, task) for task in tasks]
+        for future in as_completed(futures):
+            name, args, keys, seconds = future.result()
+            written |= keys
+            label = ', '.join(str(a) for a in args) if args and not isinstance(args[0], list) else ''
+            print(f"  ✅ {name}({label}) -> {len(keys)} entries written in {seconds * 1000:.0f} ms")
+
+    total = len(written)
+    print(f"📦 Wrote {total} new cache entries in {time.perf_counter() - started:.1f}s → {cache_dir}")
+    return total
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    warm_cache(workers=int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,92 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def prefetch_workers_from_env():
+    """Background threads used to precompute likely next views ('0' disables prefetching)."""
+    return int(os.environ.get("DASHBOARD_PREFETCH_WORKERS", 2))
+
+
+class Prefetcher:
+    """
+    Computes views the user is likely to ask for next on a small thread pool
+    and stores them in the shared ResultCache.
+
+    At most `max_pending` jobs are queued; further requests are dropped.
+    When the dataset version changes, queued jobs are cancelled and running
+    ones finish without storing their (now stale) result.
+    """
+
+    def __init__(self, cache, workers=2, max_pending=32):
+        self.cache = cache
+        self.max_pending = max_pending
+        self.version = None
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") if workers > 0 else None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def set_version(self, version):
+        """Switch to a new dataset version, cancelling everything queued for the old one."""
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            stale = [key for key in self._pending if key[0] != version]
+            for key in stale:
+                if self._pending.pop(key).cancel():
+                    self.cancelled += 1
+
+    def submit(self, view, filters, compute):
+        """Queue `compute` for (current version, view, filters) unless it's cached, queued or the queue is full."""
+        if self._pool is None:
+            return False
+        key = self.cache.make_key(self.version, view, filters)
+        with self._lock:
+            if key in self._pending:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+        if key in self.cache:
+            return False
+
+        with self._lock:
+            future = self._pool.submit(self._run, key, compute)
+            self._pending[key] = future
+            self.submitted += 1
+        return True
+
+    def _run(self, key, compute):
+        try:
+            if key[0] != self.version:
+                return
+            value = compute()
+            # Dataset changed while computing: don't store a stale result
+            if key[0] == self.version:
+                self.cache.put(key, value)
+                with self._lock:
+                    self.completed += 1
+        except Exception:
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+            }
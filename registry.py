@@ -0,0 +1,113 @@
+import base64
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+REGISTRY_PATH = "registry.json"
+UNKNOWN_ROLE = "Unknown"
+
+
+class Registry:
+    """
+    Agents (role, icon path, whether the icon exists), role benchmarks per
+    region/season and radar normalisation bounds from registry.json.
+
+    Everything is resolved once at load time, so lookups never touch the
+    filesystem and vectorized code can use the code arrays directly.
+    """
+
+    def __init__(self, config, base_dir="."):
+        self.version = config.get("version", 1)
+        self.roles = list(config["roles"])
+        self.benchmarks = config["benchmarks"]
+        self.default_region = config["default_benchmark"]["region"]
+        self.default_season = config["default_benchmark"]["season"]
+        self.norm_base = dict(config["norm_base"])
+
+        self.agents = {}
+        for name, info in config["agents"].items():
+            icon = info.get("icon") or f"assets/agents/{name.lower().replace('/', '_').replace(' ', '_')}.png"
+            icon_path = os.path.join(base_dir, icon)
+            self.agents[name] = {
+                "role": info["role"],
+                "icon": icon_path,
+                "icon_exists": os.path.exists(icon_path),
+            }
+
+        # Lookup tables
+        self.agent_names = sorted(self.agents)
+        self.agent_roles = {name: info["role"] for name, info in self.agents.items()}
+        self._by_lower = {name.lower(): name for name in self.agents}
+
+        # Mapping arrays: agent code -> role code (UNKNOWN_ROLE gets the last code)
+        self.role_codes = {role: i for i, role in enumerate(self.roles + [UNKNOWN_ROLE])}
+        self.agent_codes = {name: i for i, name in enumerate(self.agent_names)}
+        self.agent_role_codes = np.array(
+            [self.role_codes[self.agent_roles[name]] for name in self.agent_names], dtype=np.int8
+        )
+
+        self._icon_uris = {}
+
+    def canonical(self, agent):
+        """Registry spelling of an agent name ('Kay/o' -> 'KAY/O'); unknown names pass through."""
+        return self._by_lower.get(str(agent).lower(), agent)
+
+    def role_of(self, agent):
+        return self.agent_roles.get(self.canonical(agent), UNKNOWN_ROLE)
+
+    def roles_for(self, agents):
+        """Vectorized agent -> role mapping for a Series of agent names (NaN when unknown)."""
+        canonical = agents.astype(str).str.lower().map(self._by_lower)
+        return canonical.map(self.agent_roles)
+
+    def codes_for(self, agents):
+        """Agent codes (index into `agent_names`, -1 when unknown) for a Series of agent names."""
+        canonical = agents.astype(str).str.lower().map(self._by_lower)
+        return canonical.map(self.agent_codes).fillna(-1).astype(np.int16).to_numpy()
+
+    def icon_data_uri(self, agent):
+        """Base64 data URI for an agent's icon, or None if there is no icon on disk."""
+        name = self.canonical(agent)
+        info = self.agents.get(name)
+        if not info or not info["icon_exists"]:
+            return None
+        if name not in self._icon_uris:
+            with open(info["icon"], "rb") as f:
+                self._icon_uris[name] = "data:image/png;base64," + base64.b64encode(f.read()).decode()
+        return self._icon_uris[name]
+
+    def regions(self):
+        return sorted(self.benchmarks)
+
+    def seasons(self, region):
+        return sorted(self.benchmarks.get(region, {}))
+
+    def benchmark(self, role, region=None, season=None):
+        region = region or self.default_region
+        season = season or self.default_season
+        return self.benchmarks[region][season][role]
+
+    def role_benchmarks(self, region=None, season=None):
+        """{role: {stat: value}} for one region/season."""
+        region = region or self.default_region
+        season = season or self.default_season
+        return self.benchmarks[region][season]
+
+    def benchmark_frame(self, region=None, season=None):
+        """Role x stat DataFrame of benchmark values (NaN where a role has no benchmark)."""
+        return pd.DataFrame.from_dict(self.role_benchmarks(region, season), orient='index')
+
+
+@lru_cache(maxsize=4)
+def _load(path, mtime_ns):
+    with open(path) as f:
+        config = json.load(f)
+    return Registry(config, base_dir=os.path.dirname(path) or ".")
+
+
+def load_registry(path=REGISTRY_PATH):
+    """Registry for `path`, parsed once and reused until the file changes."""
+    return _load(path, os.stat(path).st_mtime_ns)
@@ -0,0 +1,271 @@
+import argparse
+import html
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import analytics
+import figures
+import styling
+import pistol_tensor
+from percentiles import load_percentile_engine
+from pistol_tensor import load_pistol_tensor
+from registry import load_registry
+from result_cache import ResultCache, dataset_version, cache_dir_from_env
+from round_store import load_round_store
+
+PAGE_STYLE = """
+body { background: #000000; color: #ffffff; font-family: Inter, sans-serif; margin: 2rem; }
+h1, h2, h3 { color: #FDB913; }
+a { color: #FDB913; }
+table.report-table { border-collapse: collapse; margin: 1rem 0; }
+table.report-table th { background: #1a1a1a; color: #FDB913; padding: 6px 10px; }
+table.report-table td { border-top: 1px solid #333333; padding: 6px 10px; text-align: center; }
+.charts { display: flex; flex-wrap: wrap; gap: 1rem; }
+.charts > div { flex: 1 1 480px; }
+.meta { color: #999999; font-size: 12px; }
+"""
+
+# Shared aggregates, sent once to each worker by _init_worker
+_shared = {}
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-') or 'report'
+
+
+def build_shared(cache=None, version=None):
+    """
+    Aggregates every report reads, computed (or pulled from the result cache)
+    once per run instead of once per report.
+    """
+    version = version or dataset_version()
+    cache = cache or ResultCache(disk_dir=cache_dir_from_env())
+
+    def cached(view, filters, compute):
+        return cache.get_or_compute(version, view, filters, compute)
+
+    score_df = analytics.load_score("cleaned_score.csv")
+    form_df = analytics.load_form_blocks("form.csv")
+    player_df = analytics.load_player_form("form.csv")
+    registry = load_registry()
+
+    dates = sorted(score_df['Date'].dropna().unique())
+    parsed = analytics.score_dates(score_df['Date'])
+    start, end = parsed.min().date(), parsed.max().date()
+    round_filters = {"map": "All", "start": dates[0], "end": dates[-1]}
+
+    games_df = cached("team_games", {}, lambda: analytics.team_games(form_df, score_df))
+    rounds = cached("round_store", {}, lambda: load_round_store(score_df))
+    pistols = cached("pistol_tensor", {}, lambda: load_pistol_tensor(rounds))
+    player_start, player_end = player_df['Date'].min().date(), player_df['Date'].max().date()
+    round_rows = cached("round_rows", round_filters, lambda: analytics.filter_rounds(score_df, "All", dates[0], dates[-1]))
+
+    return {
+        'version': version,
+        'date_range': (str(start), str(end)),
+        'registry': registry,
+        'percentiles': cached("percentile_engine", {}, load_percentile_engine),
+        'player_df': player_df,
+        'roster': cached("roster_role_stats", {"start": player_start, "end": player_end, "map": "All"},
+                         lambda: analytics.roster_role_stats(player_df, player_start, player_end, "All", registry)),
+        'overview': cached("overview", {"start": dates[0], "end": dates[-1]},
+                           lambda: analytics.map_overview(score_df, dates[0], dates[-1])),
+        'comp_stats': cached("composition_stats", {}, lambda: analytics.composition_stats(games_df)),
+        'round_summary': cached("round_summary", round_filters, lambda: analytics.round_summary(round_rows)),
+        'pistols': pistols,
+    }
+
+
+def _init_worker(shared):
+    _shared.update(shared)
+
+
+def _table(df, float_format="{:.2f}".format):
+    return df.to_html(index=False, classes="report-table", border=0, float_format=float_format, na_rep="-")
+
+
+def _win_rate_table(df, win_rate_columns, scale=1, float_format="{:.1f}"):
+    """_table with win rates coloured green / amber / red and shown as percentages."""
+    percent = "{:.1%}" if scale == 100 else "{:.1f}%"
+    styler = styling.style_win_rates(df, win_rate_columns, scale)\
+        .format(float_format, subset=[c for c in df.columns if c not in win_rate_columns and pd.api.types.is_float_dtype(df[c])])\
+        .format(percent, subset=win_rate_columns, na_rep="-")\
+        .hide(axis="index")
+    return styler.to_html(table_attributes='class="report-table"')
+
+
+def _figure(fig, png_path=None):
+    if png_path:
+        fig.write_image(png_path, width=1000, height=600)
+    return f"<div>{fig.to_html(full_html=False, include_plotlyjs=False)}</div>"
+
+
+def _page(title, body, depth=1):
+    prefix = "../" * depth
+    back = f'<p><a href="{prefix}index.html">← All reports</a></p>\n' if depth else ''
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<script src="{prefix}plotly.min.js"></script>
+<style>{PAGE_STYLE}</style>
+</head>
+<body>
+{back}<h1>{html.escape(title)}</h1>
+<p class="meta">Dataset {_shared['version']} · {_shared['date_range'][0]} to {_shared['date_range'][1]}</p>
+{body}
+</body>
+</html>
+"""
+
+
+def render_player_report(player, out_dir, png=False):
+    """Agent stats and role radars for one player over the full date range."""
+    player_df, registry = _shared['player_df'], _shared['registry']
+    start, end = player_df['Date'].min().date(), player_df['Date'].max().date()
+    slug = slugify(player)
+    png_base = os.path.join(out_dir, "players", slug) if png else None
+
+    sections = []
+    agent_stats = analytics.player_agent_stats(player_df, player, start, end, "All")
+    if agent_stats.empty:
+        sections.append("<p>No data for this player.</p>")
+    else:
+        sections.append("<h2>🔢 Agent Stats</h2>" + _table(agent_stats))
+
+    roster = _shared['roster']
+    charts = []
+    if player in roster.index.get_level_values('Player'):
+        player_roles = roster.loc[player]
+        for role, benchmark in registry.role_benchmarks().items():
+            if role not in player_roles.index:
+                continue
+            player_avg = player_roles.loc[role, list(benchmark)].to_dict()
+            engine = _shared['percentiles']
+            region, season = registry.default_region, registry.default_season
+            if engine is not None and engine.has(role, region, season):
+                percentiles = {stat: engine.percentile(role, stat, [player_avg[stat]], region, season)[0] for stat in benchmark}
+                pros = {stat: engine.sample_size(role, stat, region, season) for stat in benchmark}
+                fig = figures.percentile_radar(percentiles, player, role, region, pros)
+            else:
+                fig = figures.role_radar(player_avg, benchmark, registry.norm_base, player, role, region)
+            charts.append(_figure(fig, f"{png_base}-{slugify(role)}.png" if png else None))
+    if charts:
+        sections.append("<h2>🆚 Role Comparison</h2><div class='charts'>" + "".join(charts) + "</div>")
+
+    path = os.path.join(out_dir, "players", f"{slug}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_page(f"{player} – Player Report", "\n".join(sections)))
+    return path
+
+
+def render_map_report(map_name, out_dir, png=False):
+    """Results, compositions, side win rates, pistols and 2nd rounds for one map."""
+    slug = slugify(map_name)
+    png_base = os.path.join(out_dir, "maps", slug) if png else None
+    sections = []
+
+    overview = _shared['overview']
+    if not overview.empty:
+        sections.append("<h2>📊 Results</h2>" + _win_rate_table(overview[overview['Map'] == map_name], ['Win Rate'], scale=100))
+
+    comps = analytics.composition_table(_shared['comp_stats'], map_name)
+    if not comps.empty:
+        comp_cols = ['Comp String', 'games', 'wins', 'draws', 'losses', 'Win Rate %', 'Wilson Low %', 'Wilson High %']
+        sections.append("<h2>🧩 Top Compositions</h2>" + _win_rate_table(comps[comp_cols], ['Win Rate %', 'Wilson Low %', 'Wilson High %']))
+
+    charts = []
+    summary = _shared['round_summary']
+    map_summary = summary[summary['Map'] == map_name]
+    if not map_summary.empty:
+        charts.append(_figure(figures.side_winrate_bar(map_summary), f"{png_base}-sides.png" if png else None))
+
+    pistols = _shared['pistols']
+    map_pistol = pistol_tensor.pistol_by_side(pistols)
+    map_pistol = map_pistol[map_pistol['Map'] == map_name]
+    if not map_pistol.empty:
+        charts.append(_figure(figures.pistol_side_bar(map_pistol), f"{png_base}-pistol.png" if png else None))
+
+    for codes, title, colors, suffix in (
+        (['WW', 'WL'], f"Pistol Conversion - {map_name}", {'WW': '#FDB913', 'WL': '#666666'}, 'conversion'),
+        (['LL', 'LW'], f"Eco Round Outcomes - {map_name}", {'LL': '#444444', 'LW': '#3b82f6'}, 'eco'),
+    ):
+        pie_data = pistol_tensor.conversion_shares(pistols, map_name, codes)
+        if not pie_data.empty:
+            charts.append(_figure(figures.conversion_pie(pie_data, title, colors), f"{png_base}-{suffix}.png" if png else None))
+
+    if charts:
+        sections.append("<h2>📈 Rounds</h2><div class='charts'>" + "".join(charts) + "</div>")
+
+    path = os.path.join(out_dir, "maps", f"{slug}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_page(f"{map_name} – Map Report", "\n".join(sections)))
+    return path
+
+
+def _run(task):
+    kind, name, out_dir, png = task
+    started = time.perf_counter()
+    render = render_player_report if kind == "player" else render_map_report
+    path = render(name, out_dir, png)
+    return kind, name, path, time.perf_counter() - started
+
+
+def write_index(out_dir, players, maps, shared):
+    links = lambda kind, names: "".join(
+        f'<li><a href="{kind}/{slugify(n)}.html">{html.escape(str(n))}</a></li>' for n in names
+    )
+    _shared.update(shared)
+    body = f"<h2>🔢 Players</h2><ul>{links('players', players)}</ul><h2>🗺️ Maps</h2><ul>{links('maps', maps)}</ul>"
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_page("Scrim Reports", body, depth=0))
+
+
+def generate_reports(out_dir="reports", workers=None, png=False):
+    """Render every player and map report into `out_dir`. Returns the written paths."""
+    if png and importlib.util.find_spec("kaleido") is None:
+        print("⚠️ kaleido isn't installed, skipping PNG export (pip install kaleido)")
+        png = False
+
+    started = time.perf_counter()
+    shared = build_shared()
+    print(f"📦 Shared aggregates ready for dataset {shared['version']} in {time.perf_counter() - started:.2f}s")
+
+    players = sorted(shared['player_df']['Player'].dropna().unique())
+    maps = sorted(set(shared['overview']['Map']) if not shared['overview'].empty else [])
+
+    for sub in ("players", "maps"):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+    with open(os.path.join(out_dir, "plotly.min.js"), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+    write_index(out_dir, players, maps, shared)
+
+    tasks = [("player", p, out_dir, png) for p in players] + [("map", m, out_dir, png) for m in maps]
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        futures = [pool.submit(_run, task) for task in tasks]
+        for future in as_completed(futures):
+            kind, name, path, seconds = future.result()
+            paths.append(path)
+            print(f"  ✅ {kind} {name} -> {path} ({seconds * 1000:.0f} ms)")
+
+    print(f"📁 Wrote {len(paths)} reports to {out_dir}/index.html in {time.perf_counter() - started:.1f}s")
+    return paths
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render static HTML (and PNG) reports for every player and map.")
+    parser.add_argument("--out", default="reports", help="output folder (default: reports)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--png", action="store_true", help="also export each chart as PNG (needs kaleido)")
+    args = parser.parse_args()
+    generate_reports(args.out, args.workers, args.png)
@@ -0,0 +1,251 @@
+import datetime
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Files whose contents define "the dataset" — any change gives a new version
+DATASET_FILES = ("cleaned_score.csv", "form.csv", "foracs.csv", "rounds.npz", "registry.json", "benchmark_players.csv")
+
+
+def cache_dir_from_env():
+    """Disk cache folder shared by the dashboard and the precompute job ('' disables it)."""
+    return os.environ.get("DASHBOARD_CACHE_DIR", ".dashboard_cache")
+
+
+def cache_size_from_env():
+    return int(os.environ.get("DASHBOARD_CACHE_SIZE", 256))
+
+
+def cache_disk_mb_from_env():
+    """Size cap of the disk cache folder in MB; least recently used entries are deleted past it."""
+    return float(os.environ.get("DASHBOARD_CACHE_DISK_MB", 256))
+
+
+_version_memo = {}
+
+
+def dataset_version(paths=DATASET_FILES):
+    """
+    Short content hash of the dashboard's data files.
+    The hash is only recomputed when a file's size or mtime changes.
+    """
+    stamp = []
+    for path in paths:
+        try:
+            st_ = os.stat(path)
+            stamp.append((path, st_.st_size, st_.st_mtime_ns))
+        except OSError:
+            stamp.append((path, None, None))
+    stamp = tuple(stamp)
+
+    if stamp not in _version_memo:
+        digest = hashlib.sha1()
+        for path, size, _ in stamp:
+            digest.update(path.encode())
+            if size is not None:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        _version_memo.clear()
+        _version_memo[stamp] = digest.hexdigest()[:12]
+    return _version_memo[stamp]
+
+
+def _normalize(value):
+    """Turn a filter value into a hashable, stable representation."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_normalize(v) for v in value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return repr(value)
+
+
+def normalize_filters(filters):
+    """Normalized, order-independent tuple for a dict of filter values."""
+    return _normalize(filters or {})
+
+
+class ResultCache:
+    """
+    Process-wide LRU cache of view results keyed on
+    (dataset version, view name, normalized filters).
+
+    Results are shared between every session, so treat returned
+    objects as read-only. When `disk_dir` is set, entries are also
+    pickled there so they survive restarts. The folder is capped at
+    `max_disk_entries` files / `max_disk_mb`: past either, the least
+    recently used files (by mtime, refreshed on every disk hit) are
+    deleted down to 90% of the cap. Processes sharing the folder
+    evict from the same pool.
+    """
+
+    DISK_LOW_WATER = 0.9
+
+    def __init__(self, max_entries=256, disk_dir=None, max_disk_entries=4096, max_disk_mb=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = (cache_disk_mb_from_env() if max_disk_mb is None else max_disk_mb) * 1024 * 1024
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._evict_disk()
+
+    @staticmethod
+    def make_key(version, view, filters=None):
+        return (version, view, normalize_filters(filters))
+
+    def _disk_path(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{key[0]}-{name}.pkl")
+
+    def _store(self, key, value):
+        # Caller holds the lock
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    with open(path, "rb") as f:
+                        value = pickle.load(f)
+                    os.utime(path)
+                except Exception:
+                    value = None
+                else:
+                    with self._lock:
+                        self._store(key, value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.disk_dir) and os.path.exists(self._disk_path(key))
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = os.path.getsize(tmp)
+                os.replace(tmp, path)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                return
+            with self._disk_lock:
+                self._disk_files += 1
+                self._disk_bytes += size
+                over = self._disk_files > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes
+            if over:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """Rescan the disk folder and delete the least recently used files until it's under the low-water mark."""
+        with self._disk_lock:
+            files = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".pkl"):
+                    try:
+                        st_ = os.stat(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        continue
+                    files.append((st_.st_mtime_ns, st_.st_size, name))
+            files.sort()
+            count, total = len(files), sum(size for _, size, _ in files)
+            if count > self.max_disk_entries or total > self.max_disk_bytes:
+                max_files = int(self.max_disk_entries * self.DISK_LOW_WATER)
+                max_bytes = self.max_disk_bytes * self.DISK_LOW_WATER
+                for _, size, name in files:
+                    if count <= max_files and total <= max_bytes:
+                        break
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+                    count -= 1
+                    total -= size
+                    self.disk_evictions += 1
+            self._disk_files, self._disk_bytes = count, total
+
+    def get_or_compute(self, version, view, filters, compute):
+        """Return the cached result for a view, computing and storing it on a miss."""
+        key = self.make_key(version, view, filters)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def purge_disk(self, keep_version):
+        """Delete persisted entries that belong to any other dataset version."""
+        if not self.disk_dir:
+            return 0
+        removed = 0
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".pkl") and not name.startswith(f"{keep_version}-"):
+                os.remove(os.path.join(self.disk_dir, name))
+                removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
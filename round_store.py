@@ -0,0 +1,208 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import analytics
+
+ROUNDS_PATH = "rounds.npz"
+
+ATTACK, DEFENCE = 0, 1
+SIDE_NAMES = np.array(['Attack', 'Defence'])
+UNKNOWN = -1
+# Rounds per half in regulation; pistols are the first round of each half
+HALF_ROUNDS = 12
+
+_SIDE_CODES = {'attack': ATTACK, 'atk': ATTACK, 'a': ATTACK, 'defence': DEFENCE, 'defense': DEFENCE, 'def': DEFENCE, 'd': DEFENCE}
+_FLAG_CODES = {'1': 1, '1.0': 1, 'w': 1, 'win': 1, 'y': 1, 'yes': 1, 'true': 1, '0': 0, '0.0': 0, 'l': 0, 'loss': 0, 'n': 0, 'no': 0, 'false': 0}
+
+
+def _flags(values):
+    """Parse W/L, Y/N, 1/0, True/False cells into int8 with -1 for blanks."""
+    codes = pd.Series(values).astype(str).str.strip().str.lower().map(_FLAG_CODES)
+    return codes.fillna(UNKNOWN).astype(np.int8).to_numpy()
+
+
+def _column(df, name):
+    """
+    Column by name, ignoring repeated whitespace in headers ('Def  2nd' == 'Def 2nd').
+    With duplicate headers (the raw sheet has two 'Date' columns) the first one wins.
+    """
+    for i, col in enumerate(df.columns):
+        if col == name or ' '.join(str(col).split()) == name:
+            return df.iloc[:, i]
+    raise KeyError(name)
+
+
+def _sides(values):
+    codes = pd.Series(values).astype(str).str.strip().str.lower().map(_SIDE_CODES)
+    return codes.fillna(UNKNOWN).astype(np.int8).to_numpy()
+
+
+class RoundStore:
+    """
+    Round-level results stored as flat int8/bool columns with per-game offsets.
+
+    Rounds of game g live in [offsets[g], offsets[g + 1]). Game-level columns
+    (map, date, outcome) have one entry per game. Flags use -1 for "unknown",
+    e.g. plants when the store was derived from half-level summaries.
+    """
+
+    ROUND_COLUMNS = ('round_no', 'side', 'won', 'planted', 'pistol', 'eco')
+
+    def __init__(self, offsets, maps, map_names, dates, outcomes, round_no, side, won, planted, pistol, eco):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.maps = np.asarray(maps, dtype=np.int16)
+        self.map_names = np.asarray(map_names, dtype=object)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.outcomes = np.asarray(outcomes, dtype=np.int8)
+        self.round_no = np.asarray(round_no, dtype=np.int8)
+        self.side = np.asarray(side, dtype=np.int8)
+        self.won = np.asarray(won, dtype=np.int8)
+        self.planted = np.asarray(planted, dtype=np.int8)
+        self.pistol = np.asarray(pistol, dtype=bool)
+        self.eco = np.asarray(eco, dtype=np.int8)
+
+    @property
+    def n_games(self):
+        return len(self.maps)
+
+    @property
+    def game_of_round(self):
+        return np.repeat(np.arange(self.n_games), np.diff(self.offsets))
+
+    @property
+    def has_plants(self):
+        return bool((self.planted != UNKNOWN).any())
+
+    def game_mask(self, start_date=None, end_date=None):
+        keep = ~np.isnat(self.dates) & (self.maps >= 0)
+        if start_date is not None:
+            keep &= self.dates >= np.datetime64(pd.to_datetime(start_date).date(), 'D')
+        if end_date is not None:
+            keep &= self.dates <= np.datetime64(pd.to_datetime(end_date).date(), 'D')
+        return keep
+
+    def round_mask(self, start_date=None, end_date=None):
+        return np.repeat(self.game_mask(start_date, end_date), np.diff(self.offsets))
+
+    # 💾 Storage
+    def save(self, path=ROUNDS_PATH):
+        np.savez_compressed(
+            path,
+            offsets=self.offsets, maps=self.maps, map_names=self.map_names.astype(str),
+            dates=self.dates, outcomes=self.outcomes,
+            **{col: getattr(self, col) for col in self.ROUND_COLUMNS}
+        )
+
+    @classmethod
+    def load(cls, path=ROUNDS_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+    # 📥 Builders
+    @classmethod
+    def from_round_log(cls, log_df):
+        """
+        Build from a round log with one row per round:
+        Date, Opponent, Map, Round, Side, Won, Planted, Eco (Pistol optional).
+        A new game starts whenever Date/Opponent/Map change or Round goes back down.
+        """
+        log_df = log_df.reset_index(drop=True)
+        round_no = pd.to_numeric(log_df['Round'], errors='coerce').fillna(0).astype(np.int8).to_numpy()
+        keys = log_df[['Date', 'Opponent', 'Map']].astype(str)
+        new_game = (keys != keys.shift()).any(axis=1).to_numpy() | (np.diff(round_no.astype(np.int16), prepend=np.int16(127)) <= 0)
+        starts = np.flatnonzero(new_game)
+        offsets = np.append(starts, len(log_df))
+
+        won = _flags(log_df['Won'])
+        game_of_round = np.repeat(np.arange(len(starts)), np.diff(offsets))
+        rounds_won = np.bincount(game_of_round, weights=(won == 1), minlength=len(starts))
+        rounds_lost = np.bincount(game_of_round, weights=(won == 0), minlength=len(starts))
+
+        map_codes, map_names = pd.factorize(log_df['Map'].to_numpy()[starts])
+        if 'Pistol' in log_df.columns:
+            pistol = _flags(log_df['Pistol']) == 1
+        else:
+            pistol = (round_no == 1) | (round_no == HALF_ROUNDS + 1)
+
+        return cls(
+            offsets=offsets,
+            maps=map_codes,
+            map_names=map_names,
+            dates=analytics.score_dates(log_df['Date'].to_numpy()[starts]).to_numpy().astype('datetime64[D]'),
+            outcomes=np.sign(rounds_won - rounds_lost),
+            round_no=round_no,
+            side=_sides(log_df['Side']),
+            won=won,
+            planted=_flags(log_df['Planted']) if 'Planted' in log_df.columns else np.full(len(log_df), UNKNOWN),
+            pistol=pistol,
+            eco=_flags(log_df['Eco']) if 'Eco' in log_df.columns else np.full(len(log_df), UNKNOWN),
+        )
+
+    @classmethod
+    def from_score_summary(cls, score_df):
+        """
+        Derive the rounds that cleaned_score.csv pins down: each half's pistol
+        (First/Second Pistol) and the round after it (2nd letter of Atk/Def 2nd).
+        """
+        n = len(score_df)
+        starts_attack = (score_df['Start'] == 'Attack').to_numpy()
+        first_side = np.where(starts_attack, ATTACK, DEFENCE).astype(np.int8)
+        second_side = 1 - first_side
+
+        # 2nd-round result for each half, from the code of the side played in that half
+        atk_second = _column(score_df, 'Atk 2nd').astype(str).str[1:2].to_numpy()
+        def_second = _column(score_df, 'Def 2nd').astype(str).str[1:2].to_numpy()
+        first_r2 = _flags(np.where(starts_attack, atk_second, def_second))
+        second_r2 = _flags(np.where(starts_attack, def_second, atk_second))
+
+        # 4 rounds per game: 1, 2, 13, 14
+        round_no = np.tile(np.array([1, 2, HALF_ROUNDS + 1, HALF_ROUNDS + 2], dtype=np.int8), n)
+        side = np.stack([first_side, first_side, second_side, second_side], axis=1).ravel()
+        won = np.stack([
+            _flags(score_df['First Pistol'].to_numpy()), first_r2,
+            _flags(score_df['Second Pistol'].to_numpy()), second_r2
+        ], axis=1).ravel()
+
+        outcome = score_df['Outcome'].astype(str).str.lower().map({'win': 1, 'draw': 0, 'loss': -1}).fillna(0)
+        map_codes, map_names = pd.factorize(score_df['Map'])
+        return cls(
+            offsets=np.arange(0, 4 * n + 1, 4),
+            maps=map_codes,
+            map_names=map_names,
+            dates=analytics.score_dates(_column(score_df, 'Date')).to_numpy().astype('datetime64[D]'),
+            outcomes=outcome.to_numpy(),
+            round_no=round_no,
+            side=side,
+            won=won,
+            planted=np.full(4 * n, UNKNOWN),
+            pistol=np.tile(np.array([True, False, True, False]), n),
+            eco=np.full(4 * n, UNKNOWN),
+        )
+
+
+def load_round_store(score_df, path=ROUNDS_PATH):
+    """rounds.npz written by data_cleaner, or rounds derived from the score summary if it's missing."""
+    if os.path.exists(path):
+        return RoundStore.load(path)
+    return RoundStore.from_score_summary(score_df)
+
+
+# 🔫 Views derived from the round arrays
+def post_plant_by_map(store, start_date=None, end_date=None):
+    """Attack rounds won after planting and defence rounds won after a plant (retakes), in 0–100."""
+    keep = store.round_mask(start_date, end_date) & (store.planted == 1) & (store.won != UNKNOWN)
+    round_maps = store.maps[store.game_of_round]
+    n_maps = len(store.map_names)
+
+    rates = {}
+    for side, column in ((ATTACK, 'Atk_PP_Success'), (DEFENCE, 'Def_PP_Success')):
+        on_side = keep & (store.side == side)
+        plants = np.bincount(round_maps[on_side], minlength=n_maps)
+        won = np.bincount(round_maps[on_side], weights=(store.won[on_side] == 1), minlength=n_maps)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates[column] = np.where(plants > 0, won / plants * 100, np.nan)
+
+    pp_df = pd.DataFrame({'Map': store.map_names, **rates})
+    return pp_df.dropna(how='all', subset=list(rates)).sort_values(by='Map').reset_index(drop=True)
@@ -0,0 +1,230 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import analytics
+from deltas import DELTAS_PATH, DayAggregates, load_day_aggregates
+from pistol_tensor import PistolTensor, load_pistol_tensor
+from result_cache import dataset_version
+from round_store import RoundStore, load_round_store
+from trends import TRENDS_PATH, TrendEngine, load_trends
+
+SHARED_DIR = ".shared_data"
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 3
+BASE_PORT = 8601
+
+# Row tables published as Arrow IPC files, and how to load each from the CSVs
+TABLES = {
+    'score': lambda: analytics.load_score("cleaned_score.csv"),
+    'form_blocks': lambda: analytics.load_form_blocks("form.csv"),
+    'players': lambda: analytics.load_player_form("form.csv"),
+}
+
+
+def shared_dir_from_env():
+    """Published dataset folder the dashboard attaches to ('' = read the CSVs directly)."""
+    return os.environ.get("DASHBOARD_SHARED_DIR", "")
+
+
+# 📤 Publishing
+def _write_table(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Uncompressed IPC files can be memory-mapped and read without copying
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _write_arrays(arrays, folder):
+    os.makedirs(folder)
+    for name, values in arrays.items():
+        np.save(os.path.join(folder, f"{name}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+
+
+def _write_current(base_dir, version):
+    tmp = os.path.join(base_dir, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(base_dir, CURRENT_FILE))
+
+
+def _prune(base_dir, current, keep):
+    """Drop all but the newest `keep` versions. Workers still mapping a dropped one keep their pages until they re-attach."""
+    versions = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d)) and not d.endswith(".tmp")]
+    versions.sort(key=lambda d: os.path.getmtime(os.path.join(base_dir, d)), reverse=True)
+    for old in versions[keep:]:
+        if old != current:
+            shutil.rmtree(os.path.join(base_dir, old), ignore_errors=True)
+
+
+def publish(base_dir=SHARED_DIR, keep=KEEP_VERSIONS):
+    """
+    Write the typed tables and aggregate cubes for the current dataset version
+    into base_dir/<version>/ and point CURRENT at it. The version folder is
+    complete before the rename that makes it visible, and CURRENT is swapped
+    with one rename, so workers never see a half-written dataset.
+    Returns (version, seconds); publishing an existing version only moves CURRENT.
+    """
+    t0 = time.perf_counter()
+    os.makedirs(base_dir, exist_ok=True)
+    version = dataset_version()
+    target = os.path.join(base_dir, version)
+
+    if not os.path.isdir(target):
+        tmp = f"{target}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        frames = {name: load() for name, load in TABLES.items()}
+        for name, df in frames.items():
+            _write_table(df, os.path.join(tmp, f"{name}.arrow"))
+
+        rounds = load_round_store(frames['score'])
+        pistols = load_pistol_tensor(rounds)
+        _write_arrays({'offsets': rounds.offsets, 'maps': rounds.maps, 'dates': rounds.dates, 'outcomes': rounds.outcomes,
+                       **{col: getattr(rounds, col) for col in RoundStore.ROUND_COLUMNS}}, os.path.join(tmp, "rounds"))
+        _write_arrays({'days': pistols.days, 'cumulative': pistols.cumulative}, os.path.join(tmp, "pistols"))
+
+        # Trend and day-delta state brought up to this version once, so workers only load it
+        raw_form = pd.read_csv("form.csv")
+        load_trends(raw_form).save(os.path.join(tmp, TRENDS_PATH))
+        load_day_aggregates(pd.read_csv("cleaned_score.csv"), raw_form).save(os.path.join(tmp, DELTAS_PATH))
+
+        manifest = {
+            'version': version,
+            'tables': {name: len(df) for name, df in frames.items()},
+            'round_map_names': [str(m) for m in rounds.map_names],
+            'pistol_map_names': [str(m) for m in pistols.map_names],
+            'pistol_digest': pistols.digest,
+            'published': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, target)
+
+    _write_current(base_dir, version)
+    _prune(base_dir, version, keep)
+    return version, time.perf_counter() - t0
+
+
+# 📥 Attaching
+def current_version(base_dir=SHARED_DIR):
+    try:
+        with open(os.path.join(base_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class SharedDataset:
+    """
+    One published version, read-only. Arrow tables and cube arrays are
+    memory-mapped, so every worker on the machine shares the same page-cache
+    pages instead of holding its own copy.
+
+    table() is zero-copy. frame() converts to pandas once per process:
+    numeric columns without nulls stay backed by the mapped file, while
+    string columns become Python objects in each worker.
+    """
+
+    def __init__(self, base_dir, version):
+        self.version = version
+        self.path = os.path.join(base_dir, version)
+        with open(os.path.join(self.path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self._tables = {}
+        self._frames = {}
+
+    def table(self, name):
+        if name not in self._tables:
+            source = pa.memory_map(os.path.join(self.path, f"{name}.arrow"), "r")
+            self._tables[name] = pa.ipc.open_file(source).read_all()
+        return self._tables[name]
+
+    def frame(self, name):
+        """Read-only pandas view of a published table (shared by every caller in this process)."""
+        if name not in self._frames:
+            self._frames[name] = self.table(name).to_pandas(split_blocks=True)
+        return self._frames[name]
+
+    def arrays(self, group):
+        folder = os.path.join(self.path, group)
+        return {f[:-4]: np.load(os.path.join(folder, f), mmap_mode="r") for f in sorted(os.listdir(folder)) if f.endswith(".npy")}
+
+    def round_store(self):
+        return RoundStore(map_names=self.manifest['round_map_names'], **self.arrays("rounds"))
+
+    def pistol_tensor(self):
+        arrays = self.arrays("pistols")
+        return PistolTensor(arrays['days'], self.manifest['pistol_map_names'], arrays['cumulative'], self.manifest['pistol_digest'])
+
+    def form_trends(self):
+        """TrendEngine published with this version (None for versions published without one)."""
+        path = os.path.join(self.path, TRENDS_PATH)
+        return TrendEngine.load(path) if os.path.exists(path) else None
+
+    def day_aggregates(self):
+        """DayAggregates published with this version (None for versions published without one)."""
+        path = os.path.join(self.path, DELTAS_PATH)
+        return DayAggregates.load(path) if os.path.exists(path) else None
+
+
+_attached = {}
+
+
+def attach(base_dir=SHARED_DIR):
+    """
+    The dataset CURRENT points at (None before the first publish). Checking for
+    a new version is one small file read, so callers can do it on every rerun;
+    the previous version stays mapped until the switch.
+    """
+    version = current_version(base_dir)
+    if version is None:
+        return None
+    dataset = _attached.get(base_dir)
+    if dataset is None or dataset.version != version:
+        dataset = _attached[base_dir] = SharedDataset(base_dir, version)
+    return dataset
+
+
+# 🚀 Workers
+def serve(workers, base_dir=SHARED_DIR, base_port=BASE_PORT):
+    """
+    Publish, then run `workers` Streamlit processes on consecutive ports, all
+    attached to base_dir. Put a reverse proxy with sticky sessions in front
+    (see README). Stops every worker on Ctrl+C.
+    """
+    version, seconds = publish(base_dir)
+    print(f"📦 Published {version} to {base_dir} in {seconds:.1f}s")
+    env = dict(os.environ, DASHBOARD_SHARED_DIR=base_dir)
+    procs = []
+    for i in range(workers):
+        port = base_port + i
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "streamlit_dashboard.py",
+             "--server.port", str(port), "--server.headless", "true"],
+            env=env
+        ))
+        print(f"🟢 Worker {i + 1} on 127.0.0.1:{port}")
+    try:
+        for proc in procs:
+            proc.wait()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.terminate()
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    base_dir = shared_dir_from_env() or SHARED_DIR
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(int(sys.argv[2]) if len(sys.argv) > 2 else 2, base_dir)
+    else:
+        version, seconds = publish(base_dir)
+        print(f"📦 Published {version} to {base_dir} in {seconds:.1f}s (CURRENT → {version})")
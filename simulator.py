@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+import analytics
+from pistol_tensor import WIN, LOSS
+
+HALF_ROUNDS = 12
+OT_PAIRS = 15
+SIMULATIONS = 200_000
+SENSITIVITY_STEP = 0.05
+SIDES = ('Attack', 'Defence')
+PARAMETER_LABELS = {
+    'pistol': 'Pistol win rate',
+    'convert': '2nd round after pistol win',
+    'rebound': '2nd round after pistol loss',
+    'rest': 'Rounds 3–12 win rate',
+}
+
+
+def _rate(won, played, default=0.5):
+    return float(np.clip(won / played, 0.01, 0.99)) if played > 0 else default
+
+
+def map_rates(score_df, tensor, selected_map, start_date=None, end_date=None):
+    """
+    Per-side round win rates for one map and date range:
+    pistol, 2nd round after a pistol win / loss, and the remaining rounds of the half.
+    Returns ({side: {parameter: rate}}, share of games starting on attack, games).
+    """
+    rows = analytics.score_between(score_df, start_date, end_date)
+    rows = rows[rows['Map'] == selected_map]
+    code = tensor.map_code(selected_map)
+    counts = tensor.window(start_date, end_date)[code, :2] if code is not None else np.zeros((2, 3, 3))
+
+    # Rounds won / played in each half per side; played = won / WR (12 when the WR is 0 or missing)
+    half_won = {side: 0.0 for side in SIDES}
+    half_played = {side: 0.0 for side in SIDES}
+    for half in ('First', 'Second'):
+        won = pd.to_numeric(rows[f'{half} Rounds'], errors='coerce')
+        wr = analytics.pct_to_float(rows[f'{half} Half WR'])
+        played = (won / wr).where(wr > 0, HALF_ROUNDS).round().clip(upper=HALF_ROUNDS)
+        on_attack = (rows['Start'] == 'Attack') if half == 'First' else (rows['Start'] != 'Attack')
+        for side, mask in (('Attack', on_attack), ('Defence', ~on_attack)):
+            keep = mask & won.notna()
+            half_won[side] += won[keep].sum()
+            half_played[side] += played[keep].sum()
+
+    rates = {}
+    for s, side in enumerate(SIDES):
+        side_counts = counts[s]
+        pistols_won = side_counts[WIN].sum()
+        pistols_played = side_counts[[LOSS, WIN]].sum()
+        second_won = side_counts[[LOSS, WIN], WIN].sum()
+        second_played = side_counts[[LOSS, WIN]][:, [LOSS, WIN]].sum()
+        rates[side] = {
+            'pistol': _rate(pistols_won, pistols_played),
+            'convert': _rate(side_counts[WIN, WIN], side_counts[WIN, [LOSS, WIN]].sum()),
+            'rebound': _rate(side_counts[LOSS, WIN], side_counts[LOSS, [LOSS, WIN]].sum()),
+            'rest': _rate(half_won[side] - pistols_won - second_won,
+                          half_played[side] - pistols_played - second_played),
+        }
+
+    attack_share = float((rows['Start'] == 'Attack').mean()) if len(rows) else 0.5
+    return rates, attack_share, len(rows)
+
+
+def _half(uniforms, side_rates):
+    """Rounds won in one half, plus whether the pistol was won, for every simulated map."""
+    pistol = uniforms[:, 0] < side_rates['pistol']
+    second = uniforms[:, 1] < np.where(pistol, side_rates['convert'], side_rates['rebound'])
+    rest = (uniforms[:, 2:] < side_rates['rest']).sum(axis=1)
+    return pistol + second + rest, pistol
+
+
+def simulate(rates, start_side='Attack', n=SIMULATIONS, overtime=False, seed=0, uniforms=None):
+    """
+    Simulate `n` maps starting on `start_side`. Every round of every map is one
+    uniform draw, so the whole batch is a few array comparisons.
+    Returns a dict of boolean arrays: win, draw, loss, first_pistol, second_pistol.
+    """
+    rng = np.random.default_rng(seed)
+    if uniforms is None:
+        uniforms = rng.random((n, 2 * HALF_ROUNDS + 2 * OT_PAIRS))
+    first, second = start_side, SIDES[1 - SIDES.index(start_side)]
+
+    first_rounds, first_pistol = _half(uniforms[:, :HALF_ROUNDS], rates[first])
+    second_rounds, second_pistol = _half(uniforms[:, HALF_ROUNDS:2 * HALF_ROUNDS], rates[second])
+    rounds = first_rounds + second_rounds
+
+    # 13+ of 24 means we reached 13 first; exactly 12 is 12-12
+    win = rounds > HALF_ROUNDS
+    tied = rounds == HALF_ROUNDS
+    draw = tied.copy()
+    if overtime:
+        # One round on each side per pair; the first pair that isn't split decides the map
+        ot = uniforms[:, 2 * HALF_ROUNDS:].reshape(len(uniforms), OT_PAIRS, 2)
+        pair_wins = (ot[:, :, 0] < rates['Attack']['rest']).astype(int) + (ot[:, :, 1] < rates['Defence']['rest'])
+        decided = pair_wins != 1
+        first_decided = decided.argmax(axis=1)
+        any_decided = decided.any(axis=1)
+        ot_win = pair_wins[np.arange(len(ot)), first_decided] == 2
+        win |= tied & any_decided & ot_win
+        draw = tied & ~any_decided
+    return {
+        'win': win,
+        'draw': draw,
+        'loss': ~win & ~draw,
+        'first_pistol': first_pistol,
+        'second_pistol': second_pistol,
+    }
+
+
+def win_probabilities(rates, attack_share, n=SIMULATIONS, overtime=False, seed=0):
+    """Win / draw / loss probability, blended over the observed starting side."""
+    split = int(round(n * attack_share))
+    results = [simulate(rates, 'Attack', split, overtime, seed), simulate(rates, 'Defence', n - split, overtime, seed + 1)]
+    outcome = {k: np.concatenate([r[k] for r in results]) for k in results[0]}
+    return outcome
+
+
+def map_simulation(score_df, tensor, selected_map, start_date=None, end_date=None,
+                   n=SIMULATIONS, overtime=False, seed=0):
+    """
+    Everything the Map Simulator tab shows for one map and date range:
+    input rates, outcome probabilities, pistol-conditioned win rates and
+    the win-probability change for a +5pp change in each input.
+    """
+    rates, attack_share, games = map_rates(score_df, tensor, selected_map, start_date, end_date)
+    outcome = win_probabilities(rates, attack_share, n, overtime, seed)
+    base = outcome['win'].mean()
+
+    # Same random numbers for every nudged run, so differences aren't noise
+    sensitivities = []
+    for side in SIDES:
+        for parameter, label in PARAMETER_LABELS.items():
+            nudged = {s: dict(r) for s, r in rates.items()}
+            nudged[side][parameter] = min(nudged[side][parameter] + SENSITIVITY_STEP, 0.99)
+            nudged_win = win_probabilities(nudged, attack_share, n, overtime, seed)['win'].mean()
+            sensitivities.append({'Side': side, 'Input': label, 'Current': rates[side][parameter] * 100,
+                                  'Δ Win % per +5pp': (nudged_win - base) * 100})
+
+    pistol_effect = []
+    for half, key in (('First half', 'first_pistol'), ('Second half', 'second_pistol')):
+        won = outcome[key]
+        pistol_effect.append({
+            'Pistol': half,
+            'Win % if pistol won': outcome['win'][won].mean() * 100 if won.any() else np.nan,
+            'Win % if pistol lost': outcome['win'][~won].mean() * 100 if (~won).any() else np.nan,
+        })
+    pistol_effect = pd.DataFrame(pistol_effect)
+    pistol_effect['Pistol worth (pp)'] = pistol_effect['Win % if pistol won'] - pistol_effect['Win % if pistol lost']
+
+    return {
+        'games': games,
+        'attack_share': attack_share,
+        'rates': pd.DataFrame(rates).T.rename(columns=PARAMETER_LABELS) * 100,
+        'win': base * 100,
+        'draw': outcome['draw'].mean() * 100,
+        'loss': outcome['loss'].mean() * 100,
+        'pistol_effect': pistol_effect,
+        'sensitivity': pd.DataFrame(sensitivities),
+        'simulations': n,
+    }
@@ -0,0 +1,371 @@
+import argparse
+import datetime
+import hashlib
+import html
+import json
+import os
+import re
+import time
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import analytics
+import figures
+import pistol_tensor
+import styling
+from report import build_shared
+from result_cache import ResultCache, cache_dir_from_env
+from opponents import OpponentIndex
+from simulator import map_simulation
+
+SNAPSHOT_DIR = "snapshot"
+PLOTLY_ASSET = "plotly.min.js"
+DECIMALS = 3
+
+SNAPSHOT_STYLE = """
+body { background: #000000; color: #ffffff; font-family: Inter, sans-serif; margin: 0; padding: 1rem; }
+h1, h2, h3 { color: #FDB913; }
+.meta { color: #999999; font-size: 12px; }
+.tabs { display: flex; flex-wrap: wrap; gap: 4px; margin: 1rem 0; }
+.tabs button { background: #1a1a1a; color: #FDB913; border: 1px solid #333333; border-radius: 4px; padding: 6px 10px; font-size: 14px; }
+.tabs button.active { background: #FDB913; color: #000000; }
+.tab { display: none; }
+.tab.active { display: block; }
+select { background: #1a1a1a; color: #ffffff; border: 1px solid #333333; padding: 4px; margin: 0 0 0.5rem 0; }
+.table-wrap { overflow-x: auto; }
+table { border-collapse: collapse; margin: 0.5rem 0 1rem 0; font-size: 13px; }
+th { background: #1a1a1a; color: #FDB913; padding: 6px 8px; position: sticky; top: 0; }
+td { border-top: 1px solid #333333; padding: 5px 8px; text-align: center; white-space: nowrap; }
+td.wr-high { background: #14532d; }
+td.wr-mid { background: #78350f; }
+td.wr-low { background: #7f1d1d; }
+.agent { width: 24px; height: 24px; border-radius: 3px; display: inline-block; background-size: cover; vertical-align: middle; }
+.chart { width: 100%; min-height: 420px; }
+"""
+
+# Client side: tab switching, lazy chart rendering and table filtering over the embedded data
+SNAPSHOT_SCRIPT = """
+const DATA = JSON.parse(document.getElementById('snapshot-data').textContent);
+const drawn = {};
+
+function esc(text) {
+  return String(text).replace(/[&<>"']/g, ch => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[ch]));
+}
+
+function fmt(value, column) {
+  if (value === null) return '-';
+  if (DATA.percent[column] === 100) return (value * 100).toFixed(1) + '%';
+  if (DATA.percent[column] === 1) return value.toFixed(1) + '%';
+  if (typeof value === 'number' && !Number.isInteger(value)) return value.toFixed(2);
+  return esc(value);
+}
+
+function wrClass(value, column) {
+  const scale = DATA.percent[column];
+  if (!scale || value === null) return '';
+  const pct = value * scale;
+  return pct >= DATA.thresholds.high ? 'wr-high' : pct < DATA.thresholds.low ? 'wr-low' : 'wr-mid';
+}
+
+function cell(value, column) {
+  if (column === 'Comp String' && value) {
+    const icons = value.split('-').map(a => DATA.icons[a] !== undefined
+      ? `<span class="agent agent-${DATA.icons[a]}" title="${esc(a)}"></span>` : esc(a));
+    return `<td>${icons.join(' ')}</td>`;
+  }
+  return `<td class="${wrClass(value, column)}">${fmt(value, column)}</td>`;
+}
+
+function renderTable(id) {
+  const el = document.getElementById(id);
+  const table = DATA.tables[el.dataset.table];
+  const filter = el.dataset.filter;
+  const picked = filter ? document.getElementById(id + '-filter').value : null;
+  const at = filter ? table.columns.indexOf(filter) : -1;
+  const rows = table.data.filter(r => at < 0 || picked === '' || String(r[at]) === picked);
+  const head = table.columns.map(c => `<th>${esc(c)}</th>`).join('');
+  const body = rows.map(r => '<tr>' + r.map((v, i) => cell(v, table.columns[i])).join('') + '</tr>').join('');
+  el.innerHTML = `<table><thead><tr>${head}</tr></thead><tbody>${body}</tbody></table>` +
+    `<p class="meta">${rows.length} of ${table.data.length} rows</p>`;
+}
+
+function drawCharts(tab) {
+  tab.querySelectorAll('.chart').forEach(el => {
+    if (drawn[el.id]) return;
+    const fig = DATA.charts[el.dataset.chart];
+    Plotly.newPlot(el, fig.data, fig.layout, {responsive: true, displaylogo: false});
+    drawn[el.id] = true;
+  });
+}
+
+function showTab(name) {
+  document.querySelectorAll('.tab').forEach(t => t.classList.toggle('active', t.id === name));
+  document.querySelectorAll('.tabs button').forEach(b => b.classList.toggle('active', b.dataset.tab === name));
+  drawCharts(document.getElementById(name));
+}
+
+document.querySelectorAll('.tabs button').forEach(b => b.addEventListener('click', () => showTab(b.dataset.tab)));
+document.querySelectorAll('.data-table').forEach(el => {
+  const select = document.getElementById(el.id + '-filter');
+  if (select) select.addEventListener('change', () => renderTable(el.id));
+  renderTable(el.id);
+});
+showTab(document.querySelector('.tabs button').dataset.tab);
+"""
+
+
+def _compact(df):
+    """Column names plus row lists, floats rounded, NaN as null: the embedded table format."""
+    df = df.reset_index(drop=True).copy()
+    for col in df.columns:
+        if pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].round(DECIMALS)
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%d')
+    df = df.astype(object).where(df.notna(), None)
+    return {"columns": [str(c) for c in df.columns], "data": df.to_numpy().tolist()}
+
+
+def _figure_json(fig):
+    return json.loads(fig.to_json())
+
+
+def _agent_icons(registry, comp_strings):
+    """Icon class per agent used in the embedded comps, and the CSS that holds each icon once."""
+    agents = sorted({a for comp in comp_strings for a in str(comp).split('-')})
+    icons, css = {}, []
+    for agent in agents:
+        uri = registry.icon_data_uri(agent)
+        if uri is None:
+            continue
+        icons[agent] = re.sub(r'[^a-z0-9]+', '-', agent.lower())
+        css.append(f".agent-{icons[agent]} {{ background-image: url('{uri}'); }}")
+    return icons, "\n".join(css)
+
+
+def build_snapshot(shared=None, cache=None):
+    """
+    Tables (as compact embedded data), pre-rendered charts and win-rate column
+    scales for every dashboard tab at its default filters (the full date range).
+    """
+    cache = cache or ResultCache(disk_dir=cache_dir_from_env())
+    shared = shared or build_shared(cache)
+    version, registry = shared['version'], shared['registry']
+
+    def cached(view, filters, compute):
+        return cache.get_or_compute(version, view, filters, compute)
+
+    score_df = analytics.load_score("cleaned_score.csv")
+    dates = sorted(score_df['Date'].dropna().unique())
+    parsed = analytics.score_dates(score_df['Date'])
+    round_rows = cached("round_rows", {"map": "All", "start": dates[0], "end": dates[-1]},
+                        lambda: analytics.filter_rounds(score_df, "All", dates[0], dates[-1]))
+    latest_day = parsed.max()
+
+    tables, charts = {}, {}
+
+    # 📊 Overview and the latest scrim day
+    overview = shared['overview']
+    tables['overview'] = _compact(overview)
+    charts['map_winrate'] = _figure_json(figures.map_winrate_bar(overview))
+    latest_cols = ['Date', 'Opponent', 'Map', 'Start', 'First Rounds', 'Second Rounds', 'Outcome']
+    latest = score_df[parsed == latest_day][latest_cols]
+    tables['latest'] = _compact(latest)
+
+    # 🧩 Compositions: the top comps of every map, filtered by map in the browser
+    comp_stats = shared['comp_stats']
+    comp_cols = ['Map', 'Comp String', 'games', 'wins', 'draws', 'losses', 'Win Rate %', 'Wilson Low %']
+    comp_maps = sorted(comp_stats['Map'].dropna().unique())
+    comps = pd.concat([analytics.composition_table(comp_stats, m) for m in comp_maps], ignore_index=True) \
+        if comp_maps else pd.DataFrame(columns=comp_cols)
+    tables['compositions'] = _compact(comps[comp_cols])
+
+    # 📈 Round insights
+    summary = shared['round_summary'].copy()
+    summary['Round WR'] = summary['Raw_Round_WR']
+    tables['round_summary'] = _compact(summary[['Map', 'Games', 'Wins', 'Draws', 'Losses', 'Avg_Atk_WR', 'Avg_Def_WR', 'Round WR']])
+    charts['side_winrate'] = _figure_json(figures.side_winrate_bar(shared['round_summary']))
+    game_cols = ['Date', 'Opponent', 'Map', 'Start', 'First Rounds', 'Second Rounds', 'Atk WR Derived', 'Def WR Derived', 'Outcome']
+    tables['round_rows'] = _compact(round_rows[game_cols])
+
+    # 🔫 Pistols
+    pistols = shared['pistols']
+    pistol_maps = pistol_tensor.pistol_by_map(pistols)
+    if not pistol_maps.empty:
+        charts['pistol'] = _figure_json(figures.pistol_bar(pistol_maps))
+    by_side = pistol_tensor.pistol_by_side(pistols)
+    if not by_side.empty:
+        charts['pistol_side'] = _figure_json(figures.pistol_side_bar(by_side))
+    tables['conversions'] = _compact(
+        by_side.merge(pistol_tensor.conversion_counts(pistols), on=['Map', 'Side'], how='left')
+        .fillna({code: 0 for code in pistol_tensor.CONVERSION_CODES})
+    )
+
+    # 🔢 Player stats: every player's agent table, filtered by player in the browser
+    player_df = shared['player_df']
+    start, end = player_df['Date'].min().date(), player_df['Date'].max().date()
+    players = sorted(player_df['Player'].dropna().unique())
+    agent_tables = []
+    for player in players:
+        agent_stats = cached("player_agent_stats", {"player": player, "start": start, "end": end, "map": "All"},
+                             lambda: analytics.player_agent_stats(player_df, player, start, end, "All"))
+        if not agent_stats.empty:
+            agent_tables.append(agent_stats.assign(Player=player))
+    player_agents = pd.concat(agent_tables, ignore_index=True) if agent_tables else pd.DataFrame(columns=['Player'])
+    tables['player_agents'] = _compact(player_agents[['Player'] + [c for c in player_agents.columns if c != 'Player']])
+
+    # 🆚 Roster role stats, filtered by role in the browser
+    tables['roster'] = _compact(shared['roster'].reset_index())
+
+    # 🕵️ Opponents: head-to-head records of every opponent, filtered by opponent in the browser
+    opponent_index = cached("opponent_index", {}, lambda: OpponentIndex(score_df))
+    tables['opponents'] = _compact(opponent_index.opponent_table())
+    head_to_head = [
+        opponent_index.map_records(name).merge(opponent_index.side_rates(name), on='Map', how='left').assign(Opponent=name)
+        for name in opponent_index.names
+    ]
+    h2h_cols = ['Opponent', 'Map', 'Games', 'Wins', 'Draws', 'Losses', 'Win Rate', 'Atk WR', 'Def WR', 'Atk Pistol WR', 'Def Pistol WR']
+    tables['head_to_head'] = _compact(pd.concat(head_to_head, ignore_index=True)[h2h_cols] if head_to_head else pd.DataFrame(columns=h2h_cols))
+
+    # 🎲 Simulated win / draw / loss per map over the full range
+    sim_dates = parsed.dropna()
+    sim_start, sim_end = sim_dates.min().date(), sim_dates.max().date()
+    sims = []
+    for sim_map in sorted(score_df['Map'].dropna().unique()):
+        sim = cached("map_simulation", {"map": sim_map, "start": sim_start, "end": sim_end, "overtime": False},
+                     lambda: map_simulation(score_df, pistols, sim_map, sim_start, sim_end))
+        sims.append({'Map': sim_map, 'Games': sim['games'], 'Win %': sim['win'], 'Draw %': sim['draw'], 'Loss %': sim['loss']})
+    tables['simulation'] = _compact(pd.DataFrame(sims, columns=['Map', 'Games', 'Win %', 'Draw %', 'Loss %']))
+
+    icons, icon_css = _agent_icons(registry, comps['Comp String'])
+    return {
+        "version": version,
+        "generated": datetime.datetime.now().strftime('%Y-%m-%d %H:%M'),
+        "date_range": shared['date_range'],
+        "latest_day": latest_day.strftime('%Y-%m-%d') if pd.notna(latest_day) else None,
+        "tables": tables,
+        "charts": charts,
+        "icons": icons,
+        "icon_css": icon_css,
+        # Win-rate columns: 100 for 0–1 fractions, 1 for values already in percent
+        "percent": {
+            'Win Rate': 100, 'Avg_Atk_WR': 100, 'Avg_Def_WR': 100, 'Round WR': 100,
+            'Atk WR Derived': 100, 'Def WR Derived': 100,
+            'Atk WR': 100, 'Def WR': 100, 'Atk Pistol WR': 100, 'Def Pistol WR': 100,
+            'Win Rate %': 1, 'Wilson Low %': 1, 'Pistol Win Rate (%)': 1, 'Win %': 1,
+        },
+        "thresholds": {"low": styling.WIN_RATE_LOW, "high": styling.WIN_RATE_HIGH},
+    }
+
+
+def _filter_options(table, column):
+    at = table['columns'].index(column)
+    return sorted({str(row[at]) for row in table['data'] if row[at] is not None})
+
+
+def _data_table(snapshot, table_id, table, filter_column=None, label=None):
+    """Placeholder the script fills from the embedded table, with an optional filter dropdown."""
+    select = ""
+    if filter_column:
+        options = "".join(f'<option value="{html.escape(o)}">{html.escape(o)}</option>'
+                          for o in _filter_options(snapshot['tables'][table], filter_column))
+        select = (f'<label>{html.escape(label or filter_column)}: <select id="{table_id}-filter">'
+                  f'<option value="">All</option>{options}</select></label>')
+    filter_attr = f' data-filter="{html.escape(filter_column)}"' if filter_column else ""
+    return f'{select}<div class="table-wrap data-table" id="{table_id}" data-table="{table}"{filter_attr}></div>'
+
+
+def _chart(snapshot, chart_id):
+    if chart_id not in snapshot['charts']:
+        return ""
+    return f'<div class="chart" id="chart-{chart_id}" data-chart="{chart_id}"></div>'
+
+
+def render_html(snapshot):
+    """The whole read-only dashboard as one HTML page; Plotly is the only external asset."""
+    tabs = [
+        ("overview", "📊 Overview",
+         f"<h2>📅 Latest scrim day ({snapshot['latest_day'] or '-'})</h2>" + _data_table(snapshot, "t-latest", "latest")
+         + "<h2>🗺️ Map Overview</h2>" + _data_table(snapshot, "t-overview", "overview") + _chart(snapshot, "map_winrate")),
+        ("compositions", "🧩 Compositions",
+         _data_table(snapshot, "t-comps", "compositions", "Map")),
+        ("rounds", "📈 Round Insights",
+         _data_table(snapshot, "t-round-summary", "round_summary") + _chart(snapshot, "side_winrate")
+         + "<h2>🎮 Games</h2>" + _data_table(snapshot, "t-round-rows", "round_rows", "Map")),
+        ("pistols", "🔫 Pistols",
+         _chart(snapshot, "pistol") + _chart(snapshot, "pistol_side")
+         + "<h2>🍰 Pistol and 2nd-round outcomes</h2>" + _data_table(snapshot, "t-conversions", "conversions", "Map")),
+        ("players", "🔢 Player Stats",
+         _data_table(snapshot, "t-players", "player_agents", "Player")),
+        ("roster", "🆚 Roster Roles",
+         _data_table(snapshot, "t-roster", "roster", "Role")),
+        ("opponents", "🕵️ Opponents",
+         _data_table(snapshot, "t-opponents", "opponents")
+         + "<h2>🤝 Head to head</h2>" + _data_table(snapshot, "t-head-to-head", "head_to_head", "Opponent")),
+        ("simulator", "🎲 Map Simulator",
+         "<p class='meta'>Simulated over the full date range, 12-12 counts as a draw.</p>"
+         + _data_table(snapshot, "t-simulation", "simulation")),
+    ]
+    buttons = "".join(f'<button data-tab="{tab_id}">{title}</button>' for tab_id, title, _ in tabs)
+    panels = "".join(f'<section class="tab" id="{tab_id}"><h2>{title}</h2>{body}</section>' for tab_id, title, body in tabs)
+    payload = {k: snapshot[k] for k in ("tables", "charts", "icons", "percent", "thresholds")}
+    # '</' can't appear inside the <script> block
+    data = json.dumps(payload, separators=(",", ":"), allow_nan=False, default=str).replace("</", "<\\/")
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Valorant Scrim Dashboard (snapshot)</title>
+<script src="{PLOTLY_ASSET}"></script>
+<style>{SNAPSHOT_STYLE}
+{snapshot['icon_css']}</style>
+</head>
+<body>
+<h1>Valorant Scrim Dashboard</h1>
+<p class="meta">Read-only snapshot · dataset {snapshot['version']} · {snapshot['date_range'][0]} to {snapshot['date_range'][1]} · generated {snapshot['generated']}</p>
+<nav class="tabs">{buttons}</nav>
+{panels}
+<script type="application/json" id="snapshot-data">{data}</script>
+<script>{SNAPSHOT_SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def export_snapshot(out_dir=SNAPSHOT_DIR):
+    """Write the snapshot bundle (index.html + plotly.min.js) to `out_dir`. Returns the index path."""
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    snapshot = build_snapshot()
+
+    # Plotly only changes with the library version: rewrite it only when it differs
+    plotly_js = get_plotlyjs()
+    asset = os.path.join(out_dir, PLOTLY_ASSET)
+    digest = hashlib.sha1(plotly_js.encode()).hexdigest()
+    if not os.path.exists(asset) or hashlib.sha1(open(asset, "rb").read()).hexdigest() != digest:
+        _write_atomic(asset, plotly_js)
+
+    index = os.path.join(out_dir, "index.html")
+    page = render_html(snapshot)
+    _write_atomic(index, page)
+    print(f"🗂️ Wrote snapshot of dataset {snapshot['version']} to {index} "
+          f"({len(page.encode()) / 1024:.0f} KB) in {time.perf_counter() - started:.1f}s")
+    return index
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a static, read-only HTML snapshot of every dashboard tab.")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help=f"output folder (default: {SNAPSHOT_DIR})")
+    args = parser.parse_args()
+    export_snapshot(args.out)
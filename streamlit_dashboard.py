@@ -1,10 +1,27 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import os
-import plotly.express as px
-from data_cleaner import clean_scrim_form
 import base64
+from functools import partial
+import analytics
+import artifacts
+import figures
+import paging
+import styling
+from comp_index import CompIndex
+from registry import load_registry
+import round_store
+from round_store import load_round_store
+import pistol_tensor
+from pistol_tensor import load_pistol_tensor
+from percentiles import load_percentile_engine, roster_role_values
+from trends import TREND_STATS, load_trends
+from simulator import map_simulation
+from opponents import OpponentIndex
+from deltas import load_day_aggregates, map_deltas, player_deltas, comp_deltas, SIGNIFICANT_Z
+from lineup import PerformanceMatrix, best_lineups, comp_win_rates, LINEUP_SIZE, DEFAULT_TOP_K
+from result_cache import ResultCache, dataset_version, cache_dir_from_env, cache_size_from_env
+from prefetch import Prefetcher, prefetch_workers_from_env
+from shared_data import attach, shared_dir_from_env
 
 # Hardcoded credentials
 USERNAME = "admin"
@@ -32,6 +49,15 @@ def get_base64_image(path):
         data = f.read()
     return base64.b64encode(data).decode()
 
+registry = load_registry()
+
+def agent_icon_html(agent):
+    """<img> tag (base64 embedded) for an agent icon, or a 2-letter placeholder."""
+    icon_uri = registry.icon_data_uri(agent)
+    if icon_uri:
+        return f'<img src="{icon_uri}" class="agent-icon-img" title="{agent}" />'
+    return f'<div class="agent-icon-img" style="background:#666;color:white;display:flex;align-items:center;justify-content:center;font-size:10px;" title="{agent}">{agent[:2]}</div>'
+
 st.set_page_config(page_title="Valorant Scrim Dashboard", layout="wide")
 encoded_bg = get_base64_image("wallp.png")
 st.markdown(f"""
@@ -69,22 +95,111 @@ st.title("Valorant Scrim Dashboard")
 st.image("wolves_logo.png", width=100)
 
 
+# Shared result cache (one per server process, used by every session)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_entries=cache_size_from_env(), disk_dir=cache_dir_from_env())
+
+result_cache = get_result_cache()
+
+# Dataset published by shared_data.py (multi-process deployments), else the CSVs
+shared_dir = shared_dir_from_env()
+shared = attach(shared_dir) if shared_dir else None
+data_version = shared.version if shared else dataset_version()
+
+def cached_view(view, filters, compute):
+    return result_cache.get_or_compute(data_version, view, filters, compute)
+
+
+# Background prefetch of the selections users usually pick next
+@st.cache_resource
+def get_prefetcher():
+    return Prefetcher(result_cache, workers=prefetch_workers_from_env())
+
+prefetcher = get_prefetcher()
+prefetcher.set_version(data_version)
+
+
+# Incremental state is written by the ingest step (data_cleaner.py); reruns only read it, once per dataset version
+@st.cache_resource(max_entries=2)
+def get_form_trends(version):
+    engine = shared.form_trends() if shared else None
+    return engine if engine is not None else load_trends(pd.read_csv("form.csv"))
+
+
+@st.cache_resource(max_entries=2)
+def get_day_aggregates(version):
+    aggregates = shared.day_aggregates() if shared else None
+    return aggregates if aggregates is not None else load_day_aggregates(pd.read_csv("cleaned_score.csv"), pd.read_csv("form.csv"))
+
+
+def load_table(name, from_csv):
+    """A table from the attached shared dataset, or loaded from the CSVs without one. Treat it as read-only."""
+    return shared.frame(name) if shared else from_csv()
+
+
+def paged_table(df, key, view, filters, win_rate_columns=(), scale=1):
+    """
+    Sortable, paginated table: only the chosen columns of the visible page are
+    sent to the browser. Sort orders are cached per view / filters / column.
+    `win_rate_columns` get the green / amber / red win-rate styling.
+    """
+    if df.empty:
+        st.dataframe(df, use_container_width=True)
+        return
+    all_columns = list(df.columns)
+    ctl1, ctl2, ctl3, ctl4 = st.columns([4, 2, 1, 1])
+    columns = ctl1.multiselect("Columns:", all_columns, default=all_columns, key=f"{key}_columns")
+    sort_by = ctl2.selectbox("Sort by:", ["(none)"] + all_columns, key=f"{key}_sort")
+    descending = ctl3.toggle("Descending", key=f"{key}_desc")
+    page_size = ctl4.selectbox("Rows:", paging.PAGE_SIZES, index=paging.PAGE_SIZES.index(paging.DEFAULT_PAGE_SIZE), key=f"{key}_size")
+
+    order = None
+    if sort_by != "(none)":
+        order = cached_view(
+            "sort_order", {"view": view, "filters": filters, "sort": sort_by, "descending": descending},
+            lambda: paging.sort_order(df, sort_by, ascending=not descending)
+        )
+
+    # Clamp the page when the filters shrink the table
+    pages = paging.page_count(len(df), page_size)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    rows, total, _ = paging.page_slice(df, page, page_size, order, columns or all_columns)
+    wr_cols = [c for c in win_rate_columns if c in rows.columns]
+    if wr_cols:
+        st.dataframe(styling.style_win_rates(rows, wr_cols, scale), use_container_width=True,
+                     column_config=styling.win_rate_column_config(wr_cols, scale))
+    else:
+        st.dataframe(rows, use_container_width=True)
+    first = (page - 1) * page_size + 1
+    st.caption(f"Rows {first:,}–{first + len(rows) - 1:,} of {total:,}")
+
+
 # Load form.csv for overview and map comps
 try:
-    form_df = pd.read_csv("form.csv")
-    form_df = form_df[['Column 1', 'Agent', 'Result']].dropna().reset_index(drop=True)
+    form_df = load_table("form_blocks", lambda: analytics.load_form_blocks("form.csv"))
 except Exception as e:
     form_df = pd.DataFrame()
     st.warning(f"⚠️ Couldn't load form.csv: {e}")
 
 # Load cleaned_score.csv for Round Insights
 try:
-    score_df = pd.read_csv("cleaned_score.csv")
+    score_df = load_table("score", lambda: analytics.load_score("cleaned_score.csv"))
 except Exception as e:
     score_df = pd.DataFrame()
     st.warning(f"⚠️ Couldn't load cleaned_score.csv: {e}")
 
-tabs = st.tabs(["📊 Overview", "🧩 Map Composition Win Rates", "📈 Round Insights","🔫 Pistol Insights","🔢 Player Stats","🆚 Player Comparison"])
+# Round-level store (rounds.npz, or the rounds pinned down by cleaned_score.csv)
+if shared:
+    rounds, pistols = shared.round_store(), shared.pistol_tensor()
+else:
+    rounds = cached_view("round_store", {}, lambda: artifacts.fresh_or("round_store", lambda: load_round_store(score_df))) if not score_df.empty else None
+    # Pistol / 2nd-round count tensors [day, map, side, pistol, round 2]
+    pistols = cached_view("pistol_tensor", {}, lambda: artifacts.fresh_or("pistol_tensor", lambda: load_pistol_tensor(rounds))) if rounds is not None else None
+
+tabs = st.tabs(["📊 Overview", "🧩 Map Composition Win Rates", "📈 Round Insights","🔫 Pistol Insights","🔢 Player Stats","🆚 Player Comparison","🎲 Map Simulator","🕵️ Opponents"])
 
 # 📊 OVERVIEW TAB
 with tabs[0]:
@@ -94,139 +209,72 @@ with tabs[0]:
     start_date_overview = date_col1.selectbox("Start Date (Overview)", overview_dates, key="overview_start")
     end_date_overview = date_col2.selectbox("End Date (Overview)", overview_dates, index=len(overview_dates)-1, key="overview_end")
 
-    filtered_score = score_df[(score_df['Date'] >= start_date_overview) & (score_df['Date'] <= end_date_overview)]
+    compute_overview = partial(analytics.map_overview, score_df, start_date_overview, end_date_overview)
+    # The full range is what artifacts.py prebuilds
+    if (start_date_overview, end_date_overview) == (overview_dates[0], overview_dates[-1]):
+        compute_overview = partial(artifacts.fresh_or, "map_overview", compute_overview)
+    summary = cached_view("overview", {"start": start_date_overview, "end": end_date_overview}, compute_overview)
 
     st.subheader("Map Overview: Total Games, Wins, Draws, Losses, Win Rate")
-    if not filtered_score.empty:
-        summary = filtered_score.groupby('Map').agg(
-            Games=('Outcome', 'count'),
-            Wins=('Outcome', lambda x: (x.str.lower() == 'win').sum()),
-            Draws=('Outcome', lambda x: (x.str.lower() == 'draw').sum()),
-            Losses=('Outcome', lambda x: (x.str.lower() == 'loss').sum())
-        ).reset_index()
-        summary['Win Rate'] = summary['Wins'] / summary['Games']
-        st.dataframe(summary.sort_values(by='Map'), use_container_width=True)
+    if not summary.empty:
+        st.dataframe(
+            styling.style_win_rates(summary, ['Win Rate'], scale=100),
+            column_config=styling.win_rate_column_config(['Win Rate'], scale=100),
+            use_container_width=True
+        )
         # 📊 Map Win Rate Horizontal Bar Chart
         st.markdown("### 🗺️ Map Win Rates")
 
-        winrate_df = summary[['Map', 'Win Rate']].dropna().copy()
-        winrate_df['Win Rate %'] = winrate_df['Win Rate'] * 100
-        winrate_df = winrate_df.sort_values(by='Win Rate %', ascending=False)
-
-        fig_map_wr = px.bar(
-            winrate_df,
-            x='Win Rate %',
-            y='Map',
-            orientation='h',
-            text=winrate_df['Win Rate %'].apply(lambda x: f"{x:.1f}%"),
-            title="Map Win Rates",
-            labels={'Win Rate %': 'Win Rate (%)', 'Map': 'Map'},
-            color='Win Rate %',
-            color_continuous_scale=['#ff0000', '#FDB913']
-        )
-
-        fig_map_wr.update_traces(
-            textposition='outside',
-            marker_line_color='#000000',
-            marker_line_width=1.2
-        )
-
-        fig_map_wr.update_layout(
-            plot_bgcolor='#000000',
-            paper_bgcolor='#000000',
-            font=dict(family='Inter', size=14, color='#FDB913'),
-            title_font=dict(size=20, color='#FDB913'),
-            yaxis=dict(
-                tickfont=dict(color='#ffffff'),
-                categoryorder='total ascending',
-                gridcolor='#333333'
-            ),
-            xaxis=dict(
-                title='Win Rate (%)',
-                title_font=dict(color='#FDB913'),
-                tickfont=dict(color='#ffffff'),
-                gridcolor='#333333',
-                range=[0, 100]
-            )
-        )
-
+        fig_map_wr = figures.map_winrate_bar(summary)
         st.plotly_chart(fig_map_wr, use_container_width=True)
 
     else:
         st.info("No scrim data in this date range.")
 
+    # 🆕 Since last scrim day (differences of stored per-day sums)
+    st.markdown("### 🆕 Since Last Scrim Day")
+    day_aggregates = get_day_aggregates(data_version)
+    scrim_days = day_aggregates.days()[::-1]
+    if scrim_days:
+        delta_day = st.selectbox("Scrim day:", scrim_days, index=scrim_days.index(day_aggregates.latest_score_day()),
+                                 format_func=lambda d: d.strftime('%d/%m/%Y'), key="delta_day")
+        st.caption(f"That day against everything before it. Coloured changes are significant (|z| ≥ {SIGNIFICANT_Z}); movers first.")
+        delta_views = (
+            ("🗺️ Map win rates", "map_deltas", map_deltas, ['Δ WR', 'WR On Day'], ['WR Before', 'WR On Day', 'WR After', 'Δ WR']),
+            ("🔢 Player ACS / KPR", "player_deltas", player_deltas, ['Δ', 'On Day'], []),
+            ("🧩 Comp records", "comp_deltas", comp_deltas, ['Δ WR', 'WR On Day'], ['WR Before', 'WR On Day', 'WR After', 'Δ WR']),
+        )
+        for title, view, compute, delta_cols, pct_cols in delta_views:
+            table = cached_view(view, {"day": delta_day}, partial(compute, day_aggregates, delta_day))
+            st.markdown(f"#### {title}")
+            if table.empty:
+                st.info("Nothing recorded on this day.")
+                continue
+            st.dataframe(
+                styling.style_movers(table.round(2), delta_cols),
+                column_config={col: st.column_config.NumberColumn(col, format="%.1f%%") for col in pct_cols},
+                use_container_width=True, hide_index=True
+            )
+    else:
+        st.info("No scrim days recorded yet.")
+
 ### --- Composition Win Rate Chart (Styled like rib.gg) ---
 
 # This block should only be inside the Map Composition tab
 with tabs[1]:
     st.subheader("Top 5-agent Composition Win Rates by Map")
     if not form_df.empty:
-        valid_maps = []
-        for i in range(0, len(form_df) - 4, 5):
-            block = form_df.iloc[i:i+5]
-            if len(block) == 5 and block['Column 1'].nunique() == 1 and block['Result'].nunique() == 1:
-                valid_maps.append(block['Column 1'].iloc[0])
+        games_df = cached_view("team_games", {}, lambda: artifacts.fresh_or("team_games", lambda: analytics.team_games(form_df, score_df)))
+        comp_stats = cached_view("composition_stats", {}, lambda: artifacts.fresh_or("composition_stats", lambda: analytics.composition_stats(games_df)))
 
-        valid_maps = sorted(set(valid_maps))
+        valid_maps = cached_view("comp_maps", {}, lambda: analytics.composition_maps(games_df))
         selected_map = st.selectbox("Select a map:", valid_maps)
 
-        teams = []
-        filtered_dates = set(score_df['Date'])
-        for i in range(0, len(form_df) - 4, 5):
-            block = form_df.iloc[i:i+5]
-            map_match = block['Column 1'].iloc[0]
-            result_match = block['Result'].iloc[0]
-
-            if (
-                len(block) == 5 and
-                block['Column 1'].nunique() == 1 and
-                block['Result'].nunique() == 1 and
-                block['Column 1'].iloc[0] == selected_map
-            ):
-                match_filter = (
-                    (score_df['Map'] == map_match) &
-                    (score_df['Outcome'].str.lower() == result_match.lower()) &
-                    (score_df['Date'].isin(filtered_dates))
-                )
-                if not score_df[match_filter].empty:
-                    agents = tuple(sorted(block['Agent'].tolist()))
-                    teams.append({
-                        'Composition': agents,
-                        'Result': result_match
-                    })
-
-        df = pd.DataFrame(teams)
-        if not df.empty:
-            df['Win'] = df['Result'].apply(lambda x: 1 if x.lower() == 'win' else 0)
-            df['Draw'] = df['Result'].apply(lambda x: 1 if x.lower() == 'draw' else 0)
-            df['Loss'] = df['Result'].apply(lambda x: 1 if x.lower() == 'loss' else 0)
-            df['Game'] = 1
-
-            grouped = df.groupby('Composition').agg(
-                games=('Game', 'sum'),
-                wins=('Win', 'sum'),
-                draws=('Draw', 'sum'),
-                losses=('Loss', 'sum')
-            ).reset_index()
-
-            grouped['Win Rate %'] = grouped['wins'] / grouped['games'] * 100
-            grouped['Comp String'] = grouped['Composition'].apply(lambda x: '-'.join(x))
-            grouped = grouped.sort_values(by='Win Rate %', ascending=False).head(15)
-
-        def get_agent_icon(agent_name):
-            path = f"assets/{agent_name}.png"
-            if os.path.exists(path):
-                return Image.open(path)
-            return None
-
-        # Add a column with the first agent's icon
-        grouped['Win Rate %'] = grouped['wins'] / grouped['games'] * 100
-        grouped['Comp String'] = grouped['Composition'].apply(lambda x: '-'.join(x))
-        grouped = grouped.sort_values(by='Win Rate %', ascending=False).head(15)
-
-        # 👇 Add this directly below — no extra indentation
-        grouped['First Agent'] = grouped['Composition'].apply(lambda x: x[0])
-        grouped['Icon Path'] = grouped['First Agent'].apply(lambda agent: f"assets/{agent}.png" if os.path.exists(f"assets/{agent}.png") else None)
+        grouped = cached_view(
+            "compositions",
+            {"map": selected_map},
+            lambda: analytics.composition_table(comp_stats, selected_map)
+        )
 
 # Agent Icons Display with Bar Chart (rib.gg style)
         if not grouped.empty:
@@ -293,58 +341,104 @@ with tabs[1]:
             
             st.markdown(f"### Top Compositions on {selected_map}")
             
-            # Calculate max width for bar scaling
+            st.caption("Ranked by the lower bound of the 95% Wilson interval; bars show the raw win rate.")
+
+            # Calculate bar width percentage (scale to fit remaining space)
             max_win_rate = grouped['Win Rate %'].max()
-            
-            for idx, row in grouped.iterrows():
-                composition = row['Composition']
-                win_rate = row['Win Rate %']
-                games = row['games']
-                wins = row['wins']
-                losses = row['losses']
-                draws = row['draws']
-                
-                # Calculate bar width percentage (scale to fit remaining space)
-                bar_width_percent = (win_rate / max_win_rate * 80) if max_win_rate > 0 else 0
-                
-                # Create agent icons HTML
-                icons_html = ""
-                for agent in composition:
-                    icon_name = agent.lower().replace('/', '_').replace(' ', '_')
-                    icon_path = f"assets/agents/{icon_name}.png"
-                    
-                    if os.path.exists(icon_path):
-                        # Convert to base64 for HTML embedding
-                        import base64
-                        try:
-                            with open(icon_path, "rb") as img_file:
-                                img_data = base64.b64encode(img_file.read()).decode()
-                            icons_html += f'<img src="data:image/png;base64,{img_data}" class="agent-icon-img" title="{agent}" />'
-                        except:
-                            icons_html += f'<div class="agent-icon-img" style="background:#666;color:white;display:flex;align-items:center;justify-content:center;font-size:10px;" title="{agent}">{agent[:2]}</div>'
-                    else:
-                        icons_html += f'<div class="agent-icon-img" style="background:#666;color:white;display:flex;align-items:center;justify-content:center;font-size:10px;" title="{agent}">{agent[:2]}</div>'
-                
-                # Create the complete composition bar (rib.gg style)
-                composition_html = f"""
+            bar_widths = (grouped['Win Rate %'] / max_win_rate * 80) if max_win_rate > 0 else grouped['Win Rate %'] * 0
+
+            # Build every composition bar (rib.gg style) and render them in one call
+            bars_html = "".join(
+                f"""
                 <div class="composition-container">
                     <div class="composition-bar">
                         <div class="bar-background" style="width: {bar_width_percent}%;"></div>
                         <div class="agents-container">
-                            {icons_html}
+                            {"".join(agent_icon_html(agent) for agent in composition)}
                         </div>
                         <div class="win-rate-info">
                             <div class="win-percentage">{win_rate:.1f}%</div>
-                            <div class="game-count">({games} games)</div>
+                            <div class="game-count">({games} games · {wins}W {draws}D {losses}L · CI {ci_low:.0f}–{ci_high:.0f}%)</div>
                         </div>
                     </div>
                 </div>
                 """
-                
-                st.markdown(composition_html, unsafe_allow_html=True)
+                for composition, win_rate, games, wins, draws, losses, ci_low, ci_high, bar_width_percent in zip(
+                    grouped['Composition'], grouped['Win Rate %'], grouped['games'], grouped['wins'],
+                    grouped['draws'], grouped['losses'], grouped['Wilson Low %'], grouped['Wilson High %'], bar_widths
+                )
+            )
+            st.markdown(bars_html, unsafe_allow_html=True)
         else:
             st.info(f"No composition data available for {selected_map}")
 
+        # 🔎 Composition explorer (bitset index over every game)
+        with st.expander("🔎 Composition Explorer"):
+            comp_idx = cached_view("comp_index", {}, lambda: CompIndex(games_df))
+            explore_cols = ['Map', 'Comp String', 'games', 'wins', 'draws', 'losses', 'Win Rate %']
+
+            ex_col1, ex_col2 = st.columns(2)
+            explore_map = ex_col1.selectbox("Map:", ["All"] + valid_maps, key="explore_map")
+            must_have = ex_col2.multiselect("Comps containing:", comp_idx.agents, key="explore_agents")
+
+            if must_have:
+                matches = comp_idx.summarize(comp_idx.containing(must_have, explore_map))
+                st.markdown(f"#### Comps with {' + '.join(must_have)} ({matches['games'].sum()} games)")
+                paged_table(matches[explore_cols].round(1), "explore_matches", "comp_containing",
+                            {"map": explore_map, "agents": must_have}, win_rate_columns=['Win Rate %'])
+
+            reference_comps = sorted(comp_stats['Comp String'].unique())
+            if reference_comps:
+                ref_col1, ref_col2 = st.columns([3, 1])
+                reference = ref_col1.selectbox("Comps similar to:", reference_comps, key="explore_reference")
+                swaps = ref_col2.slider("Max swaps:", 0, 2, 1, key="explore_swaps")
+                similar = comp_idx.summarize(comp_idx.within_swaps(reference.split('-'), swaps, explore_map))
+                paged_table(similar[explore_cols].round(1), "explore_similar", "comp_within_swaps",
+                            {"map": explore_map, "reference": reference, "swaps": swaps}, win_rate_columns=['Win Rate %'])
+
+            st.markdown("#### Role Shapes (Duelist-Initiator-Controller-Sentinel)")
+            st.dataframe(
+                styling.style_win_rates(comp_idx.shape_table(explore_map).round(1), ['Win Rate %']),
+                column_config=styling.win_rate_column_config(['Win Rate %']),
+                use_container_width=True
+            )
+
+        # 🧠 Lineup optimizer (branch-and-bound over the player x agent x map ACS matrix)
+        with st.expander("🧠 Lineup Optimizer"):
+            perf = cached_view("performance_matrix", {}, lambda: PerformanceMatrix(load_table("players", lambda: analytics.load_player_form("form.csv")), registry))
+            lu_col1, lu_col2 = st.columns([3, 1])
+            lineup_players = lu_col1.multiselect("Players (pick 5):", perf.players, default=perf.regulars(),
+                                                 max_selections=LINEUP_SIZE, key="lineup_players")
+            lineup_map = lu_col2.selectbox("Map:", ["All"] + perf.maps, key="lineup_map")
+
+            role_cols = st.columns(len(registry.roles) + 2)
+            role_limits = {
+                role: role_cols[i].slider(f"{role}s:", 0, LINEUP_SIZE, (1, 2), key=f"lineup_{role}")
+                for i, role in enumerate(registry.roles)
+            }
+            top_k = role_cols[-2].number_input("Top:", 1, 20, DEFAULT_TOP_K, key="lineup_top")
+            allow_new = role_cols[-1].toggle("Allow unplayed agents", key="lineup_new")
+
+            if len(lineup_players) == LINEUP_SIZE:
+                lineups = cached_view(
+                    "lineups",
+                    {"players": lineup_players, "map": lineup_map, "roles": role_limits, "top": top_k, "new": allow_new},
+                    lambda: best_lineups(perf, lineup_players, lineup_map, role_limits, top_k, allow_new,
+                                         comp_win_rates(comp_stats, lineup_map, registry))
+                )
+                if lineups.empty:
+                    st.info("No lineup fits these role limits with the agents these players have played.")
+                else:
+                    st.markdown(" ".join(agent_icon_html(agent) for agent in lineups['Agents'].iloc[0]), unsafe_allow_html=True)
+                    st.caption("Each cell is agent (expected ACS); Comp Win Rate % is the comp's historic record on this map.")
+                    st.dataframe(
+                        styling.style_win_rates(lineups.drop(columns='Agents').round(1), ['Comp Win Rate %']),
+                        column_config=styling.win_rate_column_config(['Comp Win Rate %']),
+                        use_container_width=True, hide_index=True
+                    )
+            else:
+                st.info(f"Pick {LINEUP_SIZE} players to suggest lineups.")
+
 # 📈 ROUND INSIGHTS TAB
 with tabs[2]:
     st.subheader("📈 Round Insights from cleaned_score.csv")
@@ -357,152 +451,55 @@ with tabs[2]:
         start_date = col1.selectbox("Start Date", dates, key="insight_start")
         end_date = col2.selectbox("End Date", dates, index=len(dates)-1, key="insight_end")
 
-        filtered_df = score_df.copy()
-        if selected_map != "All":
-            filtered_df = filtered_df[filtered_df['Map'] == selected_map]
-
-        if start_date and end_date:
-            filtered_df = filtered_df[(filtered_df['Date'] >= start_date) & (filtered_df['Date'] <= end_date)]
-
-        # Derive Atk/Def WR based on Star Side
-        def extract_wr(row, side):
-            if pd.isna(row['Start']) or pd.isna(row['First Half WR']) or pd.isna(row['Second Half WR']):
-                return None
-            if side == 'Attack':
-                return row['First Half WR'] if row['Start'] == 'Attack' else row['Second Half WR']
-            elif side == 'Defence':
-                return row['First Half WR'] if row['Start'] == 'Defence' else row['Second Half WR']
-            return None
-
-        filtered_df['Atk WR Derived'] = filtered_df.apply(lambda row: extract_wr(row, 'Attack'), axis=1)
-        filtered_df['Def WR Derived'] = filtered_df.apply(lambda row: extract_wr(row, 'Defence'), axis=1)
+        round_filters = {"map": selected_map, "start": start_date, "end": end_date}
+        filtered_df = cached_view(
+            "round_rows", round_filters,
+            lambda: analytics.filter_rounds(score_df, selected_map, start_date, end_date)
+        )
 
-        st.dataframe(filtered_df, use_container_width=True)
+        paged_table(filtered_df, "round_rows", "round_rows", round_filters)
 
         st.markdown("### 🔍 Summary Stats")
 
-        agg_dict = {
-            'Games': ('Outcome', 'count'),
-            'Wins': ('Outcome', lambda x: (x.str.lower() == 'win').sum()),
-            'Draws': ('Outcome', lambda x: (x.str.lower() == 'draw').sum()),
-            'Losses': ('Outcome', lambda x: (x.str.lower() == 'loss').sum()),
-            'Avg_Atk_WR': ('Atk WR Derived', lambda x: pd.to_numeric(x.astype(str).str.replace('%','', regex=False), errors='coerce').mean()),
-            'Avg_Def_WR': ('Def WR Derived', lambda x: pd.to_numeric(x.astype(str).str.replace('%','', regex=False), errors='coerce').mean()),
-
-        }
-
-        if 'Atk PP %' in filtered_df.columns:
-            agg_dict['Atk_PP_Success'] = (
-                'Atk PP %',
-                lambda x: pd.to_numeric(x.fillna('0').str.replace('%', ''), errors='coerce').mean()
-            )
-
-        if 'Def PP %' in filtered_df.columns:
-            agg_dict['Def_PP_Success'] = (
-                'Def PP %',
-                lambda x: pd.to_numeric(x.fillna('0').str.replace('%', ''), errors='coerce').mean()
-            )
-
-
-        summary = filtered_df.groupby('Map').agg(**agg_dict).reset_index()
-        # Calculate Round Win Rate using (Atk + Def) / 2
-        summary['Raw_Round_WR'] = (summary['Avg_Atk_WR'] + summary['Avg_Def_WR']) / 2
-        summary['Round WR'] = summary['Raw_Round_WR'].apply(lambda x: f"{x * 100:.1f}%" if pd.notnull(x) else "-")
-
-
-        # Optional: Format WRs as percentages
-        # Save raw numeric values for chart use (before formatting to %)
-        summary['Raw_Atk_WR'] = summary['Avg_Atk_WR']
-        summary['Raw_Def_WR'] = summary['Avg_Def_WR']
-        summary['Raw_Round_WR'] = (summary['Raw_Atk_WR'] + summary['Raw_Def_WR']) / 2
-        summary['Round WR'] = summary['Raw_Round_WR'].apply(lambda x: f"{x * 100:.1f}%" if pd.notnull(x) else "-")
-
-
-
-        summary['Avg_Atk_WR'] = summary['Avg_Atk_WR'].apply(lambda x: f"{x * 100:.1f}%" if pd.notnull(x) else "-")
-        summary['Avg_Def_WR'] = summary['Avg_Def_WR'].apply(lambda x: f"{x * 100:.1f}%" if pd.notnull(x) else "-")
-        display_cols = ['Map', 'Games', 'Wins', 'Draws', 'Losses', 'Avg_Atk_WR', 'Avg_Def_WR','Round WR']
-
-        def highlight_win_rates(val, threshold_low=40, threshold_high=60):
-            try:
-                val = float(val.replace('%', ''))
-            except:
-                return ''
-            if val >= threshold_high:
-                return 'background-color: #14532d; color: white;'  # green
-            elif val < threshold_low:
-                return 'background-color: #7f1d1d; color: white;'  # red
-            else:
-                return 'background-color: #78350f; color: white;'  # amber
-
-        styled_df = summary[display_cols].style\
-            .applymap(highlight_win_rates, subset=['Avg_Atk_WR', 'Avg_Def_WR','Round WR'])\
-            .set_properties(**{'text-align': 'center'})\
-            .set_table_styles([{
-                'selector': 'th',
-                'props': [('background-color', '#1a1a1a'), ('color', '#FDB913'), ('text-align', 'center')]
-            }])
-
-        # Only show selected columns in the summary table (hide raw WRs)
-        display_cols = ['Map', 'Games', 'Wins', 'Draws', 'Losses', 'Avg_Atk_WR', 'Avg_Def_WR','Round WR']
-        st.dataframe(styled_df, use_container_width=True)
-
-        # Visualize Attack vs Defense Win Rates
-        # Prepare data
-        plot_df = summary[['Map', 'Raw_Atk_WR', 'Raw_Def_WR']].copy()
-        plot_df.rename(columns={'Raw_Atk_WR': 'Attack', 'Raw_Def_WR': 'Defense'}, inplace=True)
-        plot_df['Attack'] *= 100
-        plot_df['Defense'] *= 100
-
-        # Melt for plotting
-        plot_df = plot_df.melt(id_vars='Map', var_name='Side', value_name='Win Rate (%)')
-        plot_df['Map'] = pd.Categorical(plot_df['Map'], categories=plot_df.groupby('Map')['Win Rate (%)'].mean().sort_values(ascending=False).index, ordered=True)
-
-        # Wolves color map
-        color_map = {
-            'Attack': '#FDB913',   # Gold
-            'Defense': '#ffffff'   # White
-        }
-
-        fig = px.bar(
-            plot_df,
-            x='Map',
-            y='Win Rate (%)',
-            color='Side',
-            color_discrete_map=color_map,
-            barmode='group',
-            text=plot_df['Win Rate (%)'].apply(lambda x: f"{x:.1f}%"),
-            title="Attack vs Defense Win Rates by Map"
-        )
-
-        fig.update_traces(
-            textposition='outside',
-            marker_line_color='#333333',
-            marker_line_width=1.2,
-            width=0.4
-        )
-
-        fig.update_layout(
-            plot_bgcolor='#000000',
-            paper_bgcolor='#000000',
-            font=dict(color='#FDB913', family='Inter'),
-            title_font=dict(color='#FDB913', size=20),
-            legend_title_text='Side',
-            xaxis=dict(tickangle=-25, gridcolor='#333333'),
-            yaxis=dict(range=[0, 100], gridcolor='#333333')
+        summary = cached_view(
+            "round_summary", round_filters,
+            lambda: analytics.round_summary(filtered_df)
+        ).copy()
+
+        # Prefetch the other maps for these dates and the full range for this map
+        def round_summary_for(map_name, start, end):
+            rows = cached_view("round_rows", {"map": map_name, "start": start, "end": end},
+                               lambda: analytics.filter_rounds(score_df, map_name, start, end))
+            return analytics.round_summary(rows)
+
+        for other_map, other_start, other_end in [(m, start_date, end_date) for m in ["All"] + maps] + [(selected_map, dates[0], dates[-1])]:
+            prefetcher.submit("round_summary", {"map": other_map, "start": other_start, "end": other_end},
+                              partial(round_summary_for, other_map, other_start, other_end))
+
+        # Win rates stay numeric: colours from one np.select per column, % formatting from column configs
+        summary['Round WR'] = summary['Raw_Round_WR']
+        display_cols = ['Map', 'Games', 'Wins', 'Draws', 'Losses', 'Avg_Atk_WR', 'Avg_Def_WR', 'Round WR']
+        wr_cols = ['Avg_Atk_WR', 'Avg_Def_WR', 'Round WR']
+        st.dataframe(
+            styling.style_win_rates(summary[display_cols], wr_cols, scale=100),
+            column_config=styling.win_rate_column_config(wr_cols, scale=100),
+            use_container_width=True
         )
 
+        # Visualize Attack vs Defense Win Rates
+        fig = figures.side_winrate_bar(summary)
         st.plotly_chart(fig, use_container_width=True)
 
         #--- Post-Plant Success Rate Bar Chart ---
-        if 'Atk_PP_Success' in score_df.columns and 'Def_PP_Success' in score_df.columns:
+        has_round_plants = rounds is not None and rounds.has_plants
+        if has_round_plants or ('Atk_PP_Success' in score_df.columns and 'Def_PP_Success' in score_df.columns):
             st.markdown("### 📊 Post-Plant Success Rate by Map")
 
-            # Fresh aggregation directly from original score_df
-            pp_df = score_df.groupby('Map').agg({
-                'Atk_PP_Success': lambda x: pd.to_numeric(x.astype(str).str.replace('%','', regex=False), errors='coerce').mean(),
-                'Def_PP_Success': lambda x: pd.to_numeric(x.astype(str).str.replace('%','', regex=False), errors='coerce').mean()
-            }).reset_index()
+            # Planted rounds from the round log when we have them, else the sheet's PP %
+            if has_round_plants:
+                pp_df = cached_view("post_plant_rounds", {}, lambda: round_store.post_plant_by_map(rounds))
+            else:
+                pp_df = cached_view("post_plant", {}, lambda: analytics.post_plant_by_map(score_df))
 
             label_map = {
                 "Atk_PP_Success": "Post Plant",
@@ -514,80 +511,27 @@ with tabs[2]:
             sort_order = st.radio("Order", ["Descending", "Ascending"], horizontal=True)
             ascending = sort_order == "Ascending"
 
-            # Optional: convert to 0–100 range if needed
-            if pp_df['Atk_PP_Success'].max() <= 1.0:
-                pp_df['Atk_PP_Success'] *= 100
-                pp_df['Def_PP_Success'] *= 100
-
             pp_df = pp_df.sort_values(by=sort_col, ascending=ascending)
             pp_df['Map'] = pd.Categorical(pp_df['Map'], categories=pp_df['Map'], ordered=True)
 
             pp_df.rename(columns=label_map, inplace=True)
             pp_df_long = pp_df.melt(id_vars='Map', var_name='Side', value_name='Post-Plant Success (%)')
 
-            fig_pp = px.bar(
-                pp_df_long,
-                x='Map',
-                y='Post-Plant Success (%)',
-                color='Side',
-                barmode='stack',
-                text=pp_df_long['Post-Plant Success (%)'].apply(lambda x: f"{x:.1f}%"),
-                title="Post-Plant Success Rate (Stacked Atk + Def)",
-                color_discrete_map={
-                    'Post Plant': '#FDB913',
-                    'Retakes': '#ffffff'
-                }
-            )
-
-            fig_pp.update_traces(
-                textposition='inside',
-                marker_line_color='#333333',
-                marker_line_width=1.2
-            )
-
-            fig_pp.update_layout(
-                plot_bgcolor='#000000',
-                paper_bgcolor='#000000',
-                font=dict(family='Inter, sans-serif', size=14, color='#FDB913'),
-                title_font=dict(size=20, color='#FDB913'),
-                xaxis=dict(
-                    title='Map',
-                    title_font=dict(size=16, color='#FDB913'),
-                    tickfont=dict(size=14, color='#ffffff'),
-                    tickangle=-25,
-                    gridcolor='#333333'
-                ),
-                yaxis=dict(
-                    title='Post-Plant Success (%)',
-                    title_font=dict(size=16, color='#FDB913'),
-                    tickfont=dict(size=14, color='#ffffff'),
-                    gridcolor='#333333',
-                    range=[0, 100]
-                ),
-                legend=dict(
-                    font=dict(size=13, color='#ffffff')
-                )
-            )
-
+            fig_pp = figures.post_plant_bar(pp_df_long)
             st.plotly_chart(fig_pp, use_container_width=True)
 
 
-
-from datetime import datetime
-
-from datetime import datetime
-
 # 📊 GRAPH INSIGHTS TAB
 with tabs[3]:
     st.subheader("🔫 Pistol Round Win Rate by Map")
 
     if not score_df.empty:
         # Ensure date column is in datetime format
-        score_df['Date'] = pd.to_datetime(score_df['Date'], errors='coerce')
+        score_dates = analytics.score_dates(score_df['Date'])
 
         # Date filter
-        min_date = score_df['Date'].min()
-        max_date = score_df['Date'].max()
+        min_date = score_dates.min()
+        max_date = score_dates.max()
 
         start_date, end_date = st.date_input(
             "Select Date Range",
@@ -596,147 +540,65 @@ with tabs[3]:
             max_value=max_date
         )
 
-        # Filter dataframe by date range
-        filtered_df = score_df[(score_df['Date'] >= pd.to_datetime(start_date)) & (score_df['Date'] <= pd.to_datetime(end_date))]
-
-        # Calculate pistol stats
-        filtered_df['Total Pistols Won'] = filtered_df['First Pistol'] + filtered_df['Second Pistol']
-        grouped = filtered_df.groupby('Map').agg(
-            Total_Pistols_Won=('Total Pistols Won', 'sum'),
-            Total_Pistols_Played=('Map', 'count')
-        ).reset_index()
-
-        grouped['Total_Pistols_Played'] *= 2  # 2 pistol rounds per map
-        grouped['Pistol Win Rate (%)'] = (grouped['Total_Pistols_Won'] / grouped['Total_Pistols_Played']) * 100
-
-        grouped = grouped.sort_values(by='Pistol Win Rate (%)', ascending=False)
+        # Every chart below is a slice of the precomputed count tensors
+        grouped = pistol_tensor.pistol_by_map(pistols, start_date, end_date)
 
         # Plotly bar chart
-        fig_pistol = px.bar(
-            grouped,
-            x='Map',
-            y='Pistol Win Rate (%)',
-            text=grouped['Pistol Win Rate (%)'].apply(lambda x: f"{x:.1f}%"),
-            color='Pistol Win Rate (%)',
-            color_continuous_scale=['#ff0000', '#FDB913'],
-            title="Pistol Win Rates by Map"
-        )
-
-        fig_pistol.update_traces(
-            textposition='outside',
-            marker_line_color='#000000',
-            marker_line_width=1.2
-        )
-
-        fig_pistol.update_layout(
-            plot_bgcolor='#000000',
-            paper_bgcolor='#000000',
-            font=dict(family='Inter', size=14, color='#FDB913'),
-            title_font=dict(size=20, color='#FDB913'),
-            xaxis=dict(tickfont=dict(color='#ffffff'), gridcolor='#333333'),
-            yaxis=dict(range=[0, 100], title='Win Rate (%)', title_font=dict(color='#FDB913'), tickfont=dict(color='#ffffff'), gridcolor='#333333')
-        )
-
+        fig_pistol = figures.pistol_bar(grouped)
         st.plotly_chart(fig_pistol, use_container_width=True)
 
-        # --- 2nd Round Conversion Pie Charts (WW/WL and LL/LW) ---
+        by_side = pistol_tensor.pistol_by_side(pistols, start_date, end_date)
+        if not by_side.empty:
+            fig_pistol_side = figures.pistol_side_bar(by_side)
+            st.plotly_chart(fig_pistol_side, use_container_width=True)
+
         # --- 2nd Round Conversion Pie Charts (WW/WL and LL/LW) ---
         st.markdown("### 🍰 2nd Round Outcomes by Map")
 
-        if 'Atk 2nd' in filtered_df.columns and 'Def 2nd' in filtered_df.columns:
+        conversion_data = pistol_tensor.conversion_counts(pistols, start_date, end_date)
 
-             conversion_data = pd.concat([
-                 filtered_df[['Map', 'Atk 2nd']].rename(columns={'Atk 2nd': 'Conversion'}),
-                 filtered_df[['Map', 'Def 2nd']].rename(columns={'Def 2nd': 'Conversion'})
-             ])
+        if not conversion_data.empty:
 
              map_list = conversion_data['Map'].dropna().unique()
-             selected_map = st.selectbox("Select a map to view 2nd round breakdown:", sorted(map_list))
-
-             map_conversions = conversion_data[conversion_data['Map'] == selected_map]
+             pie_col1, pie_col2 = st.columns(2)
+             selected_map = pie_col1.selectbox("Select a map to view 2nd round breakdown:", sorted(map_list))
+             selected_side = pie_col2.radio("Side:", ["Both", "Attack", "Defence"], horizontal=True, key="pistol_side")
+             pie_side = None if selected_side == "Both" else selected_side
+             side_label = "" if pie_side is None else f" ({pie_side})"
 
              col1, col2 = st.columns(2)
 
              with col1:
                  st.markdown("#### 🔁 After Winning Pistol (WW/WL)")
-                 filtered_win = map_conversions[map_conversions['Conversion'].isin(['WW', 'WL'])]
+                 pie_data_win = pistol_tensor.conversion_shares(pistols, selected_map, ['WW', 'WL'], start_date, end_date, pie_side)
 
-                 if filtered_win.empty:
+                 if pie_data_win.empty:
                      st.info("No conversion attempts found for pistol round wins on this map.")
                  else:
-                     pie_data_win = filtered_win['Conversion'].value_counts(normalize=True).reset_index()
-                     pie_data_win.columns = ['Conversion', 'Percentage']
-                     pie_data_win['Percentage'] *= 100
-
-                     fig_pie_win = px.pie(
-                         pie_data_win,
-                         names='Conversion',
-                         values='Percentage',
-                         title=f"Pistol Conversion - {selected_map}",
-                         color='Conversion',
-                         color_discrete_map={
-                             'WW': '#FDB913',
-                             'WL': '#666666'
-                         },
-                         hole=0.4
-                     )
-
-                     fig_pie_win.update_traces(
-                         textinfo='label+percent',
-                         marker_line_color='#000000',
-                         marker_line_width=1.5
-                     )
 
-                     fig_pie_win.update_layout(
-                         plot_bgcolor='#000000',
-                         paper_bgcolor='#000000',
-                         font=dict(family='Inter', size=14, color='#FDB913'),
-                         title_font=dict(size=18, color='#FDB913'),
-                         legend=dict(font=dict(color='#ffffff'))
+                     fig_pie_win = figures.conversion_pie(
+                         pie_data_win, f"Pistol Conversion - {selected_map}{side_label}", {'WW': '#FDB913', 'WL': '#666666'}
                      )
 
                      st.plotly_chart(fig_pie_win, use_container_width=True)
 
              with col2:
                  st.markdown("#### 🔁 After Losing Pistol (LL/LW)")
-                 filtered_loss = map_conversions[map_conversions['Conversion'].isin(['LL', 'LW'])]
+                 pie_data_loss = pistol_tensor.conversion_shares(pistols, selected_map, ['LL', 'LW'], start_date, end_date, pie_side)
 
-                 if filtered_loss.empty:
+                 if pie_data_loss.empty:
                      st.info("No eco round outcomes found for pistol round losses on this map.")
                  else:
-                     pie_data_loss = filtered_loss['Conversion'].value_counts(normalize=True).reset_index()
-                     pie_data_loss.columns = ['Conversion', 'Percentage']
-                     pie_data_loss['Percentage'] *= 100
-
-                     fig_pie_loss = px.pie(
-                         pie_data_loss,
-                         names='Conversion',
-                         values='Percentage',
-                         title=f"Eco Round Outcomes - {selected_map}",
-                         color='Conversion',
-                         color_discrete_map={
-                             'LL': '#444444',
-                             'LW': '#3b82f6'
-                         },
-                         hole=0.4
-                     )
 
-                     fig_pie_loss.update_traces(
-                         textinfo='label+percent',
-                         marker_line_color='#000000',
-                         marker_line_width=1.5
-                     )
-
-                     fig_pie_loss.update_layout(
-                         plot_bgcolor='#000000',
-                         paper_bgcolor='#000000',
-                         font=dict(family='Inter', size=14, color='#FDB913'),
-                         title_font=dict(size=18, color='#FDB913'),
-                         legend=dict(font=dict(color='#ffffff'))
+                     fig_pie_loss = figures.conversion_pie(
+                         pie_data_loss, f"Eco Round Outcomes - {selected_map}{side_label}", {'LL': '#444444', 'LW': '#3b82f6'}
                      )
 
                      st.plotly_chart(fig_pie_loss, use_container_width=True)
 
+             with st.expander("📋 2nd round counts by map and side"):
+                 st.dataframe(conversion_data, use_container_width=True, hide_index=True)
+
     else:
          st.info("No data available for pistol or 2nd round conversion insights.")
 
@@ -746,15 +608,12 @@ with tabs[4]:
     st.subheader("🧑‍💼 Player Agent Stats")
 
     try:
-        player_df = pd.read_csv("form.csv")
+        player_df = load_table("players", lambda: analytics.load_player_form("form.csv"))
     except Exception as e:
         st.warning(f"Could not load player data: {e}")
         player_df = pd.DataFrame()
 
     if not player_df.empty:
-        player_df['Date'] = pd.to_datetime(player_df['Date'], errors='coerce')
-        player_df = player_df.dropna(subset=['Date'])
-
         all_players = sorted(player_df['Player'].dropna().unique())
         all_maps = sorted(player_df['Column 1'].dropna().unique())
 
@@ -767,37 +626,57 @@ with tabs[4]:
         end_date = col2.date_input("End date:", min_value=min_date, max_value=max_date, value=max_date)
         selected_map = col2.selectbox("Filter by Map:", ["All"] + all_maps)
 
-        filtered = player_df[
-            (player_df['Player'] == selected_player) &
-            (player_df['Date'].dt.date >= start_date) &
-            (player_df['Date'].dt.date <= end_date)
-        ]
-
-        if selected_map != "All":
-            filtered = filtered[filtered['Column 1'] == selected_map]
-
-        if not filtered.empty:
-            agent_stats = filtered.groupby('Agent').agg(
-                Rounds=('Rounds', 'sum'),
-                Kills=('Kills', 'sum'),
-                Deaths=('Deaths', 'sum'),
-                Assists=('Assists', 'sum'),
-                ACS=('ACS', 'mean'),
-                FK=('FK', 'sum'),
-                Plants=('Plants', 'sum')
-            ).reset_index()
-
-            agent_stats['K/D Ratio'] = agent_stats['Kills'] / agent_stats['Deaths'].replace(0, float('nan'))
-            agent_stats['K+A per Round'] = (agent_stats['Kills'] + agent_stats['Assists']) / agent_stats['Rounds'].replace(0, float('nan'))
+        def compute_agent_stats():
+            # Every player's full-range table is prebuilt by artifacts.py
+            if (start_date, end_date, selected_map) == (min_date, max_date, "All"):
+                stored = artifacts.fresh("agent_stats")
+                if stored is not None and selected_player in stored:
+                    return stored[selected_player]
+            return analytics.player_agent_stats(player_df, selected_player, start_date, end_date, selected_map)
+
+        display_df = cached_view(
+            "player_agent_stats",
+            {"player": selected_player, "start": start_date, "end": end_date, "map": selected_map},
+            compute_agent_stats
+        )
 
-            display_df = agent_stats.round(2)[['Agent', 'Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'Plants', 'K/D Ratio', 'K+A per Round']]
+        # Prefetch the rest of the roster for these filters and the full range for this player
+        for other_player, other_start, other_end in [(p, start_date, end_date) for p in all_players] + [(selected_player, min_date, max_date)]:
+            prefetcher.submit(
+                "player_agent_stats", {"player": other_player, "start": other_start, "end": other_end, "map": selected_map},
+                partial(analytics.player_agent_stats, player_df, other_player, other_start, other_end, selected_map)
+            )
 
+        if not display_df.empty:
             st.markdown(f"### 🔍 Agent Performance for {selected_player} from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
             st.dataframe(display_df, use_container_width=True)
 
         else:
             st.info("No data for this player in the selected filters.")
 
+        # 📈 Form over time, from the incrementally maintained trend engine
+        st.markdown(f"### 📈 Form Over Time for {selected_player}")
+        trend_engine = get_form_trends(data_version)
+        trend_col1, trend_col2, trend_col3 = st.columns(3)
+        trend_stat = trend_col1.selectbox("Stat:", list(TREND_STATS), key='trend_stat')
+        trend_group = trend_col2.selectbox("Split by:", ["Agent", "Map"], key='trend_group')
+        trend_smoothing = trend_col3.selectbox("Smoothing:", ["EWMA", "Rolling"], key='trend_smoothing')
+
+        history = cached_view(
+            "form_history", {"player": selected_player, "group": trend_group},
+            lambda: trend_engine.history(selected_player, trend_group.lower())
+        )
+        history = history[(history['Date'].dt.date >= start_date) & (history['Date'].dt.date <= end_date)]
+        if selected_map != "All" and trend_group == "Map":
+            history = history[history['Map'] == selected_map]
+
+        if history[history['Stat'] == trend_stat]['Value'].notna().any():
+            fig_trend = figures.form_trend_line(history, trend_stat, trend_group, trend_smoothing)
+            st.plotly_chart(fig_trend, use_container_width=True)
+            st.caption(f"{trend_smoothing} over the last {trend_engine.window} games (EWMA span {trend_engine.span}) per {trend_group.lower()}; dots are single games.")
+        else:
+            st.info(f"No {trend_stat} recorded for this player in the selected filters.")
+
     else:
         st.warning("No player stats found in form.csv")
 
@@ -900,50 +779,7 @@ if 'Atk_PP_Success' in summary.columns and 'Def_PP_Success' in summary.columns:
     pp_df_long = pp_df.melt(id_vars='Map', var_name='Side', value_name='Post-Plant Success (%)')
 
     # Plot
-    fig_pp = px.bar(
-        pp_df_long,
-        x='Map',
-        y='Post-Plant Success (%)',
-        color='Side',
-        barmode='stack',
-        text=pp_df_long['Post-Plant Success (%)'].apply(lambda x: f"{x:.1f}%"),
-        title="Post-Plant Success Rate (Stacked Atk + Def)",
-        color_discrete_map={
-            'Post Plant': '#FDB913',
-            'Retakes': '#ffffff'
-        }
-    )
-
-    fig_pp.update_traces(
-        textposition='inside',
-        marker_line_color='#333333',
-        marker_line_width=1.2
-    )
-
-    fig_pp.update_layout(
-        plot_bgcolor='#000000',
-        paper_bgcolor='#000000',
-        font=dict(family='Inter, sans-serif', size=14, color='#FDB913'),
-        title_font=dict(size=20, color='#FDB913'),
-        xaxis=dict(
-            title='Map',
-            title_font=dict(size=16, color='#FDB913'),
-            tickfont=dict(size=14, color='#ffffff'),
-            tickangle=-25,
-            gridcolor='#333333'
-        ),
-        yaxis=dict(
-            title='Post-Plant Success (%)',
-            title_font=dict(size=16, color='#FDB913'),
-            tickfont=dict(size=14, color='#ffffff'),
-            gridcolor='#333333',
-            range=[0, 100]
-        ),
-        legend=dict(
-            font=dict(size=13, color='#ffffff')
-        )
-    )
-
+    fig_pp = figures.post_plant_bar(pp_df_long)
     st.plotly_chart(fig_pp, use_container_width=True)
 
 # 📊 PLAYER COMPARISON TAB
@@ -951,16 +787,12 @@ with tabs[5]:
     st.subheader("🎚 Player vs VCT Benchmark Comparison")
 
     try:
-        player_df = pd.read_csv("form.csv")
+        player_df = load_table("players", lambda: analytics.load_player_form("form.csv"))
     except Exception as e:
         st.warning(f"Could not load player data: {e}")
         player_df = pd.DataFrame()
 
     if not player_df.empty:
-        # Convert and filter dates
-        player_df['Date'] = pd.to_datetime(player_df['Date'], errors='coerce')
-        player_df = player_df.dropna(subset=['Date'])
-
         all_players = sorted(player_df['Player'].dropna().unique())
         all_maps = sorted(player_df['Column 1'].dropna().unique())
 
@@ -973,175 +805,74 @@ with tabs[5]:
         end_date = col2.date_input("End date:", value=max_date, min_value=min_date, max_value=max_date, key='compare_end')
         selected_map = col2.selectbox("Filter by Map:", ["All"] + all_maps, key='compare_map')
 
-        # Agent to role mapping
-        agent_roles = {
-            'Jett': 'Duelist', 'Raze': 'Duelist', 'Reyna': 'Duelist', 'Yoru': 'Duelist', 'Phoenix': 'Duelist', 'Iso': 'Duelist', 'Waylay': 'Duelist', 'Neon':'Duelist',
-            'Skye': 'Initiator', 'KAY/O': 'Initiator', 'Breach': 'Initiator', 'Fade': 'Initiator', 'Sova': 'Initiator', 'Gekko': 'Initiator', 'Tejo': 'Initiator',
-            'Omen': 'Controller', 'Brimstone': 'Controller', 'Astra': 'Controller', 'Viper': 'Controller', 'Harbor': 'Controller', 'Clove': 'Controller',
-            'Killjoy': 'Sentinel', 'Cypher': 'Sentinel', 'Chamber': 'Sentinel', 'Sage': 'Sentinel', 'Deadlock': 'Sentinel', 'Vyse': 'Sentinel', 'Veto': 'Sentinel'
-        }
-
-        # VCT average benchmarks by role
-        vct_benchmarks = {
-            'Duelist':     {'ACS': 240, 'KPR': 0.90, 'FBSR': 0.55, 'FKPR': 0.18, 'Atk_Entry': 0.55},
-            'Initiator':   {'ACS': 196, 'KPR': 0.90, 'FD': 2, 'K+A per Round': 1, 'Assists': 10.0},
-            'Controller':  {'ACS': 203, 'KPR': 0.90, 'FD': 2, 'K+A per Round': 1, 'Multi_Kills': 0.25},
-            'Sentinel':    {'ACS': 200, 'KPR': 0.90, 'FD': 2, 'Multi_Kills': 0.25, 'Anchor_Time': 48.0},
-        }
-
-        filtered = player_df[
-            (player_df['Player'] == selected_player) &
-            (player_df['Date'].dt.date >= start_date) &
-            (player_df['Date'].dt.date <= end_date)
-        ]
-
-        if selected_map != "All":
-            filtered = filtered[filtered['Column 1'] == selected_map]
-
-        if not filtered.empty:
-            # Fill missing 'Atk Entry' with 0 to ensure smooth calculations
-            if 'Atk_Entry' in filtered.columns:
-                filtered['Atk_Entry'] = filtered['Atk_Entry'].fillna(0)
-
-            # Clean and convert percentage columns
-            for col in ['Rounds', 'Kills', 'Deaths', 'Assists', 'ACS', 'FK', 'FBSR', 'FKPR', 'KPR', 'Atk_Entry', 'FD','Multi-Kills']:
-                if col in filtered.columns:
-                    filtered[col] = filtered[col].astype(str).str.replace('%', '', regex=False)
-                    filtered[col] = pd.to_numeric(filtered[col], errors='coerce')
-
-            # Compute player stats per agent
-            agent_stats = filtered.groupby('Agent').agg(
-                Rounds=('Rounds', 'sum'),
-                Kills=('Kills', 'sum'),
-                Deaths=('Deaths', 'sum'),
-                Multi_Kills=('Multi_Kills','mean'),
-                Assists=('Assists', 'mean'),
-                ACS=('ACS', 'mean'),
-                FK=('FK', 'sum'),
-                FBSR=('FBSR', 'mean'),
-                FKPR=('FKPR', 'mean'),
-                KPR=('KPR', 'mean'),
-                Atk_Entry=('Atk_Entry', 'mean'),
-                FD=('FD', 'mean'),
-                Anchor_Time=('Anchor_Time', 'mean')
-            ).reset_index()
-
-            agent_stats['K/D Ratio'] = agent_stats['Kills'] / agent_stats['Deaths'].replace(0, float('nan'))
-            agent_stats['K+A per Round'] = (agent_stats['Kills'] + agent_stats['Assists']) / agent_stats['Rounds'].replace(0, float('nan'))
-            agent_stats['Role'] = agent_stats['Agent'].map(agent_roles)
+        # Role benchmarks for the chosen region / season
+        regions = registry.regions()
+        if len(regions) > 1 or len(registry.seasons(registry.default_region)) > 1:
+            bench_col1, bench_col2 = st.columns(2)
+            bench_region = bench_col1.selectbox("Benchmark region:", regions, index=regions.index(registry.default_region), key='compare_region')
+            seasons = registry.seasons(bench_region)
+            default_season = seasons.index(registry.default_season) if registry.default_season in seasons else len(seasons) - 1
+            bench_season = bench_col2.selectbox("Benchmark season:", seasons, index=default_season, key='compare_season')
+        else:
+            bench_region, bench_season = registry.default_region, registry.default_season
+        vct_benchmarks = registry.role_benchmarks(bench_region, bench_season)
+
+        # Every (player, role) pair in one grouped pass, shared by all players and roles
+        roster_filters = {"start": start_date, "end": end_date, "map": selected_map}
+        compute_roster = partial(analytics.roster_role_stats, player_df, start_date, end_date, selected_map, registry)
+        # The full range over every map is what artifacts.py prebuilds
+        if (start_date, end_date, selected_map) == (min_date, max_date, "All"):
+            compute_roster = partial(artifacts.fresh_or, "roster_roles", compute_roster)
+        roster = cached_view("roster_role_stats", roster_filters, compute_roster)
+        for other_map in all_maps:
+            if other_map != selected_map:
+                prefetcher.submit(
+                    "roster_role_stats", {**roster_filters, "map": other_map},
+                    partial(analytics.roster_role_stats, player_df, start_date, end_date, other_map, registry)
+                )
 
+        player_roles = roster.loc[selected_player] if selected_player in roster.index.get_level_values('Player') else None
+        if player_roles is not None:
             selected_role = st.selectbox("Select Role:", sorted(vct_benchmarks.keys()), key='compare_role')
-            role_agents = agent_stats[agent_stats['Role'] == selected_role]
 
-            if not role_agents.empty:
+            if selected_role in player_roles.index:
                 benchmark = vct_benchmarks[selected_role]
-
-                player_avg = {}
-                for stat in benchmark:
-                    if stat == 'FK':
-                        player_avg[stat] = (role_agents['FK'].sum() / role_agents['Rounds'].sum()) if role_agents['Rounds'].sum() > 0 else 0
-                    elif stat == 'K+A per Round':
-                        player_avg[stat] = (role_agents['Kills'].sum() + role_agents['Assists'].sum()) / role_agents['Rounds'].sum()
-                    elif stat == 'K/D Ratio':
-                        player_avg[stat] = role_agents['Kills'].sum() / role_agents['Deaths'].replace(0, float('nan')).sum()
-                    else:
-                        if stat in role_agents.columns:
-                            val = role_agents[stat].mean()
-                            player_avg[stat] = val if pd.notna(val) else 0
-                        else:
-                            player_avg[stat] = 0
-
-                # Normalize values (manual bounds)
-                norm_base = {
-                    'ACS': 300,
-                    'K/D Ratio': 2.0,
-                    'FK': 0.3,
-                    'K+A per Round': 1.2,
-                    'KPR': 1.2,
-                    'FBSR': 1.0,
-                    'FKPR': 0.3,
-                    'Atk_Entry': 1.0,
-                    'FD': 20.0,
-                    'Assists': 20.0,
-                    'Multi_Kills': 0.3,
-                    'Anchor_Time':80.0
-                }
-
-                categories = list(benchmark.keys())
-                player_values = [player_avg.get(stat, 0) / norm_base[stat] for stat in categories]
-                benchmark_values = [benchmark.get(stat, 0) / norm_base[stat] for stat in categories]
-
-                import plotly.graph_objects as go
-                fig = go.Figure()
-                fig.add_trace(go.Scatterpolar(
-                    r=player_values,
-                    theta=categories,
-                    fill='toself',
-                    name=f"{selected_player}",
-                    line=dict(color="#FDB913")
-                ))
-                fig.add_trace(go.Scatterpolar(
-                    r=benchmark_values,
-                    theta=categories,
-                    fill='toself',
-                    name=f"VCT {selected_role} Avg",
-                    line=dict(color="#444444")
-                ))
-
-                raw_values = []
-                for stat in categories:
-                    val = player_avg[stat]
-                    bmark = benchmark[stat]
-                    diff = val - bmark
-                    sign = '+' if diff >= 0 else ''
-                    color = "#14532d" if diff >= 0 else "#7f1d1d"
-
-                    # Use % format for relevant stats
-                    if stat in ['FBSR', 'FKPR', 'Atk Entry']:
-                        display_diff = f"{sign}{diff * 100:.1f}%"
-                    else:
-                        display_diff = f"{sign}{diff:.2f}"
-
-                    if stat in ['FBSR', 'FKPR', 'Atk Entry']:
-                        raw_values.append(f"<span style='color:{color}'><b>{stat}</b>: {sign}{diff * 100:.1f}%</span>")
-                    else:
-                        raw_values.append(f"<span style='color:{color}'><b>{stat}</b>: {sign}{diff:.2f}</span>")
-
-                fig.add_annotation(
-                    text="<br>".join(raw_values),
-                    showarrow=False,
-                    align="left",
-                    x=0.95,
-                    y=0.95,
-                    xref="paper",
-                    yref="paper",
-                    bordercolor="#666",
-                    borderwidth=1,
-                    bgcolor="rgba(0,0,0,0.85)",
-                    font=dict(color="white", size=12)
-                )
-
-                fig.update_layout(
-                    polar=dict(
-                        bgcolor="#000000",
-                        radialaxis=dict(
-                            visible=False,
-                            showticklabels=False,
-                            ticks='',
-                            showline=False,
-                            gridcolor="#333333"
-                        ),
-                        angularaxis=dict(tickfont=dict(color="#FDB913"))
-                    ),
-                    showlegend=True,
-                    legend=dict(font=dict(color="#ffffff")),
-                    plot_bgcolor='#000000',
-                    paper_bgcolor='#000000',
-                    font=dict(family='Inter', color='#FDB913'),
-                    title=dict(text=f"{selected_role} Stats vs VCT Benchmark", font=dict(size=16, color='#FDB913')),
-                    margin=dict(l=40, r=40, t=60, b=40)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                role_roster = roster.xs(selected_role, level='Role')
+                player_avg = role_roster.loc[selected_player, list(benchmark)].to_dict()
+
+                teammates = [p for p in role_roster.index if p != selected_player]
+                overlay = st.multiselect(f"Overlay other {selected_role} players:", teammates, key='compare_overlay')
+                others = {p: role_roster.loc[p, list(benchmark)].to_dict() for p in overlay}
+
+                percentile_engine = cached_view("percentile_engine", {}, load_percentile_engine)
+                if percentile_engine is not None and percentile_engine.has(selected_role, bench_region, bench_season):
+                    # Percentiles among the benchmark pros, for the whole roster in one pass
+                    roster_pct = cached_view(
+                        "roster_percentiles", {**roster_filters, "region": bench_region, "season": bench_season},
+                        lambda: percentile_engine.rank(roster_role_values(roster, vct_benchmarks), bench_region, bench_season)
+                    )
+                    role_pct = roster_pct[roster_pct['Role'] == selected_role]
+                    pct_table = role_pct.pivot(index='Player', columns='Stat', values='Percentile')[list(benchmark)]
+                    player_pct = role_pct[role_pct['Player'] == selected_player].set_index('Stat')
+                    fig = figures.percentile_radar(
+                        pct_table.loc[selected_player].to_dict(),
+                        selected_player, selected_role, bench_region,
+                        player_pct['Pros'].to_dict(),
+                        others={p: pct_table.loc[p].to_dict() for p in overlay}
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    with st.expander(f"📋 Roster {selected_role} percentiles"):
+                        st.dataframe(pct_table.round(0), use_container_width=True)
+                else:
+                    # Normalize values (manual bounds)
+                    fig = figures.role_radar(player_avg, benchmark, registry.norm_base, selected_player, selected_role,
+                                             bench_region, others=others)
+                    st.plotly_chart(fig, use_container_width=True)
+
+                with st.expander(f"📋 Roster {selected_role} stats"):
+                    paged_table(role_roster[['Games', 'Rounds'] + list(benchmark)].round(3).reset_index(), "roster_table",
+                                "roster_role_stats", {**roster_filters, "role": selected_role})
 
             else:
                 st.info("No agents played in the selected role during this period.")
@@ -1151,6 +882,137 @@ with tabs[5]:
     else:
         st.warning("No player stats found in form.csv")
 
+# 🎲 MAP SIMULATOR TAB
+with tabs[6]:
+    st.subheader("🎲 Map Win Simulator")
+
+    if pistols is not None:
+        sim_dates = analytics.score_dates(score_df['Date']).dropna()
+        sim_maps = sorted(score_df['Map'].dropna().unique())
+
+        sim_col1, sim_col2 = st.columns(2)
+        sim_map = sim_col1.selectbox("Map:", sim_maps, key="sim_map")
+        sim_range = sim_col2.date_input(
+            "Date range:",
+            value=(sim_dates.min().date(), sim_dates.max().date()),
+            min_value=sim_dates.min().date(),
+            max_value=sim_dates.max().date(),
+            key="sim_range"
+        )
+        sim_overtime = st.toggle("Play overtime at 12-12 (otherwise it's a draw, as in scrims)", key="sim_overtime")
+
+        if len(sim_range) == 2:
+            sim_start, sim_end = sim_range
+            sim = cached_view(
+                "map_simulation", {"map": sim_map, "start": sim_start, "end": sim_end, "overtime": sim_overtime},
+                lambda: map_simulation(score_df, pistols, sim_map, sim_start, sim_end, overtime=sim_overtime)
+            )
+
+            if sim['games'] == 0:
+                st.info("No games on this map in the selected range.")
+            else:
+                st.caption(
+                    f"{sim['simulations']:,} simulated maps from {sim['games']} games "
+                    f"({sim['attack_share'] * 100:.0f}% started on attack). Each half is a pistol, a 2nd round "
+                    f"that depends on the pistol, then 10 rounds at the side's remaining win rate."
+                )
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Win", f"{sim['win']:.1f}%")
+                m2.metric("Draw", f"{sim['draw']:.1f}%")
+                m3.metric("Loss", f"{sim['loss']:.1f}%")
+
+                st.markdown("#### 🔫 What a pistol is worth")
+                pistol_wr_cols = ['Win % if pistol won', 'Win % if pistol lost']
+                st.dataframe(
+                    styling.style_win_rates(sim['pistol_effect'].round(1), pistol_wr_cols),
+                    column_config=styling.win_rate_column_config(pistol_wr_cols),
+                    use_container_width=True, hide_index=True
+                )
+
+                st.markdown("#### 📐 Sensitivity")
+                st.plotly_chart(figures.sensitivity_bar(sim['sensitivity']), use_container_width=True)
+
+                with st.expander("📋 Input round win rates (%)"):
+                    st.dataframe(sim['rates'].round(1), use_container_width=True)
+    else:
+        st.info("No round data available for the simulator.")
+
+# 🕵️ OPPONENTS TAB
+with tabs[7]:
+    st.subheader("🕵️ Opponent Scouting")
+
+    if not score_df.empty and 'Opponent' in score_df.columns:
+        opponent_index = cached_view("opponent_index", {}, lambda: OpponentIndex(score_df))
+        opponent_table = cached_view("opponent_table", {}, opponent_index.opponent_table)
+
+        if opponent_index.names:
+            opp_dates = analytics.score_dates(score_df['Date']).dropna()
+            opp_col1, opp_col2 = st.columns(2)
+            # Most played first, so regular scrim partners are at the top
+            opponent = opp_col1.selectbox("Opponent:", opponent_table['Opponent'].tolist(), key="opponent")
+            opp_range = opp_col2.date_input(
+                "Date range:",
+                value=(opp_dates.min().date(), opp_dates.max().date()),
+                min_value=opp_dates.min().date(),
+                max_value=opp_dates.max().date(),
+                key="opponent_range"
+            )
+
+            if len(opp_range) == 2:
+                opp_start, opp_end = opp_range
+                opp_filters = {"opponent": opponent, "start": opp_start, "end": opp_end}
+                records = cached_view("opponent_maps", opp_filters,
+                                      lambda: opponent_index.map_records(opponent, opp_start, opp_end))
+                sides = cached_view("opponent_sides", opp_filters,
+                                    lambda: opponent_index.side_rates(opponent, opp_start, opp_end))
+
+                if records.empty:
+                    st.info(f"No games against {opponent} in this range.")
+                else:
+                    m1, m2, m3, m4 = st.columns(4)
+                    m1.metric("Games", int(records['Games'].sum()))
+                    m2.metric("Wins", int(records['Wins'].sum()))
+                    m3.metric("Draws", int(records['Draws'].sum()))
+                    m4.metric("Losses", int(records['Losses'].sum()))
+
+                    st.markdown(f"#### 🗺️ Map record vs {opponent}")
+                    st.dataframe(
+                        styling.style_win_rates(records, ['Win Rate'], scale=100),
+                        column_config=styling.win_rate_column_config(['Win Rate'], scale=100),
+                        use_container_width=True, hide_index=True
+                    )
+
+                    st.markdown("#### ⚔️ Side and pistol win rates")
+                    side_cols = ['Atk WR', 'Def WR', 'Atk Pistol WR', 'Def Pistol WR']
+                    st.dataframe(
+                        styling.style_win_rates(sides, side_cols, scale=100),
+                        column_config=styling.win_rate_column_config(side_cols, scale=100),
+                        use_container_width=True, hide_index=True
+                    )
+
+            with st.expander("📋 All opponents"):
+                paged_table(opponent_table, "opponent_table", "opponent_table", {}, win_rate_columns=['Win Rate'], scale=100)
+        else:
+            st.info("No opponents recorded in cleaned_score.csv.")
+    else:
+        st.info("No opponent column in cleaned_score.csv; re-run data_cleaner.py.")
+
+# ⚡ Shared result cache stats
+cache_stats = result_cache.stats()
+with st.sidebar.expander("⚡ Result Cache"):
+    st.caption(f"Dataset version: {data_version}")
+    st.caption(
+        f"{cache_stats['entries']}/{cache_stats['max_entries']} entries · "
+        f"hit rate {cache_stats['hit_rate'] * 100:.1f}% "
+        f"({cache_stats['hits']} hits, {cache_stats['disk_hits']} from disk, {cache_stats['misses']} misses, "
+        f"{cache_stats['disk_evictions']} evicted from disk)"
+    )
+    prefetch_stats = prefetcher.stats()
+    st.caption(
+        f"Prefetch: {prefetch_stats['completed']} done, {prefetch_stats['pending']}/{prefetch_stats['max_pending']} queued, "
+        f"{prefetch_stats['dropped']} dropped, {prefetch_stats['cancelled']} cancelled"
+    )
+
 # Footer in bottom-right corner
 # Full-width footer pinned to bottom
 st.markdown("""
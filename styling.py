@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# 🎨 Win-rate colour scheme, thresholds in percent
+WIN_RATE_LOW = 40
+WIN_RATE_HIGH = 60
+WIN_RATE_COLORS = {
+    'high': 'background-color: #14532d; color: white;',  # green
+    'mid': 'background-color: #78350f; color: white;',   # amber
+    'low': 'background-color: #7f1d1d; color: white;',   # red
+    '': '',
+}
+HEADER_STYLES = [{
+    'selector': 'th',
+    'props': [('background-color', '#1a1a1a'), ('color', '#FDB913'), ('text-align', 'center')]
+}]
+
+
+def win_rate_classes(values, scale=1, low=WIN_RATE_LOW, high=WIN_RATE_HIGH):
+    """
+    'high' / 'mid' / 'low' for a whole column of win rates at once ('' where missing).
+    Use scale=100 for 0–1 fractions, scale=1 for values already in percent.
+    """
+    pct = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float) * scale
+    return np.select([np.isnan(pct), pct >= high, pct < low], ['', 'high', 'low'], default='mid')
+
+
+def _win_rate_css(column, scale):
+    classes = win_rate_classes(column, scale)
+    return pd.Series(classes, index=column.index).map(WIN_RATE_COLORS)
+
+
+def style_win_rates(df, columns, scale=1):
+    """
+    Styler colouring `columns` green / amber / red. Each column is classified
+    in one vectorized call and values stay numeric, so display formatting is
+    left to column configs (win_rate_column_config).
+    """
+    columns = [c for c in columns if c in df.columns]
+    return df.style\
+        .apply(_win_rate_css, scale=scale, subset=columns)\
+        .set_properties(**{'text-align': 'center'})\
+        .set_table_styles(HEADER_STYLES)
+
+
+def win_rate_column_config(columns, scale=1, labels=None):
+    """st.dataframe column configs showing win rates as 'xx.x%' (0–1 fractions when scale=100)."""
+    import streamlit as st
+
+    labels = labels or {}
+    return {
+        col: st.column_config.NumberColumn(labels.get(col, col), format="percent" if scale == 100 else "%.1f%%")
+        for col in columns
+    }
+
+
+def _mover_css(column, significant):
+    values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=float)
+    classes = np.select([~significant, values > 0, values < 0], ['', 'high', 'low'], default='')
+    return pd.Series(classes, index=column.index).map(WIN_RATE_COLORS)
+
+
+def style_movers(df, delta_columns, significant_column='Significant'):
+    """Styler colouring `delta_columns` green / red on rows flagged significant, left plain otherwise."""
+    significant = df[significant_column].fillna(False).to_numpy(dtype=bool)
+    columns = [c for c in delta_columns if c in df.columns]
+    return df.style\
+        .apply(_mover_css, significant=significant, subset=columns)\
+        .set_properties(**{'text-align': 'center'})\
+        .set_table_styles(HEADER_STYLES)
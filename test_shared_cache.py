@@ -0,0 +1,34 @@
+import os
+import warnings
+
+from starlette.testclient import TestClient
+from streamlit.testing.v1 import AppTest
+
+import analytics
+import api
+from lineup import PerformanceMatrix
+from registry import load_registry
+from result_cache import ResultCache
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_api_lineups_then_dashboard_share_one_cache(tmp_path, monkeypatch):
+    """The API and the dashboard read each other's entries from one disk cache, so a view name must mean the same frame in both."""
+    warnings.filterwarnings("ignore")
+    monkeypatch.chdir(REPO_DIR)
+    monkeypatch.setenv("DASHBOARD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("DASHBOARD_PREFETCH_WORKERS", "0")
+    monkeypatch.setattr(api, "_cache", ResultCache(disk_dir=str(tmp_path)))
+
+    # The dashboard's lineup expander opens on the regulars with default filters
+    players = PerformanceMatrix(analytics.load_player_form("form.csv"), load_registry()).regulars()
+    response = TestClient(api.app).get("/lineups", params={"players": ",".join(players)})
+    assert response.status_code == 200
+    rows = response.json()["rows"]
+    assert rows and "Agents" not in rows[0]
+
+    dashboard = AppTest.from_file(os.path.join(REPO_DIR, "streamlit_dashboard.py"), default_timeout=300)
+    dashboard.session_state["logged_in"] = True
+    dashboard.run()
+    assert not dashboard.exception, [e.message for e in dashboard.exception]
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import analytics
+
+TRENDS_PATH = "form_trends.pkl"
+TREND_STATS = ('ACS', 'KPR', 'FKPR', 'K/D', 'KAST')
+TREND_GROUPS = {'agent': 'Agent', 'map': 'Map'}
+ROLLING_WINDOW = 5
+EWMA_SPAN = 5
+
+
+def game_stats(rows):
+    """
+    Per-game ACS / KPR / FKPR / K/D / KAST as a float matrix (NaN = not recorded).
+    KAST is blank or 0 on sheets that didn't track it, so 0 counts as missing.
+    """
+    deaths = pd.to_numeric(rows['Deaths'], errors='coerce')
+    kast = analytics.pct_to_float(rows['KAST']) if 'KAST' in rows.columns else pd.Series(np.nan, index=rows.index)
+    kast = kast.where(kast > 0)
+    # Percent-style KAST (75 rather than 0.75) is scaled down to a fraction
+    kast = kast.where(kast <= 1, kast / 100)
+    return np.column_stack([
+        pd.to_numeric(rows['ACS'], errors='coerce'),
+        analytics.pct_to_float(rows['KPR']),
+        analytics.pct_to_float(rows['FKPR']),
+        pd.to_numeric(rows['Kills'], errors='coerce') / deaths.where(deaths > 0),
+        kast,
+    ]).astype(float)
+
+
+class FormSeries:
+    """
+    Rolling mean and EWMA for one (player, agent) or (player, map) series.
+    The window is a ring buffer with running sums, so each new game is O(1).
+    """
+
+    def __init__(self, window=ROLLING_WINDOW, span=EWMA_SPAN):
+        n = len(TREND_STATS)
+        self.alpha = 2 / (span + 1)
+        self.buffer = np.full((window, n), np.nan)
+        self.sums = np.zeros(n)
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.ewma = np.full(n, np.nan)
+        self.games = 0
+        self.history = []
+
+    def update(self, date, values):
+        slot = self.games % len(self.buffer)
+        evicted = self.buffer[slot]
+        had = ~np.isnan(evicted)
+        self.sums[had] -= evicted[had]
+        self.counts -= had
+
+        has = ~np.isnan(values)
+        self.buffer[slot] = values
+        self.sums[has] += values[has]
+        self.counts += has
+
+        first = has & np.isnan(self.ewma)
+        self.ewma[first] = values[first]
+        blend = has & ~first
+        self.ewma[blend] = self.alpha * values[blend] + (1 - self.alpha) * self.ewma[blend]
+
+        self.games += 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rolling = np.where(self.counts > 0, self.sums / self.counts, np.nan)
+        self.history.append((date, self.games, values.copy(), rolling, self.ewma.copy()))
+
+
+class TrendEngine:
+    """
+    Form-over-time series per (player, agent) and (player, map), fed game by game
+    from form.csv in date order. Only rows appended since the last ingest are
+    processed; if earlier rows changed, or new rows are dated before the last
+    stored game, everything is rebuilt.
+    """
+
+    def __init__(self, window=ROLLING_WINDOW, span=EWMA_SPAN):
+        self.window = window
+        self.span = span
+        self.reset()
+
+    def reset(self):
+        self.series = {}
+        self.rows_seen = 0
+        self.fingerprint = None
+        self.last_date = None
+
+    @staticmethod
+    def _fingerprint(form_df, n_rows):
+        return hashlib.sha1(pd.util.hash_pandas_object(form_df.iloc[:n_rows], index=False).to_numpy().tobytes()).hexdigest()
+
+    @staticmethod
+    def _dated(rows):
+        dates = pd.to_datetime(rows['Date'], errors='coerce')
+        return rows.assign(_date=dates).dropna(subset=['_date', 'Player']).sort_values('_date', kind='stable')
+
+    def ingest(self, form_df):
+        """Feed rows of form.csv that haven't been seen yet. Returns the number of new rows."""
+        form_df = form_df.reset_index(drop=True)
+        added = len(form_df) - self.rows_seen
+        if self.rows_seen and (len(form_df) < self.rows_seen or
+                               self._fingerprint(form_df, self.rows_seen) != self.fingerprint):
+            self.reset()
+
+        new_rows = self._dated(form_df.iloc[self.rows_seen:])
+        if self.last_date is not None and not new_rows.empty and new_rows['_date'].iloc[0] < self.last_date:
+            # A backfilled game dated before stored ones: replay the whole file so the windows and EWMAs stay in date order
+            self.reset()
+            new_rows = self._dated(form_df)
+        values = game_stats(new_rows)
+
+        for i, row in enumerate(new_rows[['_date', 'Player', 'Agent', 'Column 1']].itertuples(index=False)):
+            date, player = row[0], row[1]
+            for group, key in (('agent', row[2]), ('map', row[3])):
+                if pd.isna(key):
+                    continue
+                series = self.series.get((group, player, key))
+                if series is None:
+                    series = self.series[(group, player, key)] = FormSeries(self.window, self.span)
+                series.update(date, values[i])
+
+        if not new_rows.empty:
+            self.last_date = new_rows['_date'].iloc[-1]
+        self.rows_seen = len(form_df)
+        self.fingerprint = self._fingerprint(form_df, self.rows_seen)
+        return max(added, 0)
+
+    def players(self):
+        return sorted({player for _, player, _ in self.series})
+
+    def history(self, player, group='agent'):
+        """Long frame of Date / Game / <Agent|Map> / Stat / Value / Rolling / EWMA for one player."""
+        label = TREND_GROUPS[group]
+        rows = []
+        for (g, p, key), series in self.series.items():
+            if g != group or p != player:
+                continue
+            for date, game, values, rolling, ewma in series.history:
+                for s, stat in enumerate(TREND_STATS):
+                    rows.append((date, game, key, stat, values[s], rolling[s], ewma[s]))
+        history = pd.DataFrame(rows, columns=['Date', 'Game', label, 'Stat', 'Value', 'Rolling', 'EWMA'])
+        return history.sort_values(by=[label, 'Game']).reset_index(drop=True)
+
+    def latest(self, group='agent'):
+        """Current rolling / EWMA form of every series, one row per (player, key, stat)."""
+        label = TREND_GROUPS[group]
+        rows = []
+        for (g, player, key), series in self.series.items():
+            if g != group:
+                continue
+            date, game, _, rolling, ewma = series.history[-1]
+            rows += [(player, key, stat, game, date, rolling[s], ewma[s]) for s, stat in enumerate(TREND_STATS)]
+        return pd.DataFrame(rows, columns=['Player', label, 'Stat', 'Games', 'Last Game', 'Rolling', 'EWMA'])
+
+    # 💾 Storage
+    def save(self, path=TRENDS_PATH):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=TRENDS_PATH):
+        with open(path, "rb") as f:
+            engine = pickle.load(f)
+        if not hasattr(engine, 'last_date'):
+            # Saved before date-order tracking: rebuilt on the next ingest
+            engine.reset()
+        return engine
+
+
+def load_trends(form_df=None, path=TRENDS_PATH):
+    """
+    Read-only: the engine saved by the last ingest, brought up to date in memory
+    with any rows of `form_df` it hasn't seen yet. Nothing is written back.
+    """
+    try:
+        engine = TrendEngine.load(path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        engine = TrendEngine()
+    if form_df is not None:
+        engine.ingest(form_df)
+    return engine
+
+
+def update_trends(form_path="form.csv", path=TRENDS_PATH):
+    """Load the saved engine (or start one), feed it the new rows of form.csv and save it if anything changed."""
+    try:
+        engine = TrendEngine.load(path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        engine = TrendEngine()
+    stored = (engine.rows_seen, engine.fingerprint)
+    added = engine.ingest(pd.read_csv(form_path))
+    # New rows, an edited row (new fingerprint, same row count) or a reset all change the engine
+    if (engine.rows_seen, engine.fingerprint) != stored:
+        engine.save(path)
+    return engine, added
+
+
+# Run this when executed directly
+if __name__ == "__main__":
+    engine, added = update_trends()
+    print(f"📈 Added {added} rows to {len(engine.series)} form series → {TRENDS_PATH}")